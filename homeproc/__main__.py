@@ -0,0 +1,6 @@
+"""Allow running the command line interface as `python -m homeproc`."""
+import sys
+
+from .cli import main
+
+sys.exit(main())
@@ -0,0 +1,12 @@
+"""
+Module comprising the benchmark suite and synthetic data generators.
+
+@author: Dr. Paul Iacomi
+@date: Oct 2026
+"""
+# pylint: disable=W0614,W0611,W0622
+# flake8: noqa
+# isort:skip_file
+
+from .synthetic import *
+from .suite import *
@@ -0,0 +1,250 @@
+"""
+Timing of the main entry points on synthetic data.
+
+Each benchmark generates its input at a given scale (outside the timed
+region), times the entry point over several repeats and measures the
+peak Python memory of one extra traced run. Results are returned as a
+dataframe which can be saved and compared against a previous run.
+
+@author: Dr. Paul Iacomi
+@date: Oct 2026
+"""
+
+__all__ = [
+    "BENCHMARKS",
+    "run_benchmarks",
+    "save_benchmarks",
+    "compare_benchmarks",
+    "environment_info",
+]
+
+import gc
+import importlib
+import json
+import os
+import pathlib
+import platform
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from . import synthetic
+
+
+def _folder_size(paths):
+    return sum(os.path.getsize(p) for p in paths)
+
+
+def _setup_read_tracefiles(tmp, scale):
+    folder = synthetic.make_qcm_traces(tmp / "traces", ntraces=50 * scale, npoints=2000)
+    files = list(folder.iterdir())
+    return (folder, ), {}, len(files), _folder_size(files)
+
+
+def _setup_read_tracefiles_1(tmp, scale):
+    folder = synthetic.make_qcm_traces(tmp / "traces", ntraces=50 * scale, npoints=2000, format=1)
+    files = list(folder.iterdir())
+    kwargs = dict(format=1, minpoint=5.99e6, maxpoint=6.01e6, npoints=2000)
+    return (folder, ), kwargs, len(files), _folder_size(files)
+
+
+def _setup_calc_tracedata(tmp, scale):
+    from ..qcm import read_tracefiles
+    folder = synthetic.make_qcm_traces(tmp / "traces", ntraces=50 * scale, npoints=2000)
+    traces = read_tracefiles(folder)
+    return (traces, ), {}, traces.shape[1], traces.values.nbytes
+
+
+def _setup_read_dvs_file(tmp, scale):
+    path = synthetic.make_dvs_file(tmp / "dvs.txt", npoints=10000 * scale)
+    return (path, ), {}, 10000 * scale, os.path.getsize(path)
+
+
+def _setup_calc_isotherm_data(tmp, scale):
+    from ..dvs import read_dvs_file
+    path = synthetic.make_dvs_file(tmp / "dvs.txt", npoints=10000 * scale, nsteps=10 * scale)
+    dvsinfo, dvsdata = read_dvs_file(path)
+    columns = dvsinfo['columns']
+    target = dvsdata[columns['p_rel_tgt']].values
+    chpoints = np.append(np.flatnonzero(np.diff(target)) + 1, len(target)).tolist()
+    args = (dvsdata, columns['p_rel'], columns['mass'], chpoints)
+    return args, {}, len(chpoints), dvsdata.memory_usage().sum()
+
+
+def _setup_get_steps(tmp, scale):
+    from ..dvs import read_dvs_file
+    path = synthetic.make_dvs_file(tmp / "dvs.txt", npoints=10000 * scale, nsteps=10 * scale)
+    dvsinfo, dvsdata = read_dvs_file(path)
+    columns = dvsinfo['columns']
+    args = (dvsdata, [columns['p_rel_tgt'], columns['t_heat_tgt']])
+    return args, {}, len(dvsdata), dvsdata.memory_usage().sum()
+
+
+def _setup_read_novo_file(tmp, scale):
+    path = synthetic.make_novo_file(tmp / "novo.txt", nscans=100 * scale, nfreqs=30)
+    return (str(path), ), {}, 3000 * scale, os.path.getsize(path)
+
+
+def _setup_readm41(tmp, scale):
+    path = synthetic.make_m41_file(tmp / "refine.m41", nphases=scale)
+    return (path, ), {}, scale, os.path.getsize(path)
+
+
+def _setup_readpcr(tmp, scale):
+    path = synthetic.make_pcr_file(tmp / "refine.pcr", npatt=2, natoms=50 * scale)
+    return (path, ), {}, 50 * scale, os.path.getsize(path)
+
+
+def _setup_read_patterns(tmp, scale):
+    folder = synthetic.make_xy_patterns(tmp / "patterns", npatterns=20 * scale, npoints=5000)
+    size = sum(f.stat().st_size for f in folder.iterdir())
+    return (folder, ), {}, 20 * scale, size
+
+
+# name: (module, entry point, setup, unit of items)
+BENCHMARKS = {
+    "read_tracefiles": ("..qcm", "read_tracefiles", _setup_read_tracefiles, "files"),
+    "read_tracefiles_1": ("..qcm", "read_tracefiles", _setup_read_tracefiles_1, "files"),
+    "calc_tracedata": ("..qcm", "calc_tracedata", _setup_calc_tracedata, "traces"),
+    "read_dvs_file": ("..dvs", "read_dvs_file", _setup_read_dvs_file, "rows"),
+    "calc_isotherm_data": ("..dvs", "calc_isotherm_data", _setup_calc_isotherm_data, "steps"),
+    "get_steps": ("..dvs", "get_steps", _setup_get_steps, "rows"),
+    "read_novo_file": ("..ide", "read_novo_file", _setup_read_novo_file, "rows"),
+    "readm41": ("..xrd.parseM41", "readm41", _setup_readm41, "phases"),
+    "readpcr": ("..xrd.parsePCR", "readpcr", _setup_readpcr, "atoms"),
+    "read_patterns": ("..xrd.patterns", "read_patterns", _setup_read_patterns, "files"),
+}
+
+
+def environment_info():
+    """Versions and machine details stored alongside benchmark results."""
+    import scipy
+    try:
+        from importlib.metadata import version
+        homeproc_version = version("homeproc")
+    except Exception:  # pylint: disable=broad-except
+        homeproc_version = "unknown"
+
+    return {
+        "homeproc": homeproc_version,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "scipy": scipy.__version__,
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpus": os.cpu_count(),
+        "system": platform.system(),
+    }
+
+
+def _time_one(func, args, kwargs, repeat):
+    """Return the wall times of `repeat` calls and the peak memory of a traced call."""
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func(*args, **kwargs)
+        times.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func(*args, **kwargs)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return times, peak
+
+
+def run_benchmarks(names=None, scales=(1, 4, 16), repeat=3, verbose=True):
+    """
+    Run the benchmark suite on synthetic data.
+
+    Parameters
+    ----------
+    names : list, optional
+        Benchmarks to run, defaults to all in `BENCHMARKS`.
+    scales : list
+        Multipliers of the base input size of each benchmark.
+    repeat : int
+        Number of timed calls, the minimum and median are reported.
+    verbose : bool
+        Print each result as it is obtained.
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per (benchmark, scale) with timing, throughput and memory.
+        Environment details are stored in the `attrs` of the frame.
+    """
+    names = names or list(BENCHMARKS)
+    rows = []
+
+    for name in names:
+        module, entry, setup, unit = BENCHMARKS[name]
+        func = getattr(importlib.import_module(module, __package__), entry)
+        for scale in scales:
+            with tempfile.TemporaryDirectory() as tmp:
+                args, kwargs, nitems, nbytes = setup(pathlib.Path(tmp), scale)
+                times, peak = _time_one(func, args, kwargs, repeat)
+
+            best = min(times)
+            row = {
+                "benchmark": name,
+                "scale": scale,
+                "items": nitems,
+                "unit": unit,
+                "bytes": int(nbytes),
+                "time_min [s]": best,
+                "time_median [s]": statistics.median(times),
+                "items/s": nitems / best,
+                "MB/s": nbytes / best / 1e6,
+                "peak_memory [MB]": peak / 1e6,
+            }
+            rows.append(row)
+            if verbose:
+                print(
+                    f"{name:>20} x{scale:<4} {best:9.4f} s "
+                    f"{row['items/s']:12.1f} {unit}/s {row['MB/s']:9.2f} MB/s "
+                    f"{row['peak_memory [MB]']:9.2f} MB peak"
+                )
+
+    results = pd.DataFrame(rows)
+    results.attrs.update(environment_info())
+    return results
+
+
+def save_benchmarks(results, path):
+    """Save benchmark results as csv, with the environment in a json file alongside."""
+    path = pathlib.Path(path).with_suffix(".csv")
+    results.to_csv(path, index=False)
+    path.with_suffix(".json").write_text(json.dumps(results.attrs, indent=2, default=str))
+    return path
+
+
+def compare_benchmarks(baseline, current):
+    """
+    Compare two benchmark result frames (or csv paths).
+
+    Returns a frame with the speedup (baseline time / current time) and
+    the memory ratio for each (benchmark, scale) present in both runs.
+    """
+    if not isinstance(baseline, pd.DataFrame):
+        baseline = pd.read_csv(baseline)
+    if not isinstance(current, pd.DataFrame):
+        current = pd.read_csv(current)
+
+    keys = ["benchmark", "scale"]
+    merged = baseline.merge(current, on=keys, suffixes=(" base", " new"))
+    return pd.DataFrame({
+        "benchmark": merged["benchmark"],
+        "scale": merged["scale"],
+        "speedup": merged["time_min [s] base"] / merged["time_min [s] new"],
+        "memory ratio": merged["peak_memory [MB] new"] / merged["peak_memory [MB] base"],
+    }).set_index(keys)
@@ -0,0 +1,289 @@
+"""
+Generators of synthetic instrument files for benchmarking.
+
+All generators are seeded so that the same call always writes
+byte-identical files, which keeps benchmark runs comparable.
+
+@author: Dr. Paul Iacomi
+@date: Oct 2026
+"""
+
+__all__ = [
+    "make_qcm_traces",
+    "make_dvs_file",
+    "make_novo_file",
+    "make_m41_file",
+    "make_pcr_file",
+    "make_xy_patterns",
+]
+
+import datetime
+import pathlib
+
+import numpy as np
+
+from ..dvs.dvsproc import cols
+
+START = datetime.datetime(2021, 1, 5, 10, 0, 0)
+
+
+def make_qcm_traces(
+    folder,
+    ntraces=100,
+    npoints=2000,
+    format=2,
+    f0=6.0e6,
+    span=2.0e4,
+    drift=5.0,
+    seed=0,
+):
+    """
+    Write a folder of QCM resonance traces, one file per timestamp.
+
+    Format 2 files hold (frequency, amplitude) pairs and are named with
+    a compact timestamp. Format 1 files hold the amplitude only and the
+    file name is the timestamp with milliseconds.
+    """
+    rng = np.random.default_rng(seed)
+    folder = pathlib.Path(folder)
+    folder.mkdir(parents=True, exist_ok=True)
+
+    freq = np.linspace(f0 - span / 2, f0 + span / 2, npoints)
+    hwhm = span / 40
+
+    for n in range(ntraces):
+        stamp = START + datetime.timedelta(seconds=30 * n)
+        centre = f0 - drift * n + rng.normal(scale=drift / 10)
+        ampl = 1 / (1 + ((freq - centre) / hwhm)**2) + rng.normal(scale=0.01, size=npoints)
+        if format == 2:
+            name = stamp.strftime("%Y%m%dT%H%M%S") + ".csv"
+            np.savetxt(folder / name, np.column_stack((freq, ampl)), delimiter=",", fmt="%.6f")
+        elif format == 1:
+            name = stamp.strftime("%Y%m%dT%H%M%S") + ".000"
+            np.savetxt(folder / name, ampl, fmt="%.6f")
+        else:
+            raise ValueError(f"Unknown trace format {format}.")
+
+    return folder
+
+
+def make_dvs_file(path, npoints=10000, nsteps=10, p0=23.7, seed=0):
+    """
+    Write a DVS 'txt' file with a stepped pressure isotherm.
+
+    The file has the 41 line header expected by `read_dvs_file` and the
+    data columns laid out as described by `dvs.cols`.
+    """
+    rng = np.random.default_rng(seed)
+    path = pathlib.Path(path)
+
+    ncols = max(cols.values()) + 1
+    names = [f"Column {n}" for n in range(ncols)]
+    for key, ind in cols.items():
+        names[ind] = key
+
+    # pressure steps with an exponential approach to each setpoint
+    index = np.arange(npoints)
+    step = np.minimum(index * nsteps // npoints, nsteps - 1)
+    p_rel_tgt = 90 * step / max(nsteps - 1, 1)
+    step_start = np.searchsorted(step, step)
+    jump = np.diff(p_rel_tgt, prepend=0)[step_start]
+    tau = max(npoints // nsteps // 5, 1)
+    p_rel = p_rel_tgt - jump * np.exp(-(index - step_start) / tau)
+    p_rel = p_rel + rng.normal(scale=0.05, size=npoints)
+
+    data = np.zeros((npoints, ncols))
+    data[:, cols["time"]] = index / 60
+    data[:, cols["mass"]] = 10 + 0.02 * p_rel + rng.normal(scale=1e-4, size=npoints)
+    data[:, cols["dmass"]] = data[:, cols["mass"]] - 10
+    data[:, cols["dmdt"]] = np.gradient(data[:, cols["mass"]])
+    data[:, cols["t_inc_tgt"]] = 25
+    data[:, cols["t_inc"]] = 25 + rng.normal(scale=0.01, size=npoints)
+    data[:, cols["t_heat_tgt"]] = np.where(index < npoints // 20, 120, 25)
+    data[:, cols["t_heat"]] = data[:, cols["t_heat_tgt"]] + rng.normal(scale=0.1, size=npoints)
+    data[:, cols["p_rel_tgt"]] = p_rel_tgt
+    data[:, cols["p_rel"]] = p_rel
+    data[:, cols["p_abs_tgt"]] = p_rel_tgt * p0 / 100
+    data[:, cols["p_abs"]] = p_rel * p0 / 100
+    data[:, cols["v_flow_tgt"]] = 100
+    data[:, cols["v_flow"]] = 100 + rng.normal(scale=0.1, size=npoints)
+
+    meta = {
+        "Method Name": "synthetic",
+        "Sample Name": "sample",
+        "Sample Description": "synthetic benchmark data",
+        "Initial Mass [mg]": "10.0000",
+        "Raw Data File Created": START.strftime("%Y-%m-%d %H:%M:%S"),
+        "User Name": "homeproc",
+        "Vapour": "Water",
+        "Vapour Pressure [Torr]": f"{p0}",
+        "Control Mode": "Pressure",
+    }
+    header = [f"{key}: {val}" for key, val in meta.items()]
+    header += [f"Comment {n}: -" for n in range(40 - len(header))]
+
+    with open(path, "w", encoding="cp1252", newline="\n") as file:
+        file.write("DVS Vacuum - Data File\n")
+        file.write("\n".join(header) + "\n")
+        file.write("\t".join(names) + "\n")
+        np.savetxt(file, data, delimiter="\t", fmt="%.5f")
+
+    return path
+
+
+def make_novo_file(path, nscans=100, nfreqs=30, seed=0):
+    """Write a Novocontrol output file with `nscans` frequency sweeps."""
+    rng = np.random.default_rng(seed)
+    path = pathlib.Path(path)
+
+    freqs = np.logspace(6, -1, nfreqs)
+    scan = np.repeat(np.arange(nscans), nfreqs)
+    freq = np.tile(freqs, nscans)
+    time = scan * 60.0 + np.tile(np.cumsum(1 / freqs + 0.1), nscans)
+
+    resist = 1e7 * (1 + 0.5 * scan / max(nscans, 1))
+    cap = 1e-11
+    z = resist / (1 + 2j * np.pi * freq * resist * cap)
+    z = z * (1 + rng.normal(scale=1e-3, size=z.shape))
+
+    header = ["Time [s]", "Freq. [Hz]", "Z'  [Ohm]", "Z''  [Ohm]", "|Z|  [Ohm]"]
+    data = np.column_stack((time, freq, z.real, z.imag, np.abs(z)))
+
+    with open(path, "w", newline="\n") as file:
+        file.write(f"sample, {START:%d.%m.%Y}, {START:%H:%M:%S}\n")
+        file.write("Sweep Parameters\n")
+        file.write("Fixed value: 1.0 V\n")
+        file.write("\t".join(header) + "\n")
+        np.savetxt(file, data, delimiter="\t", fmt="%.8e")
+
+    return path
+
+
+def make_m41_file(path, nphases=1):
+    """Write a JANA M41 refinement file with `nphases` phases."""
+    path = pathlib.Path(path)
+
+    def block(su):
+        flags = "" if su else " 111111"
+        lines = [
+            " shifts zero sycos sysin",
+            " 0.0100 0.0020 0.0030" + ("" if su else " 111"),
+            " background",
+            " 1.0 2.0 3.0 4.0" + ("" if su else " 1111"),
+        ]
+        for n in range(nphases):
+            if nphases > 1:
+                lines.append(f" phase {n + 1} P{n + 1}")
+            else:
+                lines.append(" base")
+            lines += [
+                " Cell parameters",
+                f" {10 + n:.4f} {11 + n:.4f} {12 + n:.4f} 90.0000 {95 + n:.4f} 90.0000" + flags,
+                " Gaussian",
+                " 1.0 -0.5 0.2 0.0" + ("" if su else " 1111"),
+                " Lorentzian",
+                " 0.1 0.0 0.3 0.0" + ("" if su else " 1111"),
+            ]
+        return lines
+
+    lines = [" Version Jana2006", " synthetic"]
+    lines += [" " + "*" * 40] + block(False)
+    lines += [" " + "-" * 40] + block(True)
+    lines += [" " + "-" * 40, " end"]
+
+    path.write_text("\n".join(lines) + "\n")
+    return path
+
+
+def make_pcr_file(path, npatt=2, nphases=1, natoms=10, seed=0):
+    """Write a multipattern FullProf PCR file as parsed by `readpcr`."""
+    rng = np.random.default_rng(seed)
+    path = pathlib.Path(path)
+
+    lines = ["COMM synthetic multipattern", f"NPATT {npatt} " + " ".join("1" * npatt)]
+    lines.append("W_PAT " + " ".join("1.000" for _ in range(npatt)))
+    lines.append("! Nph Dum Ias Nre Cry Opt Aut")
+    lines.append(f"{nphases} 0 0 0 0 0 1")
+    for _ in range(npatt):
+        lines.append("0 5 0 0 0 1 0 0 0 0 0 0 0 0")
+    for n in range(npatt):
+        lines.append(f"pattern_{n}.dat")
+    lines.append("0 0 1 0 1 0")
+    for _ in range(npatt):
+        lines.append("0 0 1 0 0 0 1 0 0 0 0")
+    for _ in range(npatt):
+        lines.append("1.540560 1.544390 0.5000 40.000 8.0000 0.7998 0.0000 40.00 0.0000 0.0000")
+    lines.append("10 0.10 1.00 1.00 1.00 1.00")
+    for _ in range(npatt):
+        lines.append("5.0000 0.020000 80.0000 0.0000 0.0000")
+    for _ in range(npatt):
+        lines.append("0.0000 0.0000")
+    lines.append("20 !Number of refined parameters")
+    for _ in range(npatt):
+        lines.append("0.0000 0.0 0.0000 0.0 0.0000 0.0 1.540560 0.0 0")
+        lines.append(" ".join(f"{c:.4f}" for c in rng.normal(size=6)))
+        lines.append(" ".join("0.00" for _ in range(6)))
+
+    for ph in range(nphases):
+        lines.append(f"Phase_{ph + 1}")
+        lines.append(f"{natoms} 0 0 0 0 0 0 1.0 0 0")
+        lines.append(" ".join("1" for _ in range(npatt)))
+        for _ in range(npatt):
+            lines.append("0 0 0 0 0")
+            lines.append("1.0 1.0 1.0 0.0 0.0 0.0 0.0")
+        lines.append("P 1                    <--Space group symbol")
+        for n in range(natoms):
+            x, y, z = rng.random(3)
+            lines.append(f"C{n} C {x:.5f} {y:.5f} {z:.5f} 0.50000 1.00000 0 0 0 0")
+            lines.append("0.00 0.00 0.00 0.00 0.00")
+        for _ in range(npatt):
+            lines.append("1.0000 0.0000 0.0000 0.0000 0.0000 0.0000 0")
+            lines.append("0.00 0.00 0.00 0.00 0.00 0.00")
+            lines.append("0.01 -0.01 0.01 0.00 0.00 0.00 0.00")
+            lines.append("0.00 0.00 0.00 0.00 0.00 0.00 0.00")
+            lines.append("10.0000 11.0000 12.0000 90.0000 95.0000 90.0000")
+            lines.append("0.00 0.00 0.00 0.00 0.00 0.00")
+            lines.append("0.00 0.00 0.00 0.00 0.00 0.00")
+            lines.append("0.00 0.00 0.00 0.00 0.00 0.00")
+    lines.append("5.000 80.000 1 0 0")
+
+    path.write_text("\n".join(lines) + "\n")
+    return path
+
+
+def make_xy_patterns(
+    folder,
+    npatterns=100,
+    npoints=5000,
+    suffix=".xy",
+    peaks=(8.0, 12.5, 17.3, 21.0, 26.4, 31.7),
+    drift=0.002,
+    transition=None,
+    seed=0,
+):
+    """
+    Write a series of powder patterns as plain text 2theta/intensity files.
+
+    Peaks shift by `drift` degrees per pattern, on a curved background.
+    From pattern `transition` on, every other peak is replaced by one half
+    a degree higher, as for a phase change.
+    """
+    rng = np.random.default_rng(seed)
+    folder = pathlib.Path(folder)
+    folder.mkdir(parents=True, exist_ok=True)
+
+    x = np.linspace(5, 40, npoints)
+    peaks = np.asarray(peaks)
+    heights = rng.uniform(200, 1000, len(peaks))
+    background = 100 + 2000 / x
+
+    for n in range(npatterns):
+        centres = peaks + drift * n
+        if transition is not None and n >= transition:
+            centres = centres + 0.5 * (np.arange(len(peaks)) % 2)
+        y = background + (heights * np.exp(-0.5 * ((x[:, None] - centres) / 0.05)**2)).sum(axis=1)
+        y = rng.poisson(y).astype(float)
+        columns = [x, y, np.sqrt(y)] if suffix == ".xye" else [x, y]
+        np.savetxt(folder / f"pattern_{n:05d}{suffix}", np.column_stack(columns), fmt="%.5f")
+
+    return folder
@@ -0,0 +1,197 @@
+"""
+Catalogue of DVS and Novocontrol files built from their headers only.
+
+Archives are scanned for data files, and only the few header lines of
+each one are read, in a process pool if requested. Results are stored in
+a small SQLite database indexed by sample, adsorbate and date. Later
+scans only read files which are new or have changed since.
+
+    with Catalogue("runs.sqlite") as cat:
+        cat.scan("archive", jobs=8)
+        runs = cat.query(sample="MOF%", adsorbate="Water")
+
+@author: Dr. Paul Iacomi
+@date: Oct 2026
+"""
+
+__all__ = [
+    "Catalogue",
+    "read_header",
+]
+
+import fnmatch
+import json
+import os
+import sqlite3
+
+import pandas as pd
+from dateutil import parser
+
+from .common import ScannedFile
+from .common import progress_map
+from .dvs import read_dvs_header
+from .dvs.dvsproc import trim_meta
+from .ide import read_novo_header
+
+COLUMNS = ("path", "kind", "size", "mtime", "sample", "adsorbate", "date", "method", "user", "meta")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    kind TEXT,
+    size INTEGER,
+    mtime REAL,
+    sample TEXT,
+    adsorbate TEXT,
+    date TEXT,
+    method TEXT,
+    user TEXT,
+    meta TEXT
+);
+CREATE INDEX IF NOT EXISTS files_sample ON files (sample);
+CREATE INDEX IF NOT EXISTS files_adsorbate ON files (adsorbate);
+CREATE INDEX IF NOT EXISTS files_date ON files (date);
+"""
+
+
+def read_header(file):
+    """
+    Read the header of a DVS or Novocontrol file as a catalogue row.
+
+    Files which are neither are kept with a kind of None, so that they
+    are not read again until they change.
+    """
+    row = dict.fromkeys(COLUMNS)
+    row.update(path=file.path, size=file.size, mtime=file.timestamp)
+
+    try:
+        meta = trim_meta(read_dvs_header(file.path))
+        if "dvs_method_date" in meta:
+            row.update(
+                kind="dvs",
+                sample=meta.get("dvs_sample_name"),
+                adsorbate=meta.get("dvs_adsorbate"),
+                date=parser.parse(meta["dvs_method_date"][:19]).isoformat(),
+                method=meta.get("dvs_method_name"),
+                user=meta.get("dvs_user_name"),
+                meta=json.dumps(meta),
+            )
+            return row
+    except (ValueError, UnicodeDecodeError):
+        pass
+
+    try:
+        meta = read_novo_header(file.path)
+        row.update(
+            kind="ide",
+            sample=meta["sample_name"],
+            date=meta["start_time"].isoformat(),
+        )
+    except (ValueError, OverflowError, UnicodeDecodeError):
+        pass
+    return row
+
+
+def _walk(folders, pattern):
+    """List matching files under the folders, with their size and modification time."""
+    files = []
+    for folder in folders:
+        for root, _, names in os.walk(folder):
+            for name in fnmatch.filter(names, pattern):
+                path = os.path.abspath(os.path.join(root, name))
+                stat = os.stat(path)
+                files.append(ScannedFile(path, name, stat.st_size, stat.st_mtime))
+    return files
+
+
+class Catalogue:
+    """
+    SQLite index of the headers of DVS and Novocontrol files.
+
+    Parameters
+    ----------
+    path : str
+        Database file, created if needed. Defaults to an in-memory
+        database.
+    """
+
+    def __init__(self, path=":memory:"):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(_SCHEMA)
+
+    def scan(self, folders, pattern="*.txt", jobs=1, prune=True, disable=None):
+        """
+        Add new or changed files under the folders to the catalogue.
+
+        Files already catalogued with the same size and modification
+        time are skipped. With `prune`, entries under the scanned folders
+        whose file is gone are removed.
+
+        Returns
+        -------
+        int
+            Number of files whose header was read.
+        """
+        if isinstance(folders, (str, os.PathLike)):
+            folders = [folders]
+        files = _walk(folders, pattern)
+
+        known = {p: (s, m) for p, s, m in self.conn.execute("SELECT path, size, mtime FROM files")}
+        todo = [f for f in files if known.get(f.path) != (f.size, f.timestamp)]
+        rows = progress_map(read_header, todo, jobs=jobs, desc="catalogue", disable=disable)
+
+        with self.conn:
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO files VALUES ({', '.join('?' * len(COLUMNS))})",
+                [tuple(row[c] for c in COLUMNS) for row in rows],
+            )
+            if prune:
+                found = {f.path for f in files}
+                roots = tuple(os.path.join(os.path.abspath(f), "") for f in folders)
+                gone = [(p, ) for p in known if p.startswith(roots) and p not in found]
+                self.conn.executemany("DELETE FROM files WHERE path = ?", gone)
+
+        return len(rows)
+
+    def query(self, sample=None, adsorbate=None, kind=None, start=None, end=None):
+        """
+        Find catalogued files.
+
+        `sample` and `adsorbate` are SQL LIKE patterns (e.g. "MOF%"),
+        `start` and `end` bound the experiment date.
+        """
+        clauses, params = ["kind IS NOT NULL"], []
+        if sample is not None:
+            clauses.append("sample LIKE ?")
+            params.append(sample)
+        if adsorbate is not None:
+            clauses.append("adsorbate LIKE ?")
+            params.append(adsorbate)
+        if kind is not None:
+            clauses.append("kind = ?")
+            params.append(kind)
+        if start is not None:
+            clauses.append("date >= ?")
+            params.append(pd.Timestamp(start).isoformat())
+        if end is not None:
+            clauses.append("date <= ?")
+            params.append(pd.Timestamp(end).isoformat())
+
+        sql = f"SELECT * FROM files WHERE {' AND '.join(clauses)} ORDER BY date"
+        found = pd.read_sql_query(sql, self.conn, params=params)
+        found["date"] = pd.to_datetime(found["date"])
+        return found
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM files WHERE kind IS NOT NULL").fetchone()[0]
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
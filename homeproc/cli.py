@@ -0,0 +1,423 @@
+"""
+Command line batch processing of data files.
+
+Each instrument has its own subcommand which wraps the processing chain
+normally run from a notebook. Input paths are processed independently
+in a process pool and results are written to disk next to headless figures.
+
+    homeproc qcm traces_1 traces_2 --out results --jobs 4
+    homeproc dvs *.txt --out results --figures png
+    homeproc ide *.txt --out results --format parquet
+    homeproc xrd *.m41 *.pcr --out results
+    homeproc bench --scales 1 4 --save bench.csv --compare previous.csv
+    homeproc catalogue runs.sqlite archive --jobs 8 --sample "MOF%"
+
+@author: Dr. Paul Iacomi
+@date: Oct 2026
+"""
+
+__all__ = [
+    "main",
+    "run_batch",
+]
+
+import argparse
+import functools
+import os
+import pathlib
+import sys
+import traceback
+
+# Figures are only ever exported, never shown
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+FRAME_FORMATS = ("csv", "parquet")
+FIGURE_FORMATS = ("none", "png", "svg", "pdf", "html")
+
+
+def write_frame(df, path, fmt="csv"):
+    """Write a dataframe as csv or parquet, returning the final path."""
+    path = pathlib.Path(path).with_suffix(f".{fmt}")
+    if fmt == "parquet":
+        # column names must be strings in parquet
+        df = df.rename(columns=str)
+        df.to_parquet(path)
+    elif fmt == "csv":
+        df.to_csv(path)
+    else:
+        raise ValueError(f"Unknown output format '{fmt}', choose from {FRAME_FORMATS}.")
+    return path
+
+
+def write_figure(fig, path, fmt="png"):
+    """Write a plotly or matplotlib figure to disk, returning the final path."""
+    path = pathlib.Path(path).with_suffix(f".{fmt}")
+    if hasattr(fig, "savefig"):
+        if fmt == "html":
+            return None
+        fig.savefig(path, bbox_inches="tight")
+    elif fmt == "html":
+        fig.write_html(path)
+    else:
+        fig.write_image(path)
+    return path
+
+
+def _close_figures():
+    from matplotlib import pyplot as plt
+    plt.close('all')
+
+
+def process_qcm(path, opts):
+    """Process a folder of QCM traces into resonance frequency and width."""
+    from .qcm import calc_tracedata
+    from .qcm import plot_qcm
+    from .qcm import read_markerfile
+    from .qcm import read_tracefiles
+
+    path = pathlib.Path(path)
+    out = pathlib.Path(opts.out) / path.name
+    written = []
+
+    traces = read_tracefiles(
+        path,
+        format=opts.trace_format,
+        minpoint=opts.minpoint,
+        maxpoint=opts.maxpoint,
+        npoints=opts.npoints,
+    )
+    trace_results = calc_tracedata(
+        traces,
+        pwidth=opts.pwidth,
+        pheight=opts.pheight,
+        denoise=opts.denoise,
+        track=opts.track,
+    )
+    written.append(write_frame(trace_results, f"{out}_trace_results", opts.format))
+
+    if opts.figures != "none":
+        markers = trace_results.iloc[:0]
+        if opts.markers:
+            markers = read_markerfile(str(opts.markers))
+        fig = plot_qcm(markers, trace_results)
+        written.append(write_figure(fig, f"{out}_qcm", opts.figures))
+
+    return written
+
+
+def process_dvs(path, opts):
+    """Process a DVS file into isotherm points."""
+    from matplotlib import pyplot as plt
+
+    from .dvs import calc_isotherm_data
+    from .dvs import dvs_plot
+    from .dvs import get_change_points
+    from .dvs import get_steps
+    from .dvs import read_dvs_file
+
+    path = pathlib.Path(path)
+    out = pathlib.Path(opts.out) / path.stem
+    written = []
+
+    dvsinfo, dvsdata = read_dvs_file(path)
+    columns = dvsinfo['columns']
+    if opts.chp_method == "targets":
+        chpoints = get_steps(dvsdata, [columns[c] for c in opts.targets])
+        written.append(write_frame(chpoints, f"{out}_steps", opts.format))
+    else:
+        chpoints = get_change_points(
+            dvsdata,
+            columns[opts.chp_col],
+            method=opts.chp_method,
+            pen=opts.pen,
+            width=opts.width,
+            log=opts.log,
+        )
+        if opts.figures not in ("none", "html"):
+            written.append(write_figure(plt.gcf(), f"{out}_change_points", opts.figures))
+        _close_figures()
+
+    extra_cols = [columns[c] for c in opts.extra_cols] if opts.extra_cols else None
+    iso_points = calc_isotherm_data(
+        dvsdata,
+        columns[opts.pcol],
+        columns[opts.mcol],
+        chpoints,
+        extra_cols=extra_cols,
+        offspts=opts.offspts,
+        meanpts=opts.meanpts,
+    )
+    written.append(write_frame(iso_points, f"{out}_isotherm", opts.format))
+
+    if opts.figures != "none":
+        written.append(write_figure(dvs_plot(dvsinfo, dvsdata), f"{out}_kinetic", opts.figures))
+
+    return written
+
+
+def process_ide(path, opts):
+    """Process a Novocontrol file into a time/frequency table."""
+    from .ide import plot_time_column
+    from .ide import read_novo_file
+
+    path = pathlib.Path(path)
+    out = pathlib.Path(opts.out) / path.stem
+    written = []
+
+    novoinfo, novo = read_novo_file(path)
+    written.append(write_frame(novo, f"{out}_scans", opts.format))
+
+    if opts.figures != "none":
+        columns = opts.columns or novoinfo["parameters"][:1]
+        for column in columns:
+            fig = plot_time_column(novo, column, novoinfo["frequencies"])
+            name = "".join(c if c.isalnum() else "_" for c in column).strip("_")
+            written.append(write_figure(fig, f"{out}_{name}", opts.figures))
+
+    return written
+
+
+def process_xrd(path, opts):
+    """Parse a JANA M41 or FullProf PCR file into a flat table row."""
+    import pandas as pd
+
+    from .xrd.parseM41 import readm41
+    from .xrd.parsePCR import readpcr
+
+    path = pathlib.Path(path)
+    suffix = path.suffix.lower()
+    if suffix == ".m41":
+        parsed = readm41(path)
+    elif suffix == ".pcr":
+        parsed = readpcr(path)
+    else:
+        raise ValueError(f"Unknown refinement file type '{suffix}'.")
+
+    row = pd.json_normalize(parsed, sep=".")
+    row.insert(0, "file", str(path))
+    row.insert(1, "kind", suffix[1:])
+    return row
+
+
+PROCESSORS = {
+    "qcm": process_qcm,
+    "dvs": process_dvs,
+    "ide": process_ide,
+    "xrd": process_xrd,
+}
+
+
+def _run_one(command, path, opts):
+    """Run a processor on a single path, trapping any error."""
+    if getattr(opts, "profile", False):
+        from .common import profile
+        with profile() as report:
+            outcome = _run_one_unprofiled(command, path, opts)
+        return outcome + (report, )
+    return _run_one_unprofiled(command, path, opts) + (None, )
+
+
+def _run_one_unprofiled(command, path, opts):
+    try:
+        return path, PROCESSORS[command](path, opts), None
+    except Exception:  # pylint: disable=broad-except
+        return path, None, traceback.format_exc()
+
+
+def run_batch(command, paths, opts):
+    """
+    Process each path with the chosen instrument processor.
+
+    Paths are distributed over `opts.jobs` worker processes. Returns a
+    list of (path, result, error, profile report) tuples in the order
+    of the input paths. The report is None unless `opts.profile` is set.
+    """
+    from .common import progress_map
+
+    pathlib.Path(opts.out).mkdir(parents=True, exist_ok=True)
+    return progress_map(
+        functools.partial(_run_file, command, opts),
+        _input_files(paths),
+        jobs=opts.jobs,
+        desc=command,
+    )
+
+
+def _input_files(paths):
+    """Describe input paths as scanned files, folders counting the size of their content."""
+    from .common import ScannedFile
+
+    files = []
+    for path in paths:
+        path = pathlib.Path(path)
+        if path.is_dir():
+            size = sum(p.stat().st_size for p in path.iterdir() if p.is_file())
+        else:
+            size = path.stat().st_size if path.exists() else 0
+        files.append(ScannedFile(str(path), path.name, size, None))
+    return files
+
+
+def _run_file(command, opts, file):
+    return _run_one(command, file.path, opts)
+
+
+def _collect_xrd(results, opts):
+    """Join the per-file xrd rows into one table per file kind."""
+    import pandas as pd
+
+    rows = [res for _, res, err, _ in results if err is None]
+    if not rows:
+        return []
+    table = pd.concat(rows, ignore_index=True)
+    written = []
+    for kind, part in table.groupby("kind"):
+        part = part.dropna(axis=1, how="all").set_index("file")
+        written.append(write_frame(part, pathlib.Path(opts.out) / f"xrd_{kind}", opts.format))
+    return written
+
+
+def _add_common(sub):
+    sub.add_argument("paths", nargs="+", help="input files or folders")
+    sub.add_argument("-o", "--out", default="homeproc_out", help="output folder")
+    sub.add_argument("-j", "--jobs", type=int, default=1, help="worker processes (0 for all cores)")
+    sub.add_argument("-f", "--format", choices=FRAME_FORMATS, default="csv", help="table output format")
+    sub.add_argument("--figures", choices=FIGURE_FORMATS, default="none", help="figure output format")
+    sub.add_argument("--profile", action="store_true", help="print a report of time spent per stage")
+
+
+def build_parser():
+    """Build the argument parser for the command line interface."""
+    parser = argparse.ArgumentParser(prog="homeproc", description=__doc__.split("\n\n")[0].strip())
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    qcm = subparsers.add_parser("qcm", help="QCM trace folders")
+    _add_common(qcm)
+    qcm.add_argument("--trace-format", type=int, choices=(1, 2), default=2)
+    qcm.add_argument("--minpoint", type=float, default=None)
+    qcm.add_argument("--maxpoint", type=float, default=None)
+    qcm.add_argument("--npoints", type=int, default=2000)
+    qcm.add_argument("--pwidth", type=float, default=10)
+    qcm.add_argument("--pheight", type=float, default=0.1)
+    qcm.add_argument(
+        "--denoise", nargs=2, type=int, default=None, metavar=("WINDOW", "ORDER"), help="smooth traces"
+    )
+    qcm.add_argument("--track", action="store_true", help="track the resonance between traces")
+    qcm.add_argument("--markers", default=None, help="marker file to plot alongside the traces")
+
+    dvs = subparsers.add_parser("dvs", help="DVS txt files")
+    _add_common(dvs)
+    dvs.add_argument("--pcol", default="p_rel", help="pressure column key in dvs.cols")
+    dvs.add_argument("--mcol", default="mass", help="mass column key in dvs.cols")
+    dvs.add_argument("--chp-col", default="p_rel", help="column key used for change points")
+    dvs.add_argument(
+        "--chp-method", choices=("window", "binary_segment", "derivative", "targets"), default="window"
+    )
+    dvs.add_argument(
+        "--targets", nargs="+", default=["p_rel_tgt"], help="target column keys for --chp-method targets"
+    )
+    dvs.add_argument("--pen", type=float, default=0.5)
+    dvs.add_argument("--width", type=int, default=300)
+    dvs.add_argument("--log", action="store_true")
+    dvs.add_argument("--offspts", type=int, default=10)
+    dvs.add_argument("--meanpts", type=int, default=20)
+    dvs.add_argument("--extra-cols", nargs="*", default=None, help="extra column keys to average")
+
+    ide = subparsers.add_parser("ide", help="Novocontrol output files")
+    _add_common(ide)
+    ide.add_argument("--columns", nargs="*", default=None, help="parameters to plot against time")
+
+    xrd = subparsers.add_parser("xrd", help="JANA M41 and FullProf PCR files")
+    _add_common(xrd)
+
+    bench = subparsers.add_parser("bench", help="benchmark suite on synthetic data")
+    bench.add_argument("names", nargs="*", help="benchmarks to run (default all)")
+    bench.add_argument("--scales", nargs="+", type=int, default=[1, 4, 16])
+    bench.add_argument("--repeat", type=int, default=3)
+    bench.add_argument("--save", default=None, help="csv file to save results to")
+    bench.add_argument("--compare", default=None, help="csv file of a previous run to compare to")
+
+    catalogue = subparsers.add_parser("catalogue", help="index of DVS and Novocontrol file headers")
+    catalogue.add_argument("db", help="SQLite catalogue file")
+    catalogue.add_argument("paths", nargs="*", help="folders to scan for new or changed files")
+    catalogue.add_argument("--pattern", default="*.txt", help="file name pattern")
+    catalogue.add_argument("-j", "--jobs", type=int, default=1, help="worker processes (0 for all cores)")
+    catalogue.add_argument("--sample", default=None, help="sample name (SQL LIKE pattern)")
+    catalogue.add_argument("--adsorbate", default=None, help="adsorbate (SQL LIKE pattern)")
+    catalogue.add_argument("--kind", choices=("dvs", "ide"), default=None)
+    catalogue.add_argument("--start", default=None, help="earliest experiment date")
+    catalogue.add_argument("--end", default=None, help="latest experiment date")
+
+    return parser
+
+
+def run_bench(opts):
+    """Run the benchmark suite from the command line."""
+    from .bench import compare_benchmarks
+    from .bench import run_benchmarks
+    from .bench import save_benchmarks
+
+    results = run_benchmarks(opts.names, scales=opts.scales, repeat=opts.repeat)
+    if opts.save:
+        print(save_benchmarks(results, opts.save))
+    if opts.compare:
+        print(compare_benchmarks(opts.compare, results).to_string())
+    return 0
+
+
+def run_catalogue(opts):
+    """Update a catalogue from the command line and print the matching files."""
+    from .catalogue import Catalogue
+
+    with Catalogue(opts.db) as cat:
+        if opts.paths:
+            cat.scan(opts.paths, pattern=opts.pattern, jobs=opts.jobs)
+        found = cat.query(
+            sample=opts.sample,
+            adsorbate=opts.adsorbate,
+            kind=opts.kind,
+            start=opts.start,
+            end=opts.end,
+        )
+    print(found[["date", "kind", "sample", "adsorbate", "path"]].to_string(index=False))
+    return 0
+
+
+def main(argv=None):
+    """Entry point of the `homeproc` command."""
+    opts = build_parser().parse_args(argv)
+    if opts.command == "bench":
+        return run_bench(opts)
+    if opts.command == "catalogue":
+        return run_catalogue(opts)
+
+    results = run_batch(opts.command, opts.paths, opts)
+
+    failed = 0
+    for path, _, err, _ in results:
+        if err is not None:
+            failed += 1
+            print(f"FAILED {path}\n{err}", file=sys.stderr)
+
+    if opts.command == "xrd":
+        written = _collect_xrd(results, opts)
+    else:
+        written = [p for _, res, err, _ in results if err is None for p in res]
+
+    if opts.profile:
+        from .common import ProfileReport
+        report = ProfileReport()
+        for *_, part in results:
+            report.merge(part)
+        print(report, file=sys.stderr)
+
+    for path in written:
+        if path is not None:
+            print(path)
+
+    print(f"{len(results) - failed}/{len(results)} inputs processed.", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,4 +9,8 @@ Module comprising general utilities.
 # isort:skip_file
 
 from .graphing import *
-from .python import *
\ No newline at end of file
+from .python import *
+from .profiling import *
+from .progress import *
+from .tail import *
+from .pyramid import *
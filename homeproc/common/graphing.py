@@ -7,9 +7,16 @@ Module comprising general plotting utilities.
 
 __all__ = [
     "plot_transient",
+    "export_figures",
 ]
 
+import pathlib
+
 import plotly.graph_objects as go
+import plotly.io as pio
+
+from .progress import n_jobs
+from .progress import parallel_map
 
 
 def plot_transient(data, y1=None, y2=None, y3=None, y4=None):
@@ -106,3 +113,46 @@ def plot_transient(data, y1=None, y2=None, y3=None, y4=None):
         data=pdata,
         layout=layout,
     )
+
+
+def _export_figure(fig, path, fmt, kwargs):
+    pio.write_image(fig, path, format=fmt, validate=False, **kwargs)
+    return path
+
+
+def export_figures(figures, paths, fmt="png", jobs=1, **kwargs):
+    """
+    Render plotly figures to static image files, in parallel if requested.
+
+    Figures are sent to the worker processes as plain dictionaries and each
+    worker keeps its own kaleido renderer for all the figures it exports.
+
+    Parameters
+    ----------
+    figures : list of Figure
+        Plotly figures (or figure dictionaries).
+    paths : list of str
+        Output paths, the `fmt` suffix is added.
+    fmt : str
+        Image format supported by kaleido, e.g. "png" or "svg".
+    jobs : int
+        Number of processes (0 for all cores).
+    kwargs
+        Passed to `plotly.io.write_image` (width, height, scale).
+
+    Returns
+    -------
+    list of Path
+        Files written.
+    """
+    figures = [fig.to_dict() if hasattr(fig, "to_dict") else fig for fig in figures]
+    paths = [pathlib.Path(path).with_suffix(f".{fmt}") for path in paths]
+    return parallel_map(
+        _export_figure,
+        figures,
+        paths,
+        [fmt] * len(figures),
+        [kwargs] * len(figures),
+        jobs=jobs,
+        chunksize=max(1, len(figures) // (4 * n_jobs(jobs))),
+    )
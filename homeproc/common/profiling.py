@@ -0,0 +1,280 @@
+"""
+Module comprising opt-in stage profiling of processing functions.
+
+Functions mark their stages with `stage` (or the `profiled` decorator)
+and attach work counters with `record`. Nothing is collected unless
+a `profile` context is active, in which case every stage reports its
+wall time, bytes read, rows parsed and memory high-water marks.
+
+    with profile() as report:
+        traces = read_tracefiles(folder)
+    print(report)
+
+@author: Dr. Paul Iacomi
+@date: Oct 2026
+"""
+
+__all__ = [
+    "profile",
+    "profiled",
+    "stage",
+    "record",
+    "is_profiling",
+    "ProfileReport",
+]
+
+import functools
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import psutil
+
+try:
+    import resource
+except ImportError:  # windows
+    resource = None
+
+_REPORT = None
+_LOCAL = threading.local()
+
+
+class _NullStage:
+    """Stage returned when profiling is disabled, does nothing."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+def _peak_rss(process):
+    """High-water mark of the resident memory of the process, in bytes."""
+    if resource is None:
+        info = process.memory_info()
+        return getattr(info, "peak_wset", info.rss)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on linux, bytes on macos
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class StageStats:
+    """Accumulated counters of a single named stage."""
+    __slots__ = ("calls", "wall", "nbytes", "rows", "rss_max", "py_peak")
+
+    def __init__(self):
+        self.calls = 0
+        self.wall = 0.0
+        self.nbytes = 0
+        self.rows = 0
+        self.rss_max = 0
+        self.py_peak = 0
+
+    def merge(self, other):
+        self.calls += other.calls
+        self.wall += other.wall
+        self.nbytes += other.nbytes
+        self.rows += other.rows
+        self.rss_max = max(self.rss_max, other.rss_max)
+        self.py_peak = max(self.py_peak, other.py_peak)
+
+
+class ProfileReport:
+    """Collection of stage statistics, keyed by the nested stage path."""
+
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.stages = {}
+        self._lock = threading.Lock()
+        self._process = psutil.Process(os.getpid())
+
+    def _stats(self, name):
+        with self._lock:
+            stats = self.stages.get(name)
+            if stats is None:
+                stats = self.stages[name] = StageStats()
+            return stats
+
+    def merge(self, other):
+        """Add the stages of another report (e.g. from a worker process)."""
+        for name, stats in other.stages.items():
+            self._stats(name).merge(stats)
+        return self
+
+    def __getstate__(self):
+        return {"trace_memory": self.trace_memory, "stages": self.stages}
+
+    def __setstate__(self, state):
+        self.__init__(state["trace_memory"])
+        self.stages = state["stages"]
+
+    def to_frame(self):
+        """Return the report as a dataframe, one row per stage."""
+        import pandas as pd
+
+        rows = {
+            name: {
+                "calls": s.calls,
+                "wall [s]": s.wall,
+                "bytes": s.nbytes,
+                "rows": s.rows,
+                "MB/s": s.nbytes / s.wall / 1e6 if s.wall else 0,
+                "rows/s": s.rows / s.wall if s.wall else 0,
+                "rss_max [MB]": s.rss_max / 1e6,
+                "py_peak [MB]": s.py_peak / 1e6,
+            }
+            for name, s in self.stages.items()
+        }
+        frame = pd.DataFrame.from_dict(rows, orient="index")
+        frame.index.name = "stage"
+        return frame
+
+    def __str__(self):
+        if not self.stages:
+            return "Empty profile report."
+        return self.to_frame().to_string(float_format="{:.4g}".format)
+
+
+def _stack():
+    stack = getattr(_LOCAL, "stack", None)
+    if stack is None:
+        stack = _LOCAL.stack = []
+    return stack
+
+
+class _Stage:
+    """Active stage, timing its body and folding memory marks into its parents."""
+    __slots__ = ("report", "name", "stats", "start", "peak")
+
+    def __init__(self, report, name):
+        self.report = report
+        self.name = name
+
+    def __enter__(self):
+        stack = _stack()
+        if stack:
+            self.name = f"{stack[-1].name}/{self.name}"
+        self.stats = self.report._stats(self.name)
+        self.peak = 0
+        if self.report.trace_memory:
+            if stack:
+                parent = stack[-1]
+                parent.peak = max(parent.peak, tracemalloc.get_traced_memory()[1])
+            if hasattr(tracemalloc, "reset_peak"):
+                # python 3.9+, before that peaks are since the profile started
+                tracemalloc.reset_peak()
+        stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        stack = _stack()
+        stack.pop()
+
+        stats = self.stats
+        stats.calls += 1
+        stats.wall += elapsed
+        stats.rss_max = max(stats.rss_max, _peak_rss(self.report._process))
+        if self.report.trace_memory:
+            self.peak = max(self.peak, tracemalloc.get_traced_memory()[1])
+            stats.py_peak = max(stats.py_peak, self.peak)
+            if stack:
+                stack[-1].peak = max(stack[-1].peak, self.peak)
+        return False
+
+
+def is_profiling():
+    """Whether a profile is currently being collected."""
+    return _REPORT is not None
+
+
+def stage(name):
+    """
+    Context manager marking a processing stage.
+
+    Stages nest, so a stage opened within another is reported as
+    "outer/inner". When no profile is active this returns a shared no-op.
+    """
+    if _REPORT is None:
+        return _NULL_STAGE
+    return _Stage(_REPORT, name)
+
+
+def record(rows=0, nbytes=0, path=None):
+    """
+    Add work counters to the innermost active stage.
+
+    If a `path` is given, its size is added to the bytes read. Does
+    nothing when no profile is active.
+    """
+    if _REPORT is None:
+        return
+    stack = _stack()
+    if not stack:
+        return
+    if path is not None:
+        nbytes += os.path.getsize(path)
+    stats = stack[-1].stats
+    stats.rows += rows
+    stats.nbytes += nbytes
+
+
+def profiled(name=None):
+    """Decorator wrapping a whole function in a stage (named after the function by default)."""
+
+    def decorator(func):
+        stage_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _REPORT is None:
+                return func(*args, **kwargs)
+            with _Stage(_REPORT, stage_name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+@contextmanager
+def profile(trace_memory=False):
+    """
+    Collect stage timings for all code run within the context.
+
+    Parameters
+    ----------
+    trace_memory : bool
+        Also record the peak Python memory of each stage through
+        `tracemalloc`, which slows down allocation-heavy code.
+        The peak RSS of the process by the end of each stage (its
+        high-water mark so far) is always recorded.
+
+    Yields
+    ------
+    ProfileReport
+        The report being filled, complete once the context exits.
+    """
+    global _REPORT  # pylint: disable=global-statement
+
+    previous = _REPORT
+    report = ProfileReport(trace_memory=trace_memory)
+    started_tracing = trace_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    _REPORT = report
+    try:
+        yield report
+    finally:
+        _REPORT = previous
+        if started_tracing:
+            tracemalloc.stop()
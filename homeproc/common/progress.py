@@ -0,0 +1,177 @@
+"""
+Module comprising file listing and progress reporting for batch loaders.
+
+A folder is listed once with `os.scandir`, keeping the size and the
+parsed timestamp of each file so that loaders know the total amount of
+work up front. `progress_map` then applies a reader to every file, in a
+process pool if requested, while a single progress bar in the parent
+process reports files/s and MB/s aggregated over all workers.
+
+`parallel_map` is the same dispatch without files or progress, for any
+other work split across processes (or threads): `jobs` is the number of
+workers, 0 for all cores, and a single job runs in this process.
+
+@author: Dr. Paul Iacomi
+@date: Oct 2026
+"""
+
+__all__ = [
+    "ScannedFile",
+    "scan_files",
+    "Progress",
+    "progress_map",
+    "parallel_map",
+    "n_jobs",
+]
+
+import fnmatch
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import as_completed
+
+from tqdm import tqdm
+
+ScannedFile = namedtuple("ScannedFile", ["path", "name", "size", "timestamp"])
+
+
+def scan_files(folder, pattern="*.*", key=None):
+    """
+    List the files in a folder once, sorted by their parsed timestamp.
+
+    Parameters
+    ----------
+    folder : str or path
+        Folder to list, not recursive.
+    pattern : str
+        Glob-style pattern the file names should match.
+    key : callable, optional
+        Function parsing a timestamp (or any sortable value) from the
+        file name. Files are sorted by name if not given.
+
+    Returns
+    -------
+    list of ScannedFile
+        Path, name, size in bytes and parsed timestamp of each file.
+    """
+    files = []
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            if not entry.is_file() or not fnmatch.fnmatch(entry.name, pattern):
+                continue
+            stamp = key(entry.name) if key else entry.name
+            files.append(ScannedFile(entry.path, entry.name, entry.stat().st_size, stamp))
+    files.sort(key=lambda f: f.timestamp)
+    return files
+
+
+class Progress:
+    """
+    Progress bar over a known number of files and bytes.
+
+    Only the parent process should update it, workers report back
+    through their results (see `progress_map`).
+    """
+
+    def __init__(self, total, total_bytes=None, desc=None, disable=None):
+        self.files = 0
+        self.nbytes = 0
+        self.total_bytes = total_bytes
+        self.start = time.perf_counter()
+        self.bar = tqdm(total=total, desc=desc, unit="file", disable=disable)
+
+    def update(self, files=1, nbytes=0):
+        """Record completed files and the bytes they contained."""
+        self.files += files
+        self.nbytes += nbytes
+        self.bar.set_postfix_str(f"{self.mbps:.2f} MB/s", refresh=False)
+        self.bar.update(files)
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.start
+
+    @property
+    def files_per_s(self):
+        return self.files / self.elapsed if self.elapsed else 0
+
+    @property
+    def mbps(self):
+        return self.nbytes / self.elapsed / 1e6 if self.elapsed else 0
+
+    def close(self):
+        self.bar.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def __repr__(self):
+        return (
+            f"{self.files} files, {self.nbytes / 1e6:.2f} MB in {self.elapsed:.2f} s "
+            f"({self.files_per_s:.1f} files/s, {self.mbps:.2f} MB/s)"
+        )
+
+
+def n_jobs(jobs):
+    """Number of workers for a `jobs` argument, 0 (or less) meaning all cores."""
+    return jobs if jobs > 0 else os.cpu_count()
+
+
+def parallel_map(func, *iterables, jobs=1, chunksize=1, executor=ProcessPoolExecutor):
+    """
+    Apply `func` to the items of the iterables, as `map`, in a pool of workers.
+
+    With a single job (or item) the calls run in this process, otherwise in
+    an `executor` pool of up to `jobs` workers (0 for all cores), in which
+    case `func` and the items must be picklable for processes. `chunksize`
+    items are sent to a process pool at a time. Returns the list of results
+    in order.
+    """
+    args = list(zip(*iterables))
+    jobs = n_jobs(jobs)
+    if jobs == 1 or len(args) < 2:
+        return [func(*arg) for arg in args]
+    with executor(max_workers=min(jobs, len(args))) as pool:
+        return list(pool.map(func, *zip(*args), chunksize=chunksize))
+
+
+def progress_map(func, files, jobs=1, desc=None, disable=None, on_result=None):
+    """
+    Apply `func` to each scanned file, reporting progress.
+
+    With `jobs` > 1 (or 0 for all cores) the calls run in a process
+    pool, `func` must then be picklable. Results are returned in the
+    order of `files` whatever the order of completion. If `on_result`
+    is given, it is instead called with the index and result of each
+    file as soon as it is available, and nothing is kept.
+    """
+    files = list(files)
+    total_bytes = sum(f.size for f in files)
+    results = [None] * len(files) if on_result is None else None
+    jobs = n_jobs(jobs)
+
+    def store(ind, result):
+        if on_result is None:
+            results[ind] = result
+        else:
+            on_result(ind, result)
+
+    with Progress(len(files), total_bytes, desc=desc, disable=disable) as progress:
+        if jobs == 1 or len(files) < 2:
+            for ind, file in enumerate(files):
+                store(ind, func(file))
+                progress.update(1, file.size)
+        else:
+            with ProcessPoolExecutor(max_workers=min(jobs, len(files))) as pool:
+                futures = {pool.submit(func, file): ind for ind, file in enumerate(files)}
+                for future in as_completed(futures):
+                    ind = futures[future]
+                    store(ind, future.result())
+                    progress.update(1, files[ind].size)
+
+    return results
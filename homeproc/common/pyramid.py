@@ -0,0 +1,249 @@
+"""
+Module comprising multi-resolution summaries of long time series.
+
+A `Pyramid` keeps, for levels k from `base` up, the min, max, sum and
+count of every column over bins of 2^k consecutive rows. Bins are
+aligned on the row number, so that appending rows only changes the last
+bin of each level and adds new ones. Each level is a flat binary file of
+fixed size records, appended to in place and memory-mapped for queries.
+
+A query for a time window and a number of pixels uses the finest level
+with no more bins than pixels, reading only the bins in the window.
+
+@author: Dr. Paul Iacomi
+@date: Oct 2026
+"""
+
+__all__ = [
+    "Pyramid",
+]
+
+import json
+import pathlib
+
+import numpy as np
+import pandas as pd
+
+
+def _reduce(starts, start, end, count, vmin, vmax, vsum):
+    """Aggregate consecutive records (or rows) between the `starts` positions."""
+    ends = np.append(starts[1:], len(start)) - 1
+    return (
+        start[starts],
+        end[ends],
+        np.add.reduceat(count, starts),
+        np.fmin.reduceat(vmin, starts),
+        np.fmax.reduceat(vmax, starts),
+        np.add.reduceat(vsum, starts),
+    )
+
+
+class Pyramid:
+    """
+    Min/max/mean pyramid of the numeric columns of a time indexed series.
+
+    Parameters
+    ----------
+    folder : str
+        Folder of an existing pyramid, see `create`.
+    """
+
+    META = "pyramid.json"
+
+    def __init__(self, folder):
+        self.folder = pathlib.Path(folder)
+        with open(self.folder / self.META) as file:
+            self.meta = json.load(file)
+        ncols = len(self.columns)
+        self.dtype = np.dtype([
+            ("start", "i8"),
+            ("end", "i8"),
+            ("count", "i8", (ncols, )),
+            ("min", "f8", (ncols, )),
+            ("max", "f8", (ncols, )),
+            ("sum", "f8", (ncols, )),
+        ])
+
+    @classmethod
+    def create(cls, folder, columns, index_name=None, base=4, depth=20):
+        """
+        Create an empty pyramid.
+
+        Parameters
+        ----------
+        folder : str
+            Folder to store the levels in.
+        columns : list
+            Columns summarized.
+        index_name : str, optional
+            Name of the time index of the summaries.
+        base : int
+            Finest level, bins of 2^base rows. Finer windows are better
+            read from the data itself.
+        depth : int
+            Number of levels.
+        """
+        folder = pathlib.Path(folder)
+        folder.mkdir(parents=True, exist_ok=True)
+        meta = {
+            "columns": [str(c) for c in columns],
+            "index_name": index_name,
+            "base": base,
+            "depth": depth,
+            "nrows": 0,
+            "nbins": [0] * depth,
+            "end": None,
+        }
+        for level in range(depth):
+            open(folder / cls._filename(base + level), "wb").close()
+        with open(folder / cls.META, "w") as file:
+            json.dump(meta, file)
+        return cls(folder)
+
+    @staticmethod
+    def _filename(k):
+        return f"level_{k:02d}.bin"
+
+    @property
+    def columns(self):
+        return self.meta["columns"]
+
+    @property
+    def levels(self):
+        """Decimation exponents k of the levels, bins of 2^k rows."""
+        return list(range(self.meta["base"], self.meta["base"] + self.meta["depth"]))
+
+    @property
+    def nrows(self):
+        return self.meta["nrows"]
+
+    @property
+    def end(self):
+        """Last time summarized."""
+        return None if self.meta["end"] is None else pd.Timestamp(self.meta["end"], unit="ns")
+
+    def level(self, k):
+        """Records of a level as a (read-only) memory-mapped structured array."""
+        nbins = self.meta["nbins"][k - self.meta["base"]]
+        if nbins == 0:
+            return np.empty(0, dtype=self.dtype)
+        return np.memmap(self.folder / self._filename(k), dtype=self.dtype, mode="r", shape=(nbins, ))
+
+    def append(self, data):
+        """
+        Summarize rows appended to the series.
+
+        Only the last bin of each level is rewritten, along with the new ones.
+        """
+        if len(data) == 0:
+            return self
+        times = pd.DatetimeIndex(data.index).as_unit("ns").asi8
+        if self.meta["end"] is not None and times[0] < self.meta["end"]:
+            raise ValueError("Rows can only be appended after the end of the pyramid.")
+        if np.any(np.diff(times) < 0):
+            raise ValueError("Appended rows should be sorted by time.")
+
+        values = data[self.columns].to_numpy(dtype=float)
+        valid = np.isfinite(values)
+        stats = (
+            times,
+            times,
+            valid.astype(np.int64),
+            np.where(valid, values, np.nan),
+            np.where(valid, values, np.nan),
+            np.where(valid, values, 0),
+        )
+        ids = (self.nrows + np.arange(len(data))) >> self.meta["base"]
+
+        for pos, k in enumerate(self.levels):
+            if pos:
+                ids = ids >> 1
+            starts = np.flatnonzero(np.diff(ids, prepend=-1))
+            stats = _reduce(starts, *stats)
+            ids = ids[starts]
+
+            records = np.empty(len(ids), dtype=self.dtype)
+            for name, stat in zip(self.dtype.names, stats):
+                records[name] = stat
+            nbins = self.meta["nbins"][pos]
+            first = int(ids[0])
+            if first < nbins:
+                # merge the partial last bin stored with the first new one
+                last = self.level(k)[first]
+                records["start"][0] = last["start"]
+                records["count"][0] += last["count"]
+                records["min"][0] = np.fmin(records["min"][0], last["min"])
+                records["max"][0] = np.fmax(records["max"][0], last["max"])
+                records["sum"][0] += last["sum"]
+
+            with open(self.folder / self._filename(k), "r+b") as file:
+                file.seek(first * self.dtype.itemsize)
+                file.write(records.tobytes())
+            self.meta["nbins"][pos] = first + len(records)
+
+        self.meta["nrows"] += len(data)
+        self.meta["end"] = int(times[-1])
+        with open(self.folder / self.META, "w") as file:
+            json.dump(self.meta, file)
+        return self
+
+    def rows(self, start=None, end=None):
+        """Approximate number of rows of the series between two times."""
+        window = self._window(self.level(self.meta["base"]), start, end)
+        return (window.stop - window.start) << self.meta["base"]
+
+    @staticmethod
+    def _window(records, start, end):
+        """Slice of the bins overlapping a time range."""
+        lo = 0 if start is None else np.searchsorted(records["end"], pd.Timestamp(start).value)
+        hi = len(records) if end is None else np.searchsorted(records["start"], pd.Timestamp(end).value, side="right")
+        return slice(lo, hi)
+
+    def query(self, start=None, end=None, pixels=1000, how="minmax", columns=None):
+        """
+        Summary of a time window in at most about `pixels` bins.
+
+        Parameters
+        ----------
+        start, end : datetime, optional
+            Time window.
+        pixels : int
+            Maximum number of bins.
+        how : str
+            "minmax" gives the min at the start of each bin and the max at
+            its end, so that lines drawn through them cover the envelope
+            of the data, "mean" gives the mean of each bin.
+        columns : list, optional
+            Columns to return.
+
+        Returns
+        -------
+        DataFrame
+            Time indexed summary, e.g. for `plot_transient`.
+        """
+        columns = self.columns if columns is None else [str(c) for c in columns]
+        cols = [self.columns.index(c) for c in columns]
+        for k in self.levels:
+            records = self.level(k)
+            window = self._window(records, start, end)
+            if window.stop - window.start <= pixels:
+                break
+        records = np.asarray(records[window])
+
+        if how == "mean":
+            with np.errstate(invalid="ignore", divide="ignore"):
+                values = records["sum"][:, cols] / records["count"][:, cols]
+            times = records["start"]
+        elif how == "minmax":
+            values = np.empty((2 * len(records), len(cols)))
+            values[0::2] = records["min"][:, cols]
+            values[1::2] = records["max"][:, cols]
+            times = np.column_stack((records["start"], records["end"])).ravel()
+        else:
+            raise ValueError(f"Unknown summary '{how}', choose from 'minmax' or 'mean'.")
+
+        index = pd.DatetimeIndex(times.astype("datetime64[ns]"), name=self.meta["index_name"])
+        return pd.DataFrame(values, index=index, columns=columns)
+
+    def __repr__(self):
+        return f"Pyramid('{self.folder}', {self.nrows} rows, levels 2^{self.levels[0]} to 2^{self.levels[-1]})"
@@ -0,0 +1,140 @@
+"""
+Module comprising incremental reading of growing data files.
+
+A `TailReader` remembers how far a file has been read. Each `poll` only
+reads the bytes appended since, keeps a trailing partial line for the
+next poll, and parses the complete lines into a dataframe. Subclasses
+handle the header of each file format and the conversion of new rows.
+
+@author: Dr. Paul Iacomi
+@date: Oct 2026
+"""
+
+__all__ = [
+    "TailReader",
+]
+
+import abc
+import io
+import os
+import pathlib
+
+import pandas as pd
+
+
+class TailReader(abc.ABC):
+    """
+    Follow a growing tab separated file with a text header.
+
+    Parameters
+    ----------
+    path : str
+        File to follow.
+    out : str, optional
+        CSV file the parsed rows are also appended to.
+    keep : bool
+        Whether to keep all parsed rows in memory (see `data`).
+    """
+
+    encoding = "utf-8"
+    sep = "\t"
+    header_bytes = 1 << 16
+    # start of the file compared at each poll to detect it being rewritten
+    HEAD_BYTES = 1024
+
+    def __init__(self, path, out=None, keep=True):
+        self.path = pathlib.Path(path)
+        self.out = pathlib.Path(out) if out else None
+        self.keep = keep
+        self.reset()
+
+    def reset(self):
+        """Forget everything read, the next poll starts from the beginning."""
+        self.offset = 0
+        self.inode = None
+        self.head = b""
+        self.pending = b""
+        self.columns = None
+        self.chunks = []
+        self._data = None
+
+    @abc.abstractmethod
+    def parse_header(self, lines):
+        """
+        Parse the header from the first complete lines of the file.
+
+        Returns the number of lines it spans (column names included),
+        after setting `columns`, or None if it is not complete yet.
+        """
+
+    def convert(self, rows):
+        """Convert newly parsed (non empty) rows, e.g. to set a time index."""
+        return rows
+
+    def _replaced(self, f, size):
+        """Whether the file was truncated, replaced or rewritten since the last poll."""
+        if size < self.offset or (self.inode is not None and os.fstat(f.fileno()).st_ino != self.inode):
+            return True
+        f.seek(0)
+        return f.read(len(self.head)) != self.head
+
+    def _read_appended(self):
+        with open(self.path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if self.offset and self._replaced(f, size):
+                self.reset()
+            f.seek(self.offset)
+            new = f.read()
+            self.inode = os.fstat(f.fileno()).st_ino
+        if len(self.head) < self.HEAD_BYTES:
+            self.head += new[:self.HEAD_BYTES - len(self.head)]
+        self.offset += len(new)
+        return new
+
+    def poll(self):
+        """Read the rows appended since the last poll."""
+        # read first, a replaced file resets the pending partial line
+        new = self._read_appended()
+        self.pending += new
+
+        if self.columns is None:
+            head = self.pending[:self.header_bytes].split(b"\n")[:-1]
+            nlines = self.parse_header([line.decode(self.encoding).rstrip("\r") for line in head])
+            if nlines is None:
+                return pd.DataFrame()
+            self.pending = self.pending[sum(len(line) + 1 for line in head[:nlines]):]
+
+        # a partial last line is kept for the next poll
+        end = self.pending.rfind(b"\n") + 1
+        complete, self.pending = self.pending[:end], self.pending[end:]
+        if not complete:
+            return pd.DataFrame()
+
+        rows = pd.read_csv(
+            io.BytesIO(complete),
+            sep=self.sep,
+            header=None,
+            names=self.columns,
+            encoding=self.encoding,
+        )
+        rows = self.convert(rows)
+
+        if self.keep:
+            self.chunks.append(rows)
+            self._data = None
+        if self.out is not None:
+            rows.to_csv(self.out, mode="a", header=not self.out.exists())
+        return rows
+
+    @property
+    def data(self):
+        """All rows read so far."""
+        if self._data is None:
+            if not self.chunks:
+                return pd.DataFrame()
+            self._data = pd.concat(self.chunks)
+            self.chunks = [self._data]
+        return self._data
+
+    def __repr__(self):
+        return f"{type(self).__name__}('{self.path}', {self.offset} bytes read)"
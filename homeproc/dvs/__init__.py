@@ -8,4 +8,6 @@ Module comprising processing of DVS data files.
 # flake8: noqa
 # isort:skip_file
 
-from .dvsproc import *
\ No newline at end of file
+from .dvsproc import *
+from .online import *
+from .kinetics import *
@@ -6,8 +6,10 @@ Module comprising processing of DVS data files.
 """
 
 import datetime
+import functools
 import pathlib as pth
 from itertools import cycle
+from itertools import product
 
 import numpy as np
 import pandas as pd
@@ -17,10 +19,17 @@ from dateutil import parser
 from matplotlib import pyplot as plt
 
 from ..common import pairwise, plot_transient
+from ..common import profiled, record, stage
+from ..common import parallel_map, progress_map, scan_files
 
 __all__ = [
     'read_dvs_file',
+    'read_dvs_files',
+    'read_dvs_header',
+    'parse_dvs_header',
     'get_change_points',
+    'sweep_change_points',
+    'get_steps',
     'calc_isotherm_data',
     'trim_meta',
     'get_loading',
@@ -74,27 +83,24 @@ cols = dict(
 )
 
 
+@profiled()
 def read_dvs_file(path, offset=20):
     """Read a DVS 'txt' file and return its metadata and data."""
 
     # Read metadata
-    with open(path, encoding="cp1252") as f:
-        f.readline()
-        dvsinfo = {}
-        for i, line in enumerate(f.readlines()):
-            key, val = map(str.strip, line.split(':', 1))
-            dvsinfo[key] = val
-            if i > 14:
-                break
+    with stage("metadata"):
+        dvsinfo = read_dvs_header(path)
 
     # Read data
-    dvsdata = pd.read_csv(
-        path,
-        encoding="cp1252",
-        delimiter="\\t",
-        skiprows=41,
-        engine='python',
-    )
+    with stage("read"):
+        dvsdata = pd.read_csv(
+            path,
+            encoding="cp1252",
+            delimiter="\\t",
+            skiprows=41,
+            engine='python',
+        )
+        record(rows=len(dvsdata), path=path)
 
     # Add some other metadata
     # columns
@@ -108,13 +114,48 @@ def read_dvs_file(path, offset=20):
     dvsinfo['activation_temp [C]'] = get_act_T(dvsdata, dvsinfo['columns']['t_heat'])
 
     # Reindex data
-    dvsdata = dvsdata.set_index(
-        file_created + pd.to_timedelta(dvsdata[dvsinfo['columns']['time']], unit='min')
-    )
+    with stage("timestamps"):
+        dvsdata = dvsdata.set_index(
+            file_created + pd.to_timedelta(dvsdata[dvsinfo['columns']['time']], unit='min')
+        )
 
     return dvsinfo, dvsdata
 
 
+def _read_scanned_dvs(file, offset):
+    return read_dvs_file(file.path, offset=offset)
+
+
+def read_dvs_files(folder, pattern="*.txt", offset=20, jobs=1):
+    """
+    Read all DVS 'txt' files of a folder, sorted by name.
+
+    Files are read in a process pool if `jobs` > 1 (0 for all cores),
+    with a progress bar. Returns a list of (metadata, data) tuples.
+    """
+    files = scan_files(folder, pattern)
+    return progress_map(functools.partial(_read_scanned_dvs, offset=offset), files, jobs=jobs, desc="dvs")
+
+
+def read_dvs_header(path):
+    """Read only the metadata lines at the top of a DVS 'txt' file."""
+    with open(path, encoding="cp1252") as f:
+        return parse_dvs_header(f)
+
+
+def parse_dvs_header(lines):
+    """Parse the metadata from the first lines of a DVS 'txt' file."""
+    lines = iter(lines)
+    next(lines, None)
+    dvsinfo = {}
+    for i, line in enumerate(lines):
+        key, val = map(str.strip, line.split(':', 1))
+        dvsinfo[key] = val
+        if i > 14:
+            break
+    return dvsinfo
+
+
 def get_act_T(dvsdata, tcol):
     """Find activation temperature as maximum temperature of data"""
     return max(dvsdata[tcol])
@@ -138,6 +179,7 @@ def dvs_plot(dvsinfo, dvsdata):
     return fig
 
 
+@profiled()
 def get_change_points(
     dvsdata,
     col,
@@ -153,27 +195,28 @@ def get_change_points(
     if log:
         datacol = np.log10(datacol)
 
+    record(rows=len(datacol))
+
     if method == "derivative":
-        datacol = dvsdata[col].fillna(0)
-        diff = np.diff(datacol, prepend=datacol[0])
+        # -inf to -inf (log of zero) is not a change
+        diff = np.nan_to_num(np.diff(datacol, prepend=datacol.iloc[0]), nan=0)
         chpoints = np.nonzero(diff)[0]
         chpoints = np.append(chpoints, [len(datacol) - 1])
 
-        fig, ax = plt.subplots(1, figsize=(17, 6))
-        ax.plot(range(len(datacol)), datacol)
-        colors = cycle(["#4286f4", "#f44174"])
-        for (start, end), col in zip(pairwise(chpoints), colors):
-            ax.axvspan(max(0, start - 0.5), end - 0.5, facecolor=col, alpha=0.2)
-
-    elif method == "window":
-        algo = rpt.Window(model="l1", width=width, **kwargs).fit(datacol.values)
-        chpoints = algo.predict(pen=pen)
-        rpt.show.display(datacol.values, chpoints, figsize=(17, 6))
-
-    elif method == "binary_segment":
-        algo = rpt.Binseg(model="l2", min_size=width, **kwargs).fit(datacol.values)
-        chpoints = algo.predict(pen=pen)
-        rpt.show.display(datacol.values, chpoints, figsize=(17, 6))
+        with stage("plot"):
+            fig, ax = plt.subplots(1, figsize=(17, 6))
+            ax.plot(range(len(datacol)), datacol)
+            colors = cycle(["#4286f4", "#f44174"])
+            for (start, end), col in zip(pairwise(chpoints), colors):
+                ax.axvspan(max(0, start - 0.5), end - 0.5, facecolor=col, alpha=0.2)
+
+    elif method in ("window", "binary_segment"):
+        with stage("fit"):
+            algo = _fit_change_points(datacol.values, method, width, **kwargs)
+        with stage("predict"):
+            chpoints = algo.predict(pen=pen)
+        with stage("plot"):
+            rpt.show.display(datacol.values, chpoints, figsize=(17, 6))
 
     else:
         raise BaseException("Incorrect method.")
@@ -181,13 +224,145 @@ def get_change_points(
     return chpoints
 
 
+def _fit_change_points(signal, method, width, **kwargs):
+    """Fit the ruptures model used by a change point method."""
+    if method == "window":
+        return rpt.Window(model="l1", width=width, **kwargs).fit(signal)
+    if method == "binary_segment":
+        return rpt.Binseg(model="l2", min_size=width, **kwargs).fit(signal)
+    raise BaseException("Incorrect method.")
+
+
+def _sweep_width(signal, method, width, pens, kwargs):
+    """Fit once and predict the breakpoints for every penalty."""
+    algo = _fit_change_points(signal, method, width, **kwargs)
+    rows = []
+    for pen in pens:
+        chpoints = [int(n) for n in algo.predict(pen=pen)]
+        cost = algo.cost.sum_of_costs(chpoints)
+        rows.append({
+            'method': method,
+            'width': width,
+            'pen': pen,
+            'n_bkps': len(chpoints) - 1,
+            'chpoints': chpoints,
+            'cost': cost,
+            'penalized_cost': cost + pen * (len(chpoints) - 1),
+        })
+    return rows
+
+
+@profiled()
+def sweep_change_points(
+    dvsdata,
+    col,
+    pens,
+    widths=(300, ),
+    methods=("window", ),
+    log=False,
+    jobs=1,
+    **kwargs,
+):
+    """
+    Find the change points for many penalties, widths and methods at once.
+
+    The ruptures model is fitted once per (method, width), and predicting
+    for a penalty then reuses it, which is much faster than calling
+    `get_change_points` for every combination. Fits are run in a process
+    pool if `jobs` > 1 (or 0 for all cores).
+
+    Parameters
+    ----------
+    methods : str or list of str
+        Change point methods of `get_change_points` to compare.
+
+    Returns
+    -------
+    DataFrame
+        One row per (method, width, penalty), with the change points, their
+        number, the segmentation cost and the penalized cost.
+    """
+    datacol = dvsdata[col].fillna(0)
+    if log:
+        datacol = np.log10(datacol)
+    signal = datacol.values
+    record(rows=len(signal))
+
+    if isinstance(methods, str):
+        methods = [methods]
+    combinations = list(product(methods, widths))
+    sweep = functools.partial(_sweep_width, signal, pens=sorted(pens), kwargs=kwargs)
+    results = parallel_map(sweep, *zip(*combinations), jobs=jobs)
+
+    return pd.DataFrame([row for rows in results for row in rows])
+
+
+@profiled()
+def get_steps(dvsdata, tgt_cols, tol=0):
+    """
+    Build the table of steps from the setpoint (target) columns.
+
+    A new step starts whenever any of the target columns changes by more
+    than `tol`, or is blank (NaN) on one side of the change only, e.g. a
+    heater target set or cleared. The `end` of each step is the position of the next step
+    start, as the change points used by `calc_isotherm_data`, which
+    accepts the table directly.
+
+    Parameters
+    ----------
+    dvsdata : DataFrame
+        DVS data, as read by `read_dvs_file`.
+    tgt_cols : str or list of str
+        Target columns, e.g. `dvsinfo['columns']['p_rel_tgt']`.
+    tol : float
+        Changes of a target smaller than this are ignored.
+
+    Returns
+    -------
+    DataFrame
+        Start and end positions, start and end times, duration and the
+        value of each target column for every step.
+    """
+    if isinstance(tgt_cols, str):
+        tgt_cols = [tgt_cols]
+    targets = dvsdata[tgt_cols].to_numpy(dtype=float)
+    record(rows=len(targets))
+
+    change = np.abs(np.diff(targets, axis=0)) > tol
+    # a target appearing or disappearing is also a change
+    change |= np.diff(np.isnan(targets), axis=0)
+    starts = np.concatenate(([0], np.flatnonzero(change.any(axis=1)) + 1))
+    ends = np.append(starts[1:], len(targets))
+
+    index = dvsdata.index
+    steps = pd.DataFrame({
+        'start': starts,
+        'end': ends,
+        'start_time': index[starts],
+        'end_time': index[np.minimum(ends, len(index) - 1)],
+    })
+    steps['duration'] = steps['end_time'] - steps['start_time']
+    for ind, col in enumerate(tgt_cols):
+        steps[col] = targets[starts, ind]
+    return steps
+
+
 def get_loading(iso_points, m0, c='loading'):
     """Find loading by dividing by initial mass"""
     return (iso_points[c] / m0 - 1)
 
 
+@profiled()
 def calc_isotherm_data(dvsdata, pcol, mcol, chpoints, extra_cols=None, offspts=10, meanpts=20):
-    """Select and average points to calculate isotherm data."""
+    """
+    Select and average points to calculate isotherm data.
+
+    The change points can be a list of positions or a step table from
+    `get_steps`, in which case the end of each step is used.
+    """
+
+    if isinstance(chpoints, pd.DataFrame):
+        chpoints = chpoints['end']
 
     mean = offspts + meanpts
 
@@ -0,0 +1,172 @@
+"""
+Module comprising batched fitting of DVS uptake kinetics.
+
+Each step is fitted with a linear driving force (LDF) model, an
+exponential approach to equilibrium
+
+    m(t) = m_eq - (m_eq - m_0) exp(-k t)
+
+All steps are cut out of the time and mass columns at once, and initial
+guesses come from the linearized form dm/dt = k (m_eq - m), solved for
+every step together as a least squares line through (m, dm/dt). The
+nonlinear refinement then runs step by step, in a process pool if
+requested.
+
+@author: Dr. Paul Iacomi
+@date: Oct 2026
+"""
+
+__all__ = [
+    'ldf',
+    'fit_kinetics',
+]
+
+import warnings
+
+import numpy as np
+import pandas as pd
+from scipy.optimize import OptimizeWarning
+from scipy.optimize import curve_fit
+
+from ..common import n_jobs
+from ..common import parallel_map
+from ..common import profiled, record, stage
+
+
+def ldf(t, m0, meq, k):
+    """Mass at time `t` of an LDF uptake from `m0` to `meq` with rate `k`."""
+    return meq - (meq - m0) * np.exp(-k * t)
+
+
+def _ldf_jac(t, m0, meq, k):
+    ekt = np.exp(-k * t)
+    return np.stack((ekt, 1 - ekt, (meq - m0) * t * ekt), axis=1)
+
+
+def _step_bounds(chpoints, npoints):
+    """Start and end positions of every step from change points or a step table."""
+    if isinstance(chpoints, pd.DataFrame):
+        return chpoints['start'].to_numpy(), chpoints['end'].to_numpy()
+    ends = np.asarray(chpoints, dtype=np.int64)
+    ends = ends[(ends > 0) & (ends <= npoints)]
+    starts = np.concatenate(([0], ends))[:len(ends)]
+    return starts, ends
+
+
+def _initial_guesses(t, m, starts, ends):
+    """Vectorized LDF guesses (m0, meq, k) of all steps from dm/dt = k (meq - m)."""
+    # derivatives inside each step only, the first point of a step has none
+    dt = np.diff(t, prepend=np.nan)
+    rate = np.diff(m, prepend=np.nan) / np.where(dt > 0, dt, np.nan)
+    rate[starts] = np.nan
+    valid = np.isfinite(rate)
+    x = np.where(valid, m, 0)
+    y = np.where(valid, rate, 0)
+
+    # sums over [start, end) of each step, from reduceat on (start, end) pairs
+    # (the sums between an end and the next start are dropped)
+    bounds = np.column_stack((starts, ends)).ravel()
+    empty = ends <= starts
+
+    def total(values):
+        sums = np.add.reduceat(np.append(values, 0), bounds)[::2]
+        return np.where(empty, 0, sums)
+
+    n, sx, sy = total(valid.astype(float)), total(x), total(y)
+    sxx, sxy = total(x * x), total(x * y)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slope = (n * sxy - sx * sy) / (n * sxx - sx * sx)
+        intercept = (sy - slope * sx) / n
+        k = -slope
+        meq = intercept / k
+
+    m0 = m[starts]
+    mlast = m[ends - 1]
+    duration = t[ends - 1] - t[starts]
+    # fall back to the last point and a time constant of a third of the step
+    bad = ~np.isfinite(k) | (k <= 0) | ~np.isfinite(meq)
+    k = np.where(bad, 3 / np.where(duration > 0, duration, 1), k)
+    meq = np.where(bad, mlast, meq)
+    return np.stack((m0, meq, k), axis=1)
+
+
+def _fit_step(t, m, p0):
+    """Refine the LDF parameters of a single step."""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", OptimizeWarning)
+        try:
+            popt, pcov = curve_fit(ldf, t, m, p0=p0, jac=_ldf_jac)
+        except (RuntimeError, ValueError):
+            return np.full(3, np.nan), np.full(3, np.nan), np.nan, False
+    rmse = np.sqrt(np.mean((ldf(t, *popt) - m)**2))
+    return popt, np.sqrt(np.diag(pcov)), rmse, True
+
+
+def _fit_steps(batch):
+    return [_fit_step(*args) for args in batch]
+
+
+@profiled()
+def fit_kinetics(dvsdata, tcol, mcol, chpoints, min_points=10, jobs=1):
+    """
+    Fit the uptake kinetics of every step with an LDF model.
+
+    Parameters
+    ----------
+    dvsdata : DataFrame
+        DVS data, as read by `read_dvs_file`.
+    tcol, mcol : str
+        Time (min) and mass columns.
+    chpoints : list or DataFrame
+        Change points, as from `get_change_points`, or a step table from
+        `get_steps`.
+    min_points : int
+        Steps with fewer points are not fitted.
+    jobs : int
+        Number of processes for the refinement (0 for all cores).
+
+    Returns
+    -------
+    DataFrame
+        For each step: start and end positions, initial mass, equilibrium
+        mass and rate constant (1/min) with their standard errors, the
+        root mean square error and whether the fit converged.
+    """
+    t = dvsdata[tcol].to_numpy(dtype=float)
+    m = dvsdata[mcol].to_numpy(dtype=float)
+    starts, ends = _step_bounds(chpoints, len(t))
+    record(rows=len(t))
+
+    with stage("guess"):
+        guesses = _initial_guesses(t, m, starts, ends)
+
+    fitted = np.flatnonzero(ends - starts >= min_points)
+    tasks = [(t[starts[i]:ends[i]] - t[starts[i]], m[starts[i]:ends[i]], guesses[i]) for i in fitted]
+
+    with stage("refine"):
+        # a few batches per worker keeps the pickling overhead low
+        nbatch = max(1, min(len(tasks), 4 * n_jobs(jobs)))
+        batches = [tasks[i::nbatch] for i in range(nbatch)]
+        results = [None] * len(tasks)
+        for i, batch in enumerate(parallel_map(_fit_steps, batches, jobs=jobs)):
+            results[i::nbatch] = batch
+
+    params = np.full((len(starts), 3), np.nan)
+    errors = np.full((len(starts), 3), np.nan)
+    rmse = np.full(len(starts), np.nan)
+    success = np.zeros(len(starts), dtype=bool)
+    for i, (popt, perr, err, ok) in zip(fitted, results):
+        params[i], errors[i], rmse[i], success[i] = popt, perr, err, ok
+
+    return pd.DataFrame({
+        'start': starts,
+        'end': ends,
+        'm0': params[:, 0],
+        'm_eq': params[:, 1],
+        'k': params[:, 2],
+        'm0_err': errors[:, 0],
+        'm_eq_err': errors[:, 1],
+        'k_err': errors[:, 2],
+        'rmse': rmse,
+        'success': success,
+    })
@@ -0,0 +1,223 @@
+"""
+Module comprising live processing of DVS data: following a growing file
+and online change point detection.
+
+@author: Dr. Paul Iacomi
+@date: Oct 2026
+"""
+
+__all__ = [
+    'DVSTailReader',
+    'OnlineChangePoints',
+    'LiveIsotherm',
+]
+
+import datetime
+
+import numpy as np
+import pandas as pd
+from dateutil import parser
+
+from ..common import TailReader
+from .dvsproc import calc_isotherm_data
+from .dvsproc import cols
+from .dvsproc import parse_dvs_header
+from .dvsproc import trim_meta
+
+HEADER_LINES = 41
+
+
+class DVSTailReader(TailReader):
+    """
+    Follow a DVS 'txt' file while the experiment is running.
+
+    Each `poll` returns only the rows appended since the last one, with
+    the same time index as `read_dvs_file`. The metadata is in `dvsinfo`
+    once the header has been written.
+
+        reader = DVSTailReader(path)
+        while running:
+            live.update(reader.poll())
+    """
+
+    encoding = "cp1252"
+
+    def __init__(self, path, offset=20, **kwargs):
+        self.time_offset = offset
+        super().__init__(path, **kwargs)
+
+    def reset(self):
+        super().reset()
+        self.dvsinfo = None
+        self.start = None
+
+    def parse_header(self, lines):
+        if len(lines) <= HEADER_LINES:
+            return None
+        dvsinfo = parse_dvs_header(lines)
+        self.columns = lines[HEADER_LINES].split(self.sep)
+        dvsinfo['columns'] = {k: self.columns[v] for k, v in cols.items()}
+        self.start = parser.parse(dvsinfo['Raw Data File Created'][:19]) + \
+            datetime.timedelta(seconds=self.time_offset)
+        self.dvsinfo = trim_meta(dvsinfo)
+        self.dvsinfo['activation_temp [C]'] = -np.inf
+        return HEADER_LINES + 1
+
+    def convert(self, rows):
+        columns = self.dvsinfo['columns']
+        self.dvsinfo['activation_temp [C]'] = max(
+            self.dvsinfo['activation_temp [C]'],
+            float(rows[columns['t_heat']].max()),
+        )
+        return rows.set_index(self.start + pd.to_timedelta(rows[columns['time']], unit='min'))
+
+
+class OnlineChangePoints:
+    """
+    Detect steps in a series as samples arrive.
+
+    The discrepancy between the means of two adjacent windows of half
+    `width` samples is updated for every new sample, like the "window"
+    method of `get_change_points`, but from running sums of a fixed size
+    history so the work per sample is constant. A boundary is confirmed
+    at the position of the largest discrepancy above `jump`, once the
+    discrepancy falls back below it.
+
+    Change points are positions in the whole series pushed so far, as
+    used by `calc_isotherm_data`.
+    """
+
+    def __init__(self, width=300, jump=1.0, log=False):
+        self.half = max(width // 2, 1)
+        self.jump = jump
+        self.log = log
+        self.history = np.empty(0)
+        self.count = 0
+        self.candidate = None
+        self.change_points = []
+
+    def _prepare(self, values):
+        values = np.nan_to_num(np.asarray(values, dtype=float), nan=0.0)
+        if self.log:
+            values = np.log10(np.clip(values, 1e-12, None))
+        return values
+
+    def push(self, values):
+        """Add new samples and return the newly confirmed change points."""
+        values = self._prepare(values)
+        if len(values) == 0:
+            return []
+
+        h = self.half
+        series = np.concatenate((self.history, values))
+        sums = np.concatenate(([0.0], np.cumsum(series)))
+
+        # every window end not scored before, once there are two full windows
+        ends = np.arange(max(2 * h, len(self.history) + 1), len(series) + 1)
+        right = sums[ends] - sums[ends - h]
+        left = sums[ends - h] - sums[ends - 2 * h]
+        scores = np.abs(right - left) / h
+        positions = self.count - len(self.history) + ends - h
+
+        above = scores > self.jump
+        confirmed = []
+        if self.candidate is not None and not above[0]:
+            confirmed.append(self.candidate[1])
+            self.candidate = None
+
+        # runs of consecutive scores above the threshold, a run still open
+        # at the end of the block is kept as candidate for the next push
+        edges = np.flatnonzero(np.diff(np.concatenate(([0], above, [0]))))
+        for start, stop in zip(edges[::2], edges[1::2]):
+            best = start + np.argmax(scores[start:stop])
+            if self.candidate is None or scores[best] > self.candidate[0]:
+                self.candidate = (scores[best], int(positions[best]))
+            if stop < len(scores):
+                confirmed.append(self.candidate[1])
+                self.candidate = None
+
+        self.history = series[-2 * h:]
+        self.count += len(values)
+        self.change_points.extend(confirmed)
+        return confirmed
+
+    @property
+    def earliest(self):
+        """Earliest position that can still be confirmed as a change point."""
+        if self.candidate is not None:
+            return self.candidate[1]
+        return self.count - self.half + 1
+
+    def flush(self):
+        """Confirm a pending change point at the end of the data, if any."""
+        confirmed = []
+        if self.candidate is not None:
+            confirmed.append(self.candidate[1])
+            self.candidate = None
+        self.change_points.extend(confirmed)
+        return confirmed
+
+
+class LiveIsotherm:
+    """
+    Isotherm points updated from a growing DVS dataframe.
+
+    New rows are passed to `update`, the step boundaries are found with
+    `OnlineChangePoints` on `chp_col`, and `calc_isotherm_data` only
+    averages the rows before each new boundary. Only the rows that can
+    still be averaged are kept in memory.
+    """
+
+    def __init__(
+        self,
+        pcol,
+        mcol,
+        chp_col=None,
+        width=300,
+        jump=1.0,
+        log=False,
+        extra_cols=None,
+        offspts=10,
+        meanpts=20,
+    ):
+        self.pcol = pcol
+        self.mcol = mcol
+        self.chp_col = chp_col or pcol
+        self.extra_cols = extra_cols
+        self.offspts = offspts
+        self.meanpts = meanpts
+        self.detector = OnlineChangePoints(width=width, jump=jump, log=log)
+        self.tail = None
+        self.offset = 0
+        self.isotherm = pd.DataFrame()
+
+    def _points(self, change_points):
+        local = [n - self.offset for n in change_points]
+        points = calc_isotherm_data(
+            self.tail,
+            self.pcol,
+            self.mcol,
+            local,
+            extra_cols=self.extra_cols,
+            offspts=self.offspts,
+            meanpts=self.meanpts,
+        )
+        self.isotherm = pd.concat([self.isotherm, points], ignore_index=True)
+        return points
+
+    def update(self, rows):
+        """Add new rows of DVS data and return any new isotherm points."""
+        self.tail = rows if self.tail is None else pd.concat([self.tail, rows])
+        points = self._points(self.detector.push(rows[self.chp_col].to_numpy()))
+
+        # keep the rows averaged for any change point not yet confirmed
+        excess = self.detector.earliest - self.offspts - self.meanpts - self.offset
+        if excess > 0:
+            self.tail = self.tail.iloc[excess:]
+            self.offset += excess
+        return points
+
+    def flush(self):
+        """Close the last step at the end of the data."""
+        points = self.detector.flush() + [self.detector.count]
+        return self._points(points)
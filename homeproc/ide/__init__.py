@@ -8,4 +8,6 @@ Module comprising processing of IDE scans.
 # flake8: noqa
 # isort:skip_file
 
-from .ideproc import *
\ No newline at end of file
+from .ideproc import *
+from .dielectric import *
+from .fitting import *
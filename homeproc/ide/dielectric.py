@@ -0,0 +1,127 @@
+"""
+Module comprising dielectric quantities derived from IDE impedance scans.
+
+All quantities are computed from the complex impedance Z* = Z' + iZ'' of
+every (time, frequency) row at once, with the empty cell capacitance C0
+of the interdigitated electrode:
+
+    eps* = eps' - i eps'' = 1 / (i w C0 Z*)
+    M*   = M' + i M''     = 1 / eps*
+    sig* = sig' + i sig'' = i w e0 eps*
+
+@author: Dr. Paul Iacomi
+@date: Oct 2026
+"""
+
+__all__ = [
+    "EPS0",
+    "ide_capacitance",
+    "dielectric",
+    "scan_matrix",
+]
+
+import numpy as np
+import pandas as pd
+from scipy.special import ellipk
+
+EPS0 = 8.8541878128e-12  # F/m
+
+COL_ZRE = "Z' [Ohm]"
+COL_ZIM = "Z'' [Ohm]"
+
+
+def ide_capacitance(fingers, length, width, gap):
+    """
+    Empty cell capacitance (F) of an interdigitated electrode.
+
+    Conformal mapping result for a film covering one side of the
+    electrodes, neglecting the outermost fingers.
+
+    Parameters
+    ----------
+    fingers : int
+        Total number of fingers.
+    length : float
+        Overlap length of the fingers (m).
+    width, gap : float
+        Finger width and spacing between fingers (m).
+    """
+    k = np.sin(np.pi / 2 * width / (width + gap))
+    return EPS0 * (fingers - 1) * length * ellipk(k**2) / ellipk(1 - k**2)
+
+
+def dielectric(data, C0, zre=COL_ZRE, zim=COL_ZIM, dtype=np.float64):
+    """
+    Compute dielectric quantities of every row of an impedance dataset.
+
+    Parameters
+    ----------
+    data : DataFrame
+        Data indexed by (time, freq), as from `read_novo_file`.
+    C0 : float
+        Empty cell capacitance (F), e.g. from `ide_capacitance`.
+    zre, zim : str
+        Real and imaginary impedance columns.
+    dtype : dtype
+        Output float type, float32 halves the memory for long sweeps.
+
+    Returns
+    -------
+    DataFrame
+        Permittivity, loss tangent, electric modulus and conductivity
+        (S/m), with the same index as the input.
+    """
+    dtype = np.dtype(dtype).type
+    ctype = np.result_type(dtype, np.complex64)
+    freq = data.index.get_level_values("freq").to_numpy()
+    omega = (2 * np.pi * freq).astype(dtype)
+
+    z = np.empty(len(data), dtype=ctype)
+    z.real = data[zre].to_numpy()
+    z.imag = data[zim].to_numpy()
+
+    modulus = 1j * omega * dtype(C0) * z
+    eps = 1 / modulus
+    sigma = 1j * omega * dtype(EPS0) * eps
+
+    return pd.DataFrame(
+        {
+            "Eps'": eps.real,
+            "Eps''": -eps.imag,
+            "tan(delta)": -eps.imag / eps.real,
+            "M'": modulus.real,
+            "M''": modulus.imag,
+            "Sigma' [S/m]": sigma.real,
+            "Sigma'' [S/m]": sigma.imag,
+        },
+        index=data.index,
+    )
+
+
+def scan_matrix(data, column):
+    """
+    Arrange a column as a (time, frequency) matrix, one scan per row.
+
+    When every scan measures the same frequencies in the same order the
+    column is only reshaped. Otherwise a new scan starts whenever the first
+    frequency is measured again, and missing points are NaN. Scans are
+    labelled by the time of their first point.
+    """
+    freqs = data.index.get_level_values("freq")
+    nfreq = freqs.nunique()
+    values = data[column].to_numpy()
+
+    if len(values) % nfreq == 0:
+        grid = freqs.to_numpy().reshape(-1, nfreq)
+        if (grid == grid[0]).all():
+            times = data.index.get_level_values("time")[::nfreq]
+            columns = pd.Index(grid[0], name="freq")
+            return pd.DataFrame(values.reshape(-1, nfreq), index=times, columns=columns, copy=False)
+
+    # a new scan starts each time the first frequency comes back
+    starts = freqs.to_numpy() == freqs[0]
+    scans = pd.DataFrame({"scan": np.cumsum(starts), "freq": freqs, "value": values})
+    matrix = scans.pivot_table(index="scan", columns="freq", values="value", aggfunc="last", dropna=False)
+    matrix = matrix.reindex(columns=pd.unique(freqs))
+    matrix.index = data.index.get_level_values("time")[starts]
+    return matrix
@@ -0,0 +1,250 @@
+"""
+Module comprising batched fitting of IDE impedance scans.
+
+Each scan of a run is fitted with a model of its frequency response,
+starting from the parameters of the previous scan, which is close
+enough that only a few iterations are needed. The run is cut into
+contiguous segments fitted independently in a process pool. Models
+provide analytic jacobians, and residuals are relative to the measured
+magnitude so that all frequencies weigh alike.
+
+Models:
+    "rc": parallel resistor and capacitor, on the impedance
+        Z* = R / (1 + i w R C)
+    "hn": Havriliak-Negami relaxation with dc conductivity, on the
+        permittivity (requires the empty cell capacitance C0)
+        eps* = eps_inf + d_eps / (1 + (i w tau)^alpha)^beta - i sigma / (e0 w)
+
+@author: Dr. Paul Iacomi
+@date: Oct 2026
+"""
+
+__all__ = [
+    "MODELS",
+    "fit_scans",
+]
+
+import numpy as np
+import pandas as pd
+from scipy.optimize import least_squares
+
+from ..common import n_jobs
+from ..common import parallel_map
+from ..common import profiled, record, stage
+from .dielectric import COL_ZIM
+from .dielectric import COL_ZRE
+from .dielectric import EPS0
+from .dielectric import scan_matrix
+
+
+class _RC:
+    """Parallel RC circuit, parameters are ln(R) and ln(C)."""
+
+    names = ["R [Ohm]", "C [F]"]
+    # parameters which, if they end on a bound, show a diverged fit
+    interior = []
+
+    @staticmethod
+    def bounds(omega):
+        return [-np.inf, -np.inf], [np.inf, np.inf]
+
+    @staticmethod
+    def guess(omega, z):
+        R = abs(z[np.argmin(omega)].real)
+        C = 1 / abs(omega.max() * z[np.argmax(omega)].imag)
+        return np.log([R, C])
+
+    @staticmethod
+    def value(p, omega):
+        R, C = np.exp(p)
+        return R / (1 + 1j * omega * R * C)
+
+    @staticmethod
+    def jac(p, omega):
+        R, C = np.exp(p)
+        D2 = (1 + 1j * omega * R * C)**2
+        return np.stack((R / D2, -1j * omega * R**2 * C / D2), axis=1)
+
+    @staticmethod
+    def params(p):
+        return np.exp(p)
+
+
+class _HN:
+    """Havriliak-Negami relaxation with dc conductivity, tau is fitted as ln(tau)."""
+
+    names = ["eps_inf", "delta_eps", "tau [s]", "alpha", "beta", "sigma [S/m]"]
+    interior = [2]
+
+    @staticmethod
+    def bounds(omega):
+        """Relaxation times are kept within three decades of the measured frequencies."""
+        lower = [0, 0, np.log(1e-3 / omega.max()), 0.01, 0.01, 0]
+        upper = [np.inf, np.inf, np.log(1e3 / omega.min()), 1, 1, np.inf]
+        return lower, upper
+
+    @staticmethod
+    def guess(omega, eps):
+        order = np.argsort(omega)
+        eps_inf = max(eps[order[-1]].real, 1e-3)
+        delta = max(eps[order[0]].real - eps_inf, 1e-3)
+        loss = -eps.imag
+        # the dc conductivity dominates the loss at the lowest frequency
+        sigma = max(loss[order[0]] * EPS0 * omega[order[0]], 0)
+        relax = loss - sigma / (EPS0 * omega)
+        tau = 1 / omega[np.argmax(relax)]
+        return np.array([eps_inf, delta, np.log(tau), 0.9, 0.9, sigma * 0.5])
+
+    @staticmethod
+    def value(p, omega):
+        eps_inf, delta, lntau, alpha, beta, sigma = p
+        u = (1j * omega * np.exp(lntau))**alpha
+        return eps_inf + delta / (1 + u)**beta - 1j * sigma / (EPS0 * omega)
+
+    @staticmethod
+    def jac(p, omega):
+        eps_inf, delta, lntau, alpha, beta, sigma = p
+        iwt = 1j * omega * np.exp(lntau)
+        u = iwt**alpha
+        D = 1 + u
+        f = D**-beta
+        g = -beta * delta * D**(-beta - 1) * u
+        return np.stack(
+            (
+                np.ones_like(f),
+                f,
+                g * alpha,
+                g * np.log(iwt),
+                -delta * f * np.log(D),
+                -1j / (EPS0 * omega),
+            ),
+            axis=1,
+        )
+
+    @staticmethod
+    def params(p):
+        p = np.array(p, dtype=float)
+        p[2] = np.exp(p[2])
+        return p
+
+
+MODELS = {"rc": _RC, "hn": _HN}
+
+
+def _residuals(p, model, omega, y, scale):
+    r = (model.value(p, omega) - y) / scale
+    return np.concatenate((r.real, r.imag))
+
+
+def _jacobian(p, model, omega, y, scale):
+    j = model.jac(p, omega) / scale[:, None]
+    return np.concatenate((j.real, j.imag))
+
+
+def _fit_segment(model_name, omega, data, x0, max_nfev):
+    """Fit consecutive scans, each starting from the previous result."""
+    model = MODELS[model_name]
+    params = np.full((len(data), len(model.names)), np.nan)
+    diagnostics = np.full((len(data), 4), np.nan)
+
+    for ind, y in enumerate(data):
+        valid = np.isfinite(y)
+        if valid.sum() <= len(model.names):
+            continue
+        w, yv = omega[valid], y[valid]
+        if x0 is None:
+            x0 = model.guess(w, yv)
+        lower, upper = model.bounds(w)
+        x0 = np.clip(x0, np.nextafter(lower, 1), np.nextafter(upper, -1))
+        result = least_squares(
+            _residuals,
+            x0,
+            jac=_jacobian,
+            bounds=(lower, upper),
+            args=(model, w, yv, np.abs(yv)),
+            x_scale="jac",
+            max_nfev=max_nfev,
+        )
+        params[ind] = model.params(result.x)
+        rmse = np.sqrt(2 * result.cost / len(result.fun))
+        # a relaxation pushed out of the measured range is a diverged fit
+        success = (
+            result.success and np.isfinite(params[ind]).all() and np.isfinite(rmse)
+            and not result.active_mask[model.interior].any()
+        )
+        diagnostics[ind] = (success, result.nfev, result.status, rmse)
+        if success:
+            x0 = result.x
+
+    return params, diagnostics
+
+
+@profiled()
+def fit_scans(
+    data,
+    model="rc",
+    C0=None,
+    p0=None,
+    segments=None,
+    jobs=1,
+    max_nfev=200,
+    zre=COL_ZRE,
+    zim=COL_ZIM,
+):
+    """
+    Fit every impedance scan of a run, warm-starting from the previous scan.
+
+    Parameters
+    ----------
+    data : DataFrame
+        Data indexed by (time, freq), as from `read_novo_file`.
+    model : str
+        Model name in `MODELS`.
+    C0 : float, optional
+        Empty cell capacitance (F), required by permittivity models.
+    p0 : array, optional
+        Initial (internal) parameters of the first scan of each segment,
+        guessed from the data if not given.
+    segments : int, optional
+        Number of independently fitted runs of consecutive scans, by
+        default one per process.
+    jobs : int
+        Number of processes (0 for all cores).
+    max_nfev : int
+        Maximum function evaluations per scan.
+
+    Returns
+    -------
+    DataFrame
+        Parameters of each scan indexed by scan time, with whether the
+        fit converged (to finite parameters, with any relaxation time
+        within the bounds of the model), the number of evaluations, the
+        optimizer status and the relative root mean square error.
+    """
+    fitter = MODELS[model]
+    with stage("arrange"):
+        zr = scan_matrix(data, zre)
+        zi = scan_matrix(data, zim)
+        omega = 2 * np.pi * zr.columns.to_numpy(dtype=float)
+        y = zr.to_numpy() + 1j * zi.to_numpy()
+        if fitter is _HN:
+            if C0 is None:
+                raise ValueError("The empty cell capacitance C0 is needed to fit the permittivity.")
+            y = 1 / (1j * omega * C0 * y)
+        record(rows=len(data))
+
+    segments = max(1, min(segments or n_jobs(jobs), len(y)))
+    bounds = np.linspace(0, len(y), segments + 1).astype(int)
+    parts = [(model, omega, y[start:end], p0, max_nfev) for start, end in zip(bounds[:-1], bounds[1:])]
+
+    with stage("fit"):
+        results = parallel_map(_fit_segment, *zip(*parts), jobs=jobs)
+
+    params = np.concatenate([r[0] for r in results])
+    diagnostics = np.concatenate([r[1] for r in results])
+    table = pd.DataFrame(params, index=zr.index, columns=fitter.names)
+    table["success"] = diagnostics[:, 0] == 1
+    table["nfev"] = pd.array(diagnostics[:, 1], dtype="Int64")
+    table["status"] = pd.array(diagnostics[:, 2], dtype="Int64")
+    table["rmse"] = diagnostics[:, 3]
+    return table
@@ -7,9 +7,13 @@ Module comprising processing of IDE scans.
 
 __all__ = [
     "read_novo_file",
+    "read_novo_files",
+    "read_novo_header",
+    "NovoTailReader",
     "find_previous_scan",
     "plot_time_column",
     "plot_param_freq",
+    "group_by_freq",
 ]
 
 import re
@@ -19,31 +23,64 @@ import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 
-from matplotlib import cm
+from matplotlib import colormaps
 
+from ..common import TailReader
+from ..common import profiled
+from ..common import progress_map
+from ..common import record
+from ..common import scan_files
+from ..common import stage
 
-def read_novo_file(path: str):
-    """Read a Novocontrol output file."""
 
-    with open(path) as f:
-        name, date, time = map(str.strip, f.readline().split(","))
-        while True:
-            if f.readline().strip().startswith("Fixed value"):
-                break
-        novo = pd.read_table(f)
+COL_TIME = "Time [s]"
+COL_FREQ = "Freq. [Hz]"
 
-    novo.columns = map(str.strip, novo.columns)
-    novo.columns = [re.sub("\s\s+", " ", s) for s in novo.columns]
 
-    col_time = "Time [s]"
-    col_freq = "Freq. [Hz]"
+def _clean_columns(columns):
+    return [re.sub("\s\s+", " ", s.strip()) for s in columns]
 
-    start = parser.parse(f"{date} {time}", dayfirst=True)
-    freqs = novo[col_freq].unique()
-    novo[col_time] = pd.to_timedelta(novo[col_time], unit="s") + start
 
-    novo.set_index([col_time, col_freq], inplace=True)
+def _index_novo(novo, start):
+    """Index rows by measurement time and frequency."""
+    novo[COL_TIME] = pd.to_timedelta(novo[COL_TIME], unit="s") + start
+    novo = novo.set_index([COL_TIME, COL_FREQ])
     novo.index.rename(("time", "freq"), inplace=True)
+    return novo
+
+
+def _parse_novo_title(line):
+    """Sample name and start time from the first line of a Novocontrol file."""
+    name, date, time = map(str.strip, line.split(","))
+    return name, parser.parse(f"{date} {time}", dayfirst=True)
+
+
+def read_novo_header(path: str):
+    """Read only the sample name and start time of a Novocontrol output file."""
+    with open(path) as f:
+        name, start = _parse_novo_title(f.readline())
+    return {"sample_name": name, "start_time": start}
+
+
+@profiled()
+def read_novo_file(path: str):
+    """Read a Novocontrol output file."""
+
+    with open(path) as f:
+        with stage("metadata"):
+            name, start = _parse_novo_title(f.readline())
+            while True:
+                if f.readline().strip().startswith("Fixed value"):
+                    break
+        with stage("read"):
+            novo = pd.read_table(f)
+            record(rows=len(novo), path=path)
+
+    novo.columns = _clean_columns(novo.columns)
+
+    with stage("timestamps"):
+        freqs = novo[COL_FREQ].unique()
+        novo = _index_novo(novo, start)
 
     novoinfo = {
         "sample_name": name,
@@ -55,6 +92,85 @@ def read_novo_file(path: str):
     return novoinfo, novo
 
 
+def _read_scanned_novo(file):
+    return read_novo_file(file.path)
+
+
+def read_novo_files(folder, pattern="*.txt", jobs=1):
+    """
+    Read all Novocontrol output files of a folder, sorted by name.
+
+    Files are read in a process pool if `jobs` > 1 (0 for all cores),
+    with a progress bar. Returns a list of (metadata, data) tuples.
+    """
+    return progress_map(_read_scanned_novo, scan_files(folder, pattern), jobs=jobs, desc="ide")
+
+
+class NovoTailReader(TailReader):
+    """
+    Follow a Novocontrol output file while the measurement is running.
+
+    Each `poll` returns only the rows appended since the last one, indexed
+    by time and frequency as with `read_novo_file`. The metadata is in
+    `novoinfo` once the header has been written.
+    """
+
+    def reset(self):
+        super().reset()
+        self.novoinfo = None
+
+    def parse_header(self, lines):
+        for ind, line in enumerate(lines[:-1]):
+            if line.strip().startswith("Fixed value"):
+                break
+        else:
+            return None
+        name, start = _parse_novo_title(lines[0])
+        self.columns = _clean_columns(lines[ind + 1].split(self.sep))
+        self.novoinfo = {
+            "sample_name": name,
+            "frequencies": np.empty(0),
+            "start_time": start,
+            "parameters": [c for c in self.columns if c not in (COL_TIME, COL_FREQ)],
+        }
+        return ind + 2
+
+    def convert(self, rows):
+        freqs = np.concatenate((self.novoinfo["frequencies"], rows[COL_FREQ].unique()))
+        self.novoinfo["frequencies"] = pd.unique(freqs)
+        return _index_novo(rows, self.novoinfo["start_time"])
+
+
+def group_by_freq(data, column):
+    """
+    Times and values of a column for each frequency, grouping the data once.
+
+    When all scans measure the same frequencies in the same order, the
+    arrays are strided views of the data, otherwise the rows are split
+    after a single sort by frequency.
+    """
+    freqs = data.index.get_level_values("freq").to_numpy()
+    times = data.index.get_level_values("time").to_numpy()
+    values = data[column].to_numpy()
+    if len(freqs) == 0:
+        return {}
+
+    nfreq = len(pd.unique(freqs))
+    if len(freqs) % nfreq == 0:
+        grid = freqs.reshape(-1, nfreq)
+        if (grid == grid[0]).all():
+            times = times.reshape(-1, nfreq)
+            values = values.reshape(-1, nfreq)
+            return {freq: (times[:, ind], values[:, ind]) for ind, freq in enumerate(grid[0])}
+
+    order = np.argsort(freqs, kind="stable")
+    unique, starts = np.unique(freqs[order], return_index=True)
+    return {
+        freq: (times[rows], values[rows])
+        for freq, rows in zip(unique, np.split(order, starts[1:]))
+    }
+
+
 def plot_time_column(
     data,
     column,
@@ -86,15 +202,12 @@ def plot_time_column(
         )
     )
 
-    for freq in frequencies:
-        part = data.loc[pd.IndexSlice[:, freq], :]
-        part = part.reset_index(level='freq')
-
-        fig.add_trace(go.Scatter(
-            x=part.index,
-            y=part[column],
-            name=freq,
-        ))
+    groups = group_by_freq(data, column)
+    fig.add_traces([
+        dict(type="scatter", x=groups[freq][0], y=groups[freq][1], name=freq)
+        for freq in frequencies
+        if freq in groups
+    ])
 
     if dvs_data is not None:
         fig.update_layout(yaxis2=dict(
@@ -129,8 +242,11 @@ def plot_param_freq(datas, parameter, pressure):
 
     pressure = np.asarray(pressure)
 
-    colmap = cm.get_cmap('RdPu', len(pressure))
-    colours = [f"rgba({c[0]},{c[1]},{c[2]},{c[3]})" for c in colmap(pressure / max(pressure))]
+    colmap = colormaps['RdPu'].resampled(len(pressure))
+    colours = [
+        f"rgba({c[0]:.0f},{c[1]:.0f},{c[2]:.0f},{c[3] / 255:.2f})"
+        for c in colmap(pressure / max(pressure), bytes=True)
+    ]
 
     fig = go.Figure(
         layout=dict(
@@ -151,14 +267,12 @@ def plot_param_freq(datas, parameter, pressure):
         )
     )
 
-    for ind, pres, col in zip(range(len(pressure)), pressure, colours):
-        fig.add_trace(
-            go.Scatter(
-                x=datas.columns,
-                y=datas.iloc[ind],
-                name=f"{pres:.2f}",
-                line={"color": col},
-            ),
-        )
+    # all traces share the frequency axis, rows are views of the values
+    freqs = datas.columns.to_numpy()
+    values = datas.to_numpy()
+    fig.add_traces([
+        dict(type="scatter", x=freqs, y=values[ind], name=f"{pres:.2f}", line={"color": col})
+        for ind, pres, col in zip(range(len(pressure)), pressure, colours)
+    ])
 
     return fig
@@ -8,5 +8,8 @@ Module comprising processing of QCM traces and markers.
 # flake8: noqa
 # isort:skip_file
 
+from .ragged import *
 from .traceproc import *
-from .equations import *
\ No newline at end of file
+from .equations import *
+from .denoise import *
+from .mass import *
@@ -0,0 +1,143 @@
+"""
+Module comprising batch and streaming denoising of QCM traces.
+
+@author: Dr. Paul Iacomi
+@date: Oct 2026
+"""
+
+__all__ = [
+    'denoise_traces',
+    'StreamingSavgol',
+]
+
+import numpy as np
+import pandas as pd
+import scipy.signal as sig
+
+
+def denoise_traces(traces, window=51, order=2, axis=0, chunksize=None, out=None):
+    """
+    Smooth every trace of a matrix with a savitzky-golay filter in one call.
+
+    Parameters
+    ----------
+    traces : DataFrame or ndarray
+        Trace matrix, by default with points along the rows and one trace
+        per column, as returned by `read_tracefiles`.
+    window, order : int
+        Savitzky-golay window length and polynomial order.
+    axis : int
+        Axis along which to smooth (0 smooths each column).
+    chunksize : int, optional
+        Number of traces (along the other axis) smoothed at a time,
+        bounding the temporary memory used by the filter.
+    out : ndarray, optional
+        Array to write the result into, can be the input itself.
+
+    Returns
+    -------
+    DataFrame or ndarray
+        Smoothed traces, of the same type and labels as the input.
+    """
+    frame = traces if isinstance(traces, pd.DataFrame) else None
+    data = frame.to_numpy() if frame is not None else np.asarray(traces)
+
+    if not chunksize or data.ndim == 1:
+        result = sig.savgol_filter(data, window, order, axis=axis)
+        if out is not None:
+            out[...] = result
+            result = out
+    else:
+        other = 1 - axis % 2
+        result = out if out is not None else np.empty_like(data, dtype=np.result_type(data, np.float32))
+        for start in range(0, data.shape[other], chunksize):
+            block = [slice(None), slice(None)]
+            block[other] = slice(start, start + chunksize)
+            block = tuple(block)
+            result[block] = sig.savgol_filter(data[block], window, order, axis=axis)
+
+    if frame is not None:
+        return pd.DataFrame(result, index=frame.index, columns=frame.columns, copy=False)
+    return result
+
+
+class StreamingSavgol:
+    """
+    Savitzky-golay filter applied to samples as they arrive.
+
+    Samples can be scalars or arrays of any shape (for example a full
+    trace acquired at each time step), and are smoothed along time.
+    Each smoothed value is emitted half a window after its sample is
+    pushed, the edges are handled like `savgol_filter(mode='interp')`
+    so that the concatenated output equals the offline result.
+
+        smoother = StreamingSavgol(51, 2)
+        for chunk in acquisition:
+            smoothed = smoother.push(chunk)
+        tail = smoother.flush()
+    """
+
+    def __init__(self, window=51, order=2):
+        if window % 2 == 0 or window <= order:
+            raise ValueError("The window must be odd and larger than the order.")
+        self.window = window
+        self.order = order
+        self.half = window // 2
+        self.coeffs = sig.savgol_coeffs(window, order, use='dot')
+        self.head = np.stack([
+            sig.savgol_coeffs(window, order, pos=pos, use='dot') for pos in range(self.half + 1)
+        ])
+        self.tail = np.stack([
+            sig.savgol_coeffs(window, order, pos=pos, use='dot')
+            for pos in range(self.half + 1, window)
+        ])
+        # shape of each sample, kept across resets for empty outputs
+        self.trailing = ()
+        self.reset()
+
+    def reset(self):
+        """Forget all pushed samples."""
+        self.buffer = None
+        self.count = 0
+
+    def _ordered(self):
+        """Buffer contents from oldest to newest sample."""
+        start = self.count % self.window
+        return np.concatenate((self.buffer[start:], self.buffer[:start]))
+
+    def push(self, samples):
+        """Add samples (along the first axis) and return the newly smoothed ones."""
+        samples = np.asarray(samples, dtype=float)
+        self.trailing = samples.shape[1:]
+        if self.buffer is None:
+            self.buffer = np.zeros((self.window, ) + samples.shape[1:])
+
+        emitted = []
+        for sample in samples:
+            self.buffer[self.count % self.window] = sample
+            self.count += 1
+            if self.count == self.window:
+                emitted.extend(np.tensordot(self.head, self.buffer, axes=1))
+            elif self.count > self.window:
+                emitted.append(np.tensordot(self.coeffs, self._ordered(), axes=1))
+
+        if not emitted:
+            return np.empty((0, ) + self.buffer.shape[1:])
+        return np.stack(emitted)
+
+    def flush(self):
+        """Return the smoothed samples still held back at the end of the stream."""
+        if self.buffer is None or self.count == 0:
+            return np.empty((0, ) + self.trailing)
+        if self.count < self.window:
+            # not enough samples for the window, fit what there is
+            data = self.buffer[:self.count]
+            x = np.arange(self.count)
+            order = min(self.order, self.count - 1)
+            flat = data.reshape(self.count, -1)
+            fit = np.polynomial.polynomial.polyfit(x, flat, order)
+            result = np.polynomial.polynomial.polyval(x, fit).T.reshape(data.shape)
+        else:
+            result = np.tensordot(self.tail, self._ordered(), axes=1)
+        self.reset()
+        return result
@@ -0,0 +1,284 @@
+"""
+Module comprising conversion of QCM resonance frequency to mass.
+
+The reference frequency is picked automatically from a quiet period of
+the data, and a slow drift can be removed. The drift rate is tracked as
+an exponential average of the frequency derivative, only over samples
+where the frequency is otherwise stable, and is integrated into a drift
+baseline. All recursions are linear filters, so a whole series is
+converted in a single vectorized pass, or incrementally with
+`MassConverter`.
+
+Both give the same result when the reference is given, or taken as the
+first window under a standard deviation threshold (`reference_std`).
+Without a threshold, `frequency_to_mass` uses the quietest window of the
+whole series, which a live conversion cannot know, and `MassConverter`
+the first complete window.
+
+@author: Dr. Paul Iacomi
+@date: Oct 2026
+"""
+
+__all__ = [
+    'find_reference',
+    'frequency_to_mass',
+    'MassConverter',
+    'DRIFT_COL',
+    'SHIFT_COL',
+    'MASS_COL',
+]
+
+import numpy as np
+import pandas as pd
+import scipy.signal as sig
+
+from .equations import d
+from .equations import sauerbrey
+from .traceproc import FREQ_COL
+
+DRIFT_COL = "Drift [Hz]"
+SHIFT_COL = "Frequency shift [Hz]"
+MASS_COL = "Mass [mg]"
+
+
+def _rolling_std(values, window):
+    return pd.Series(values).rolling(window, min_periods=window).std().to_numpy()
+
+
+def find_reference(freq, window=50, search=None, threshold=None):
+    """
+    Find a quiet period of a frequency series to use as reference.
+
+    Parameters
+    ----------
+    freq : Series
+        Resonance frequency.
+    window : int
+        Number of samples the reference is averaged over.
+    search : int, optional
+        Only look in the first `search` samples (e.g. before exposure).
+    threshold : float, optional
+        Use the first window with a standard deviation under this value
+        (as `MassConverter`) instead of the quietest one. If there is none,
+        the quietest is used.
+
+    Returns
+    -------
+    tuple
+        Reference frequency and the index label at the end of the window.
+    """
+    part = freq.iloc[:search] if search else freq
+    values = part.to_numpy(dtype=float)
+    std = _rolling_std(values, window)
+    if np.isnan(std).all():
+        return values.mean(), part.index[-1]
+    quiet = np.flatnonzero(std <= threshold) if threshold is not None else []
+    end = int(quiet[0]) if len(quiet) else int(np.nanargmin(std))
+    return values[end - window + 1:end + 1].mean(), part.index[end]
+
+
+class _DriftTracker:
+    """Running estimate of the frequency drift, updated one block of samples at a time."""
+
+    def __init__(self, drift_window=500, quiet_window=20, quiet_rate=0.05):
+        self.slow = self._coeffs(drift_window)
+        self.fast = self._coeffs(quiet_window)
+        self.quiet_rate = quiet_rate
+        # filter states: fast derivative and weights, slow derivative and weights
+        self.states = [np.zeros(1) for _ in range(4)]
+        self.last = None
+        self.drift = 0.0
+
+    @staticmethod
+    def _coeffs(window):
+        alpha = 2 / (window + 1)
+        return [alpha], [1, alpha - 1]
+
+    def _filter(self, coeffs, ind, values):
+        out, self.states[ind] = sig.lfilter(*coeffs, values, zi=self.states[ind])
+        return out
+
+    def push(self, seconds, freq):
+        """Return the drift (in Hz) at each of the new samples."""
+        if len(freq) == 0:
+            return np.empty(0)
+        prev_t, prev_f = self.last if self.last else (seconds[0], freq[0])
+        dt = np.diff(seconds, prepend=prev_t)
+        df = np.diff(freq, prepend=prev_f)
+        self.last = (seconds[-1], freq[-1])
+
+        valid = np.isfinite(df) & (dt > 0)
+        rate = np.where(valid, df / np.where(valid, dt, 1), 0)
+        weight = valid.astype(float)
+
+        # bias corrected exponential averages, as ratios of filtered sums
+        fast = self._filter(self.fast, 0, rate * weight) / np.maximum(self._filter(self.fast, 1, weight), 1e-12)
+        quiet = weight * (np.abs(fast) < self.quiet_rate)
+        num = self._filter(self.slow, 2, rate * quiet)
+        den = self._filter(self.slow, 3, quiet)
+        drift_rate = np.where(den > 1e-12, num / np.maximum(den, 1e-12), 0)
+
+        drift = self.drift + np.cumsum(np.where(valid, drift_rate * dt, 0))
+        self.drift = drift[-1]
+        return drift
+
+
+def _seconds(index):
+    return np.asarray((index - index[0]) / pd.Timedelta(seconds=1), dtype=float)
+
+
+def frequency_to_mass(
+    data,
+    col=FREQ_COL,
+    F0=None,
+    reference_window=50,
+    reference_search=None,
+    reference_std=None,
+    drift_window=None,
+    quiet_window=20,
+    quiet_rate=0.05,
+    de=d,
+):
+    """
+    Convert a resonance frequency series to mass with the Sauerbrey equation.
+
+    Parameters
+    ----------
+    data : DataFrame
+        Time indexed frame with a frequency column, such as `trace_results`
+        or markers from `read_markerfile`.
+    col : str
+        Frequency column.
+    F0 : float, optional
+        Reference frequency, found with `find_reference` if not given.
+    reference_window, reference_search : int
+        Passed to `find_reference`.
+    reference_std : float, optional
+        Threshold passed to `find_reference`, giving the same reference
+        as `MassConverter`.
+    drift_window : int, optional
+        Number of samples of the drift rate average. No drift correction
+        is done if not given.
+    quiet_window : int
+        Number of samples the frequency derivative is averaged over to
+        decide if the frequency is stable.
+    quiet_rate : float
+        Derivative (Hz/s) under which the frequency is considered stable
+        and the drift rate is updated.
+    de : float
+        Electrode diameter (cm).
+
+    Returns
+    -------
+    DataFrame
+        Frequency, drift, corrected frequency shift and mass (mg).
+    """
+    freq = data[col].astype(float)
+
+    if drift_window:
+        tracker = _DriftTracker(drift_window, quiet_window, quiet_rate)
+        drift = tracker.push(_seconds(data.index), freq.to_numpy())
+    else:
+        drift = np.zeros(len(freq))
+    corrected = freq - drift
+
+    if F0 is None:
+        F0, _ = find_reference(corrected, reference_window, reference_search, reference_std)
+
+    shift = corrected - F0
+    return pd.DataFrame(
+        {
+            col: freq,
+            DRIFT_COL: drift,
+            SHIFT_COL: shift,
+            MASS_COL: sauerbrey(shift.to_numpy(), F0, de),
+        },
+        index=data.index,
+    )
+
+
+class MassConverter:
+    """
+    Incremental frequency to mass conversion for live acquisition.
+
+    Blocks of (time, frequency) samples are pushed as they arrive, each
+    costing a constant amount of work per sample. If no reference
+    frequency is given, samples are held back until the first window of
+    `reference_window` samples with a standard deviation below
+    `reference_std` (any, if not given) and its mean is used. With a
+    threshold, the result is that of `frequency_to_mass` with the same
+    `reference_std`.
+
+        converter = MassConverter(drift_window=500)
+        for markers in new_markers:
+            masses = converter.push(markers)
+    """
+
+    def __init__(
+        self,
+        F0=None,
+        col=FREQ_COL,
+        reference_window=50,
+        reference_std=None,
+        drift_window=None,
+        quiet_window=20,
+        quiet_rate=0.05,
+        de=d,
+    ):
+        self.F0 = F0
+        self.col = col
+        self.reference_window = reference_window
+        self.reference_std = reference_std
+        self.de = de
+        self.tracker = _DriftTracker(drift_window, quiet_window, quiet_rate) if drift_window else None
+        self.start = None
+        self.pending = []
+        # last corrected frequencies, for reference windows spanning pushes
+        self.tail = np.empty(0)
+
+    def _find_reference(self, corrected):
+        """Check windows ending at the new samples for a quiet reference."""
+        window = self.reference_window
+        values = np.concatenate((self.tail, corrected))
+        self.tail = values[-(window - 1):] if window > 1 else np.empty(0)
+        if len(values) < window:
+            return None
+        std = _rolling_std(values, window)
+        quiet = np.flatnonzero(std <= self.reference_std) if self.reference_std is not None else [window - 1]
+        if len(quiet) == 0:
+            return None
+        end = quiet[0]
+        return values[end - window + 1:end + 1].mean()
+
+    def push(self, data):
+        """
+        Add a time indexed frame of new frequencies.
+
+        Returns the converted samples (as `frequency_to_mass`), which can
+        include earlier samples held back until the reference was found.
+        """
+        if len(data) == 0:
+            return None
+        if self.start is None:
+            self.start = data.index[0]
+
+        freq = data[self.col].astype(float)
+        if self.tracker is not None:
+            seconds = np.asarray((data.index - self.start) / pd.Timedelta(seconds=1), dtype=float)
+            drift = self.tracker.push(seconds, freq.to_numpy())
+        else:
+            drift = np.zeros(len(freq))
+        block = pd.DataFrame({self.col: freq, DRIFT_COL: drift}, index=data.index)
+
+        if self.F0 is None:
+            self.pending.append(block)
+            self.F0 = self._find_reference((block[self.col] - block[DRIFT_COL]).to_numpy())
+            if self.F0 is None:
+                return None
+            block = pd.concat(self.pending) if len(self.pending) > 1 else block
+            self.pending, self.tail = [], np.empty(0)
+
+        shift = block[self.col] - block[DRIFT_COL] - self.F0
+        block[SHIFT_COL] = shift
+        block[MASS_COL] = sauerbrey(shift.to_numpy(), self.F0, self.de)
+        return block
@@ -0,0 +1,142 @@
+"""
+Module comprising ragged storage of QCM traces.
+
+Traces recorded on different frequency axes are kept as they were
+measured instead of being interpolated on a common grid. Amplitudes are
+concatenated in a single array with the offsets of each trace (as in a
+CSR matrix), and identical frequency axes are only stored once.
+
+@author: Dr. Paul Iacomi
+@date: Oct 2026
+"""
+
+__all__ = [
+    'RaggedTraces',
+]
+
+import numpy as np
+import pandas as pd
+
+
+class RaggedTraces:
+    """
+    Traces of possibly different lengths and frequency axes.
+
+    Parameters
+    ----------
+    values : ndarray
+        Amplitudes of all traces, concatenated.
+    offsets : ndarray
+        Start of each trace in `values`, with the total length appended.
+    grid_ids : ndarray
+        Index of the frequency axis of each trace in `grids`.
+    grids : list of ndarray
+        Unique frequency axes.
+    timestamps : DatetimeIndex
+        Timestamp of each trace.
+    """
+
+    def __init__(self, values, offsets, grid_ids, grids, timestamps):
+        self.values = np.asarray(values)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.grid_ids = np.asarray(grid_ids, dtype=np.int64)
+        self.grids = list(grids)
+        self.timestamps = pd.DatetimeIndex(timestamps)
+
+    @classmethod
+    def from_frames(cls, frames):
+        """Build from single column frames indexed by frequency (as read from format 2 files)."""
+        grids, grid_ids, lookup = [], [], {}
+        lengths = np.empty(len(frames), dtype=np.int64)
+
+        for ind, df in enumerate(frames):
+            freq = df.index.to_numpy(dtype=float)
+            key = (len(freq), hash(freq.tobytes()))
+            candidates = lookup.setdefault(key, [])
+            for grid_id in candidates:
+                if np.array_equal(grids[grid_id], freq):
+                    break
+            else:
+                grid_id = len(grids)
+                grids.append(freq)
+                candidates.append(grid_id)
+            grid_ids.append(grid_id)
+            lengths[ind] = len(freq)
+
+        offsets = np.zeros(len(frames) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        values = np.empty(offsets[-1])
+        for ind, df in enumerate(frames):
+            values[offsets[ind]:offsets[ind + 1]] = df.iloc[:, 0].to_numpy()
+
+        return cls(values, offsets, grid_ids, grids, [df.columns[0] for df in frames])
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def __iter__(self):
+        """Iterate over (timestamp, frequency, amplitude) of each trace."""
+        for ind in range(len(self)):
+            yield (self.timestamps[ind], ) + self.trace(ind)
+
+    @property
+    def columns(self):
+        """Trace timestamps, as the columns of an interpolated frame would be."""
+        return self.timestamps
+
+    @property
+    def shared_grid(self):
+        """The frequency axis common to all traces, or None if they differ."""
+        return self.grids[0] if len(self.grids) == 1 else None
+
+    def trace(self, ind):
+        """Frequency and amplitude arrays (views) of a single trace."""
+        return (
+            self.grids[self.grid_ids[ind]],
+            self.values[self.offsets[ind]:self.offsets[ind + 1]],
+        )
+
+    def take(self, indices):
+        """Select (and reorder) traces by position."""
+        indices = np.asarray(indices)
+        lengths = np.diff(self.offsets)[indices]
+        offsets = np.zeros(len(indices) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        values = np.concatenate([self.trace(ind)[1] for ind in indices]) if len(indices) else self.values[:0]
+        return RaggedTraces(values, offsets, self.grid_ids[indices], self.grids, self.timestamps[indices])
+
+    def sort(self):
+        """Traces sorted by timestamp."""
+        if self.timestamps.is_monotonic_increasing:
+            return self
+        return self.take(np.argsort(self.timestamps, kind="stable"))
+
+    def to_frame(self, minpoint=None, maxpoint=None, npoints=None):
+        """
+        Return the traces as a (frequency, timestamp) dataframe.
+
+        Traces sharing a single frequency axis are returned on it as is,
+        unless a new axis is requested. Otherwise they are interpolated on
+        `npoints` (default the longest trace) between `minpoint` and
+        `maxpoint` (default the full range covered).
+        """
+        grid = self.shared_grid
+        if grid is not None and minpoint is None and maxpoint is None and npoints is None:
+            data = self.values.reshape(len(self), len(grid))
+            return pd.DataFrame(data.T, index=grid, columns=self.timestamps, copy=False)
+
+        if minpoint is None:
+            minpoint = min(g.min() for g in self.grids)
+        if maxpoint is None:
+            maxpoint = max(g.max() for g in self.grids)
+        if npoints is None:
+            npoints = max(len(g) for g in self.grids)
+
+        newind = np.linspace(minpoint, maxpoint, npoints)
+        data = np.empty((len(self), npoints))
+        for ind in range(len(self)):
+            data[ind] = np.interp(newind, *self.trace(ind))
+        return pd.DataFrame(data.T, index=newind, columns=self.timestamps, copy=False)
+
+    def __repr__(self):
+        return f"RaggedTraces({len(self)} traces, {len(self.values)} points, {len(self.grids)} frequency axes)"
@@ -5,7 +5,9 @@ Module comprising processing of QCM traces and markers.
 @date: Jan 2021
 """
 
+import functools
 import pathlib
+import warnings
 
 import numpy as np
 import pandas as pd
@@ -13,92 +15,483 @@ import scipy.signal as sig
 import plotly.graph_objects as go
 from dateutil import parser
 from scipy.signal import find_peaks, peak_widths
-from tqdm import tqdm
+
+from ..common import profiled
+from ..common import progress_map
+from ..common import scan_files
+from ..common import record
+from ..common import stage
+from .ragged import RaggedTraces
 
 __all__ = [
     'read_tracefiles',
     'denoise_signal',
     'read_markerfile',
+    'align_markers',
+    'MARKER_DATETIME_FORMATS',
     'calc_tracedata',
     'plot_qcm',
+    'plot_traces',
     'FREQ_COL',
     'WIDTH_COL',
+    'STATUS_COL',
 ]
 
 FREQ_COL = "Resonance frequency [Hz]"
 WIDTH_COL = "Peak width [Hz]"
+STATUS_COL = "Peak status"
+
+
+def _stem_timestamp(name):
+    return parser.parse(pathlib.Path(name).stem)
+
+
+def _read_trace_2(trace):
+    """Read a format 2 trace (frequency, amplitude) from a scanned file."""
+    with stage("read"):
+        df = pd.read_csv(trace.path, names=[trace.timestamp])
+        record(rows=len(df), nbytes=trace.size)
+    return df
+
+
+def _read_trace_1(trace, dtype=None):
+    """Read a format 1 trace (amplitude only) from a scanned file as an array."""
+    with stage("read"):
+        values = pd.read_csv(trace.path, header=None, usecols=[0], dtype=dtype, engine='c')
+        values = values.to_numpy().ravel()
+        record(rows=len(values), nbytes=trace.size)
+    return values
+
+
+def _read_format_1(files, npoints, dtype=None, on_invalid="raise", jobs=1):
+    """
+    Read format 1 traces into a preallocated (trace, point) array.
+
+    Each file must have exactly `npoints` rows. Files with a different
+    number of rows raise a ValueError, or, if `on_invalid` is "skip", are
+    dropped with a warning. Returns the array and the files it contains.
+    """
+    if on_invalid not in ("raise", "skip"):
+        raise ValueError("on_invalid must be 'raise' or 'skip'.")
+
+    data = np.empty((len(files), npoints), dtype=dtype or np.float64)
+    valid = np.ones(len(files), dtype=bool)
+
+    def fill(ind, values):
+        if len(values) != npoints:
+            valid[ind] = False
+        else:
+            data[ind] = values
+
+    progress_map(
+        functools.partial(_read_trace_1, dtype=data.dtype),
+        files,
+        jobs=jobs,
+        desc="traces",
+        on_result=fill,
+    )
+
+    if not valid.all():
+        invalid = [f.name for f, ok in zip(files, valid) if not ok]
+        if on_invalid == "raise":
+            raise ValueError(f"Traces without {npoints} points: {', '.join(invalid)}")
+        warnings.warn(f"Skipped {len(invalid)} traces without {npoints} points: {', '.join(invalid)}")
+        data = data[valid]
+        files = [f for f, ok in zip(files, valid) if ok]
+
+    return data, files
+
+
+@profiled()
+def read_tracefiles(
+    folder='traces',
+    format=2,
+    minpoint=None,
+    maxpoint=None,
+    npoints=2000,
+    jobs=1,
+    dtype=None,
+    on_invalid="raise",
+    storage="interpolate",
+):
+    """
+    Read all tracefiles and concatenate them in a single dataframe.
+
+    Traces are sorted by their timestamp. With `jobs` other than 1,
+    files are read in a process pool (0 uses all cores).
 
+    Format 2 files hold their own frequency axis. By default, all traces
+    are interpolated on `npoints` between `minpoint` and `maxpoint`. With
+    `storage="ragged"` they are instead returned as measured in a
+    `RaggedTraces`, which can be interpolated later with its `to_frame`.
 
-def read_tracefiles(folder='traces', format=2, minpoint=None, maxpoint=None, npoints=2000):
-    """Read all tracefiles and concatenate them in a single dataframe."""
-    trace_dfs = []
+    Format 1 files only hold amplitudes, and must each have `npoints`
+    rows spanning `minpoint` to `maxpoint`. They are read straight into
+    a single array of `dtype` (e.g. float32 to halve memory); files with
+    a different length raise an error, or are skipped with a warning
+    if `on_invalid` is "skip".
+    """
     if format == 2:
-        for trace in tqdm(pathlib.Path(folder).glob('*.*')):
-            df = pd.read_csv(trace, names=[parser.parse(trace.stem)])
-            trace_dfs.append(df)
-        if not minpoint:
-            minpoint = min(df.index.min() for df in trace_dfs)
-        if not maxpoint:
-            maxpoint = max(df.index.max() for df in trace_dfs)
-        newind = np.linspace(minpoint, maxpoint, npoints)
-        for ind, df in enumerate(trace_dfs):
-            df_new = pd.DataFrame(index=newind)
-            df_new.index.name = df.index.name
-            df_new[df.columns[0]] = np.interp(newind, df.index, df[df.columns[0]])
-            trace_dfs[ind] = df_new
-        traces = pd.concat(trace_dfs, axis=1)
+        with stage("list"):
+            files = scan_files(folder, key=_stem_timestamp)
+        trace_dfs = progress_map(_read_trace_2, files, jobs=jobs, desc="traces")
+        if storage == "ragged":
+            with stage("ragged"):
+                return RaggedTraces.from_frames(trace_dfs)
+        if storage != "interpolate":
+            raise ValueError("Storage should be 'interpolate' or 'ragged'.")
+        with stage("interpolate"):
+            if not minpoint:
+                minpoint = min(df.index.min() for df in trace_dfs)
+            if not maxpoint:
+                maxpoint = max(df.index.max() for df in trace_dfs)
+            newind = np.linspace(minpoint, maxpoint, npoints)
+            for ind, df in enumerate(trace_dfs):
+                df_new = pd.DataFrame(index=newind)
+                df_new.index.name = df.index.name
+                df_new[df.columns[0]] = np.interp(newind, df.index, df[df.columns[0]])
+                trace_dfs[ind] = df_new
+            record(rows=npoints * len(trace_dfs))
+        with stage("concat"):
+            traces = pd.concat(trace_dfs, axis=1)
     elif format == 1:
-        traces = pd.DataFrame()
-        for trace in tqdm(pathlib.Path(folder).glob('*.*')):
-            df = pd.read_csv(trace, names=[trace.name])
-            traces[parser.parse(trace.name)] = df[trace.name]
-        traces = traces.set_index(np.linspace(minpoint, maxpoint, npoints))
+        if minpoint is None or maxpoint is None:
+            raise ValueError("Format 1 traces need a minpoint and a maxpoint.")
+        with stage("list"):
+            files = scan_files(folder, key=parser.parse)
+        data, files = _read_format_1(files, npoints, dtype=dtype, on_invalid=on_invalid, jobs=jobs)
+        with stage("frame"):
+            # the transposed array is used as the single block of the frame, without a copy
+            traces = pd.DataFrame(
+                data.T,
+                index=np.linspace(minpoint, maxpoint, npoints),
+                columns=pd.DatetimeIndex([f.timestamp for f in files]),
+                copy=False,
+            )
     return traces
 
 
-def read_markerfile(file):
-    """Read the resonance frequency from a marker file."""
+MARKER_DATETIME_FORMATS = [
+    "%Y-%m-%d %H:%M:%S.%f",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y/%m/%d %H:%M:%S.%f",
+    "%Y/%m/%d %H:%M:%S",
+    "%d/%m/%Y %H:%M:%S.%f",
+    "%d/%m/%Y %H:%M:%S",
+    "%m/%d/%Y %H:%M:%S.%f",
+    "%m/%d/%Y %H:%M:%S",
+    "%d.%m.%Y %H:%M:%S.%f",
+    "%d.%m.%Y %H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S.%f",
+    "%Y-%m-%dT%H:%M:%S",
+]
+
+
+def _marker_times(chunk, txt):
+    """Datetime string columns of a chunk of a marker file."""
+    if txt:
+        return [chunk['day'], chunk['hour']]
+    return [chunk['time']]
+
+
+def _joined_times(chunk, txt):
+    """Datetime strings of a chunk of a marker file, as a single column."""
+    times = _marker_times(chunk, txt)
+    return times[0].str.cat(times[1:], sep=' ') if txt else times[0]
+
+
+def _parse_formats(samples, formats):
+    """Times parsed with each of the formats that can parse all the samples."""
+    parsed = {}
+    for fmt in formats:
+        try:
+            parsed[fmt] = pd.to_datetime(samples, format=fmt)
+        except ValueError:
+            continue
+    return parsed
+
+
+def _guess_datetime_format(file, options, txt, chunksize=None, nsamples=100):
+    """
+    Return the format of MARKER_DATETIME_FORMATS that parses all the timestamps of a marker file.
+
+    The format is guessed from the first `nsamples` rows. If several formats
+    parse them (e.g. day first and month first dates with all days up to
+    12), the time columns of the whole file are read, in chunks, and only
+    the formats parsing every row are kept. If more than one is left and
+    they give different times, the format is ambiguous and a ValueError is
+    raised.
+    """
+    head = _joined_times(pd.read_csv(file, nrows=nsamples, **dict(options, engine="c")), txt)
+    if head.empty:
+        return None
+    candidates = list(_parse_formats(head, MARKER_DATETIME_FORMATS))
+    if not candidates:
+        raise ValueError(f"Could not detect the datetime format of '{head.iloc[0]}', pass it explicitly.")
+    if len(candidates) == 1:
+        return candidates[0]
+
+    agree = True
+    reader = pd.read_csv(file, chunksize=chunksize, usecols=['day', 'hour'] if txt else ['time'], **options)
+    for chunk in [reader] if chunksize is None else reader:
+        parsed = _parse_formats(_joined_times(chunk, txt), candidates)
+        if not parsed:
+            raise ValueError(
+                f"None of the datetime formats {', '.join(candidates)} parses all the timestamps of '{file}', "
+                "pass `datetime_format` explicitly."
+            )
+        candidates = list(parsed)
+        first = parsed[candidates[0]]
+        agree = agree and all(parsed[fmt].equals(first) for fmt in candidates[1:])
+    if len(candidates) > 1 and not agree:
+        raise ValueError(
+            f"The datetime format of '{file}' is ambiguous ({', '.join(candidates)}), "
+            "pass `datetime_format` explicitly."
+        )
+    return candidates[0]
+
+
+def _parse_datetimes(columns, datetime_format):
+    """
+    Parse datetime strings split over one or more columns (joined by a space).
 
-    if file.endswith(".txt"):
-        markers = pd.read_csv(file, names=['day', 'hour', FREQ_COL], delim_whitespace=True)
-        markers['time'] = markers['day'] + ' ' + markers['hour']
-        markers = markers[['time', FREQ_COL]].set_index(['time'])
-        markers.index = pd.to_datetime(markers.index)
+    The pyarrow compute kernels are used if available, as they are much
+    faster than pandas when the format is known.
+    """
+    if datetime_format and "%f" not in datetime_format:
+        try:
+            import pyarrow as pa
+            import pyarrow.compute as pc
+
+            arrays = [pa.array(col) for col in columns]
+            times = arrays[0]
+            if len(arrays) > 1:
+                times = pc.binary_join_element_wise(*arrays, pa.scalar(" ", times.type))
+            times = pc.strptime(times, format=datetime_format, unit="us")
+            return pd.DatetimeIndex(times.to_numpy(zero_copy_only=False), name='time')
+        except (ImportError, ValueError, NotImplementedError):
+            pass  # pyarrow errors derive from these, fall back to pandas
+
+    times = columns[0] if len(columns) == 1 else columns[0].str.cat(columns[1:], sep=' ')
+    return pd.DatetimeIndex(pd.to_datetime(times, format=datetime_format), name='time')
+
+
+def _reduce_markers(markers, resample, decimate, start):
+    """Decimate or partially resample (as sums and counts) a chunk of markers."""
+    if decimate:
+        keep = (np.arange(start, start + len(markers)) % decimate) == 0
+        markers = markers[keep]
+    if resample:
+        markers = markers[FREQ_COL].resample(resample).agg(['sum', 'count'])
+    return markers
+
+
+@profiled()
+def read_markerfile(
+    file,
+    datetime_format="auto",
+    engine="c",
+    chunksize=None,
+    resample=None,
+    decimate=None,
+):
+    """
+    Read the resonance frequency from a marker file.
+
+    Parameters
+    ----------
+    file : str
+        Marker file, either a whitespace separated ".txt" with day, hour
+        and frequency or a ".csv" with time and frequency.
+    datetime_format : str
+        strftime format of the timestamps. With "auto", the format of
+        MARKER_DATETIME_FORMATS parsing the whole file is used, the
+        file being scanned first if the start of the file does not tell
+        day first from month first dates. An error is raised if it stays
+        ambiguous. Timestamps are parsed with pyarrow when it is installed.
+    engine : str
+        Parser engine, "pyarrow" can be used for csv files.
+    chunksize : int, optional
+        Read the file in chunks of this many lines, reducing each one
+        before the next is read to bound memory on long logs.
+    resample : str, optional
+        Resample to the mean frequency over this pandas offset (e.g. "1min").
+    decimate : int, optional
+        Only keep one marker every `decimate` lines.
+    """
+    txt = str(file).endswith(".txt")
+    if txt:
+        options = dict(names=['day', 'hour', FREQ_COL], sep=r'\s+', dtype={'day': str, 'hour': str})
+    elif str(file).endswith(".csv"):
+        options = dict(names=['time', FREQ_COL], engine=engine, dtype={'time': str})
+    else:
+        raise ValueError("Marker files should be '.txt' or '.csv'.")
 
-    elif file.endswith(".csv"):
-        markers = pd.read_csv(file, names=['time', FREQ_COL], index_col='time', parse_dates=True)
+    if datetime_format == "auto":
+        # decided once for the whole file, so that all chunks are parsed alike
+        with stage("format"):
+            datetime_format = _guess_datetime_format(file, options, txt, chunksize)
+
+    with stage("read"):
+        reader = pd.read_csv(file, chunksize=chunksize, **options)
+        chunks = [reader] if chunksize is None else reader
+
+        parts, start = [], 0
+        for chunk in chunks:
+            times = _marker_times(chunk, txt)
+            with stage("timestamps"):
+                index = _parse_datetimes(times, datetime_format)
+            part = pd.DataFrame({FREQ_COL: chunk[FREQ_COL].to_numpy(dtype=float)}, index=index)
+            parts.append(_reduce_markers(part, resample, decimate, start))
+            start += len(chunk)
+            record(rows=len(chunk))
+        record(path=file)
+
+    markers = pd.concat(parts) if len(parts) > 1 else parts[0]
+    if resample:
+        # combine the bins split between chunks before averaging
+        sums = markers.groupby(level=0).sum() if chunksize else markers
+        markers = (sums['sum'] / sums['count']).to_frame(FREQ_COL).dropna()
+        markers.index.name = 'time'
 
     return markers
 
 
-def calc_tracedata(traces, pwidth=10, pheight=0.1):
-    """Calculate resonance frequency and peak width from traces"""
+def align_markers(markers, trace_results, tolerance=None):
+    """Marker frequency at the nearest marker time of each trace result."""
+    return pd.merge_asof(
+        trace_results[[]].sort_index(),
+        markers.sort_index(),
+        left_index=True,
+        right_index=True,
+        direction="nearest",
+        tolerance=pd.Timedelta(tolerance) if tolerance else None,
+    )
+
+
+# peak widths are measured within this many widths of the peak
+WIDTH_SPAN = 10
+
+
+def _find_peak(y, pwidth, pheight, lo=0, hi=None, near=None):
+    """
+    Find the resonance peak in y[lo:hi].
+
+    Returns the index and width (in points) of the first peak, or of the
+    peak closest to `near` if given, or None if there is no peak.
+    """
+    peaks, properties = find_peaks(y[lo:hi], width=pwidth, height=pheight)
+    if len(peaks) == 0:
+        return None
+    ind = 0 if near is None else np.argmin(np.abs(peaks + lo - near))
+    peak = lo + peaks[ind]
+    # width at half prominence, with the peak bases searched a few widths
+    # around the peak, wider than a tracking window but not the whole trace
+    margin = int(WIDTH_SPAN * properties["widths"][ind]) + 1
+    start = max(0, peak - margin)
+    width = peak_widths(y[start:peak + margin + 1], [peak - start], rel_height=0.5)[0][0]
+    return peak, width
+
+
+def _iter_traces(traces, denoise=None, chunksize=256):
+    """Yield the timestamp, frequency and (optionally smoothed) amplitude of each trace."""
+    if isinstance(traces, RaggedTraces):
+        for exp, x, y in traces:
+            if denoise:
+                with stage("denoise"):
+                    y = sig.savgol_filter(y, *denoise)
+            yield exp, x, y
+        return
+
+    x = traces.index.to_numpy()
+    values = traces.to_numpy()
+    for start in range(0, values.shape[1], chunksize):
+        block = values[:, start:start + chunksize]
+        if denoise:
+            with stage("denoise"):
+                block = sig.savgol_filter(block, *denoise, axis=0)
+        for exp, y in zip(traces.columns[start:start + chunksize], block.T):
+            yield exp, x, y
+
+
+@profiled()
+def calc_tracedata(
+    traces,
+    pwidth=10,
+    pheight=0.1,
+    denoise=None,
+    chunksize=256,
+    track=False,
+    track_window=None,
+    track_widen=3,
+):
+    """
+    Calculate resonance frequency and peak width from traces
+
+    Traces can be a dataframe or a `RaggedTraces`. If `denoise` is given
+    as a (window, order) tuple, traces are smoothed with a savitzky-golay
+    filter on the fly, `chunksize` traces at a time, so that the matrix
+    is only traversed once.
+
+    With `track`, traces are processed in time order and the peak is only
+    searched within `track_window` points of the previous resonance (by
+    default twice the previous peak width). If it is lost, the window is
+    doubled up to `track_widen` times before falling back to a full scan.
+    The results then have a STATUS_COL column ("tracked", "widened",
+    "full" or "failed") and failed traces are NaN instead of 0.
+    """
 
     timestamps = []
     maxima = []
     widths = []
+    statuses = []
+
+    if track:
+        if isinstance(traces, RaggedTraces):
+            traces = traces.sort()
+        elif not traces.columns.is_monotonic_increasing:
+            traces = traces.sort_index(axis=1)
 
-    for exp in traces.columns:
+    previous, previous_width = None, None
 
-        x = traces.index
-        y = traces[exp].values
+    for exp, x, y in _iter_traces(traces, denoise, chunksize):
 
-        peaks, properties = find_peaks(y, width=pwidth, height=pheight)
-        results_half = peak_widths(y, peaks, rel_height=0.5)
+        with stage("peaks"):
+            found, status = None, "full"
+            if track and previous is not None:
+                # the frequency axis may change between ragged traces
+                near = np.searchsorted(x, previous)
+                window = track_window or int(2 * max(previous_width, pwidth))
+                for attempt in range(track_widen + 1):
+                    found = _find_peak(y, pwidth, pheight, max(0, near - window), near + window + 1, near)
+                    if found is not None:
+                        status = "widened" if attempt else "tracked"
+                        break
+                    window *= 2
+            if found is None:
+                found = _find_peak(y, pwidth, pheight)
+            record(rows=len(y))
 
         timestamps.append(exp)
-        try:
-            maxima.append(x[peaks].values[0])
-            widths.append(results_half[0][0])
-        except:
+        if found is not None:
+            previous, previous_width = x[found[0]], found[1]
+            maxima.append(x[found[0]])
+            widths.append(found[1])
+        elif track:
+            status = "failed"
+            maxima.append(np.nan)
+            widths.append(np.nan)
+        else:
             maxima.append(0)
             widths.append(0)
+        statuses.append(status)
+
+    data = {FREQ_COL: maxima, WIDTH_COL: widths}
+    if track:
+        data[STATUS_COL] = statuses
 
     trace_results = pd.DataFrame(
-        data={
-            FREQ_COL: maxima,
-            WIDTH_COL: widths
-        },
+        data=data,
         index=timestamps,
     ).sort_index()
 
@@ -110,6 +503,26 @@ def denoise_signal(signal, window=51, order=2):
     return sig.savgol_filter(signal, window, order)
 
 
+def plot_traces(traces, every=1):
+    """Plot resonance traces (a dataframe or a `RaggedTraces`), one line per timestamp."""
+    fig = go.Figure(
+        layout=dict(
+            template="simple_white",
+            autosize=True,
+            width=600,
+            margin=dict(l=10, r=10, b=10, t=20, pad=4),
+            xaxis=dict(title_text="Frequency [Hz]"),
+            yaxis=dict(title_text="Amplitude"),
+            showlegend=False,
+        )
+    )
+    for ind, (exp, x, y) in enumerate(_iter_traces(traces)):
+        if ind % every:
+            continue
+        fig.add_trace(go.Scatter(x=x, y=y, name=str(exp), line=dict(width=1)))
+    return fig
+
+
 def plot_qcm(markers, trace_results):
     """Plot the QCM data (frequency and width) from the markers and traces."""
     return go.Figure(
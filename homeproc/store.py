@@ -0,0 +1,360 @@
+"""
+Chunked store of the time series of an experiment, as Parquet files.
+
+DVS data, IDE scans, QCM traces and results and marker frequencies are
+all frames with a time index (or a time level). Each one is kept as a
+series in its own folder, split into one file per time partition (by
+default one per day) written in compressed row groups of `chunksize`
+rows. The time span of every row group is kept in a small manifest, so
+that a query only reads the row groups overlapping the requested time
+range, and only the requested columns of them.
+
+    store = ExperimentStore("experiment")
+    info, data = read_dvs_file("run.txt")
+    store.write("dvs", data, meta=info)
+    store.append("markers", read_markerfile("markers.csv"))
+    df = store.read("dvs", start="2021-03-01 12:00", columns=["Mass [mg]"])
+
+Wide trace frames (frequency x timestamp, as from `read_tracefiles`)
+are stored transposed, one row per trace, and returned as they were.
+
+Long series can also be summarized in a min/max/mean `Pyramid` kept in
+their folder and updated by appends, so that `overview` can return any
+time window at screen resolution without reading the data:
+
+    store.build_pyramid("dvs")
+    plot_transient(store.overview("dvs", start, end, pixels=800), y1="Mass [mg]")
+
+@author: Dr. Paul Iacomi
+@date: Oct 2026
+"""
+
+__all__ = [
+    "ExperimentStore",
+]
+
+import json
+import os
+import pathlib
+import shutil
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .common import Pyramid
+
+MANIFEST = "manifest.json"
+PYRAMID = "pyramid"
+
+
+def _jsonable(obj):
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, (pd.Timestamp, pd.Timedelta)):
+        return obj.isoformat()
+    return str(obj)
+
+
+def _index_columns(names):
+    return [f"__index_{i}__" for i in range(len(names))]
+
+
+def _time_position(index):
+    """Position of the (first) datetime level of an index."""
+    levels = index.levels if isinstance(index, pd.MultiIndex) else [index]
+    for ind, level in enumerate(levels):
+        if isinstance(level, pd.DatetimeIndex):
+            return ind
+    raise ValueError("Stored data should have a datetime index, or a datetime index level.")
+
+
+class ExperimentStore:
+    """
+    Folder of time-partitioned, chunked Parquet series.
+
+    Parameters
+    ----------
+    folder : str
+        Store folder, created if needed.
+    """
+
+    def __init__(self, folder):
+        self.folder = pathlib.Path(folder)
+        self.folder.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def series(self):
+        """Names of the stored series."""
+        return sorted(p.parent.relative_to(self.folder).as_posix() for p in self.folder.rglob(MANIFEST))
+
+    def __contains__(self, name):
+        return (self.folder / name / MANIFEST).exists()
+
+    def manifest(self, name):
+        """Layout of a series: its columns, index, metadata and chunks."""
+        if name not in self:
+            raise KeyError(f"No series '{name}' in the store.")
+        with open(self.folder / name / MANIFEST) as file:
+            return json.load(file)
+
+    def meta(self, name):
+        """Metadata stored with a series (e.g. the DVS info dict)."""
+        return self.manifest(name)["meta"]
+
+    def time_range(self, name):
+        """First and last time of a series (None for an empty series)."""
+        chunks = self.manifest(name)["chunks"]
+        if not chunks:
+            return None, None
+        return (
+            min(pd.Timestamp(c["start"]) for c in chunks),
+            max(pd.Timestamp(c["end"]) for c in chunks),
+        )
+
+    def _save_manifest(self, name, manifest):
+        path = self.folder / name / MANIFEST
+        with open(path.with_suffix(".tmp"), "w") as file:
+            json.dump(manifest, file, default=_jsonable)
+        os.replace(path.with_suffix(".tmp"), path)
+
+    @staticmethod
+    def _layout(data):
+        """Flatten a frame into a table with the index as columns, and its manifest."""
+        transposed = isinstance(data.columns, pd.DatetimeIndex) and not isinstance(data.index, pd.DatetimeIndex)
+        if transposed:
+            data = data.T
+        # index levels get reserved names, as they may clash with the columns
+        names = _index_columns(data.index.names)
+        flat = data.rename_axis(names).reset_index()
+        flat.columns = [str(c) for c in flat.columns]
+        layout = {
+            "index": list(data.index.names),
+            "time": names[_time_position(data.index)],
+            "transposed": transposed,
+            "columns_name": data.columns.name,
+            "numeric_columns": bool(transposed and pd.api.types.is_numeric_dtype(data.columns)),
+            "columns": [str(c) for c in data.columns],
+            "dtypes": {c: str(t) for c, t in flat.dtypes.items()},
+        }
+        return flat, layout
+
+    def write(self, name, data, meta=None, partition="1D", chunksize=65536, compression="zstd"):
+        """
+        Store a frame as a new series, replacing any series of that name.
+
+        Parameters
+        ----------
+        name : str
+            Series name, e.g. "dvs" or "ide/run2".
+        data : DataFrame
+            Time indexed data, e.g. from `read_dvs_file`, `read_novo_file`,
+            `read_tracefiles`, `calc_tracedata` or `read_markerfile`.
+        meta : dict, optional
+            Metadata kept with the series, e.g. the info from the readers.
+        partition : str
+            Pandas frequency of the time partitions, one file each.
+        chunksize : int
+            Rows per row group, the unit read by queries.
+        compression : str
+            Parquet compression codec.
+        """
+        # the data is checked before replacing the series
+        _, layout = self._layout(data)
+        folder = self.folder / name
+        if folder.exists():
+            shutil.rmtree(folder)
+        folder.mkdir(parents=True)
+        manifest = dict(
+            layout,
+            meta=meta or {},
+            partition=partition,
+            chunksize=chunksize,
+            compression=compression,
+            nfiles=0,
+            chunks=[],
+        )
+        self._save_manifest(name, manifest)
+        return self.append(name, data)
+
+    def append(self, name, data):
+        """
+        Add rows to a series, creating it with the defaults if needed.
+
+        Appended rows go in new files, existing chunks are never rewritten.
+        """
+        if name not in self:
+            return self.write(name, data)
+        manifest = self.manifest(name)
+        flat, layout = self._layout(data)
+        if layout["columns"] != manifest["columns"] or layout["index"] != manifest["index"]:
+            raise ValueError(f"Appended data does not have the columns of series '{name}'.")
+        if len(flat) == 0:
+            return self
+
+        times = pd.DatetimeIndex(flat[manifest["time"]])
+        if not times.is_monotonic_increasing:
+            order = np.argsort(times.to_numpy(), kind="stable")
+            flat, times = flat.iloc[order], times[order]
+        pyramid = self.pyramid(name)
+        if pyramid is not None and pyramid.end is not None and len(times) and times[0] < pyramid.end:
+            raise ValueError(f"Series '{name}' has a pyramid, only later rows can be appended.")
+        keys = times.floor(manifest["partition"])
+        bounds = np.flatnonzero(keys[1:] != keys[:-1]) + 1
+        starts = np.concatenate(([0], bounds))
+        ends = np.concatenate((bounds, [len(flat)]))
+
+        chunksize = manifest["chunksize"]
+        for start, end in zip(starts, ends):
+            filename = f"{keys[start]:%Y%m%dT%H%M%S}-{manifest['nfiles']:05d}.parquet"
+            table = pa.Table.from_pandas(flat.iloc[start:end], preserve_index=False)
+            with pq.ParquetWriter(self.folder / name / filename, table.schema,
+                                  compression=manifest["compression"]) as writer:
+                for group, offset in enumerate(range(0, end - start, chunksize)):
+                    writer.write_table(table.slice(offset, chunksize))
+                    span = times[start + offset:min(start + offset + chunksize, end)]
+                    manifest["chunks"].append({
+                        "file": filename,
+                        "group": group,
+                        "start": span[0].isoformat(),
+                        "end": span[-1].isoformat(),
+                        "rows": len(span),
+                    })
+            manifest["nfiles"] += 1
+
+        # the pyramid is marked stale until it has the new rows, and is rebuilt
+        # by `overview` if updating it failed
+        manifest["pyramid_stale"] = pyramid is not None
+        self._save_manifest(name, manifest)
+        if pyramid is not None:
+            pyramid.append(flat.set_index(manifest["time"]))
+            self._set_pyramid_stale(name, False)
+        return self
+
+    def chunks(self, name, start=None, end=None):
+        """Chunks of a series overlapping the time range, as a frame."""
+        chunks = pd.DataFrame(self.manifest(name)["chunks"], columns=["file", "group", "start", "end", "rows"])
+        chunks["start"] = pd.to_datetime(chunks["start"], format="ISO8601")
+        chunks["end"] = pd.to_datetime(chunks["end"], format="ISO8601")
+        keep = np.ones(len(chunks), dtype=bool)
+        if start is not None:
+            keep &= chunks["end"] >= pd.Timestamp(start)
+        if end is not None:
+            keep &= chunks["start"] <= pd.Timestamp(end)
+        return chunks[keep]
+
+    def _read_chunks(self, name, manifest, chunks, columns):
+        """Read row groups of a series, with its index (as stored) set."""
+        index = _index_columns(manifest["index"])
+        parts = []
+        for filename, groups in chunks.groupby("file", sort=False)["group"]:
+            parquet = pq.ParquetFile(self.folder / name / filename)
+            parts.append(parquet.read_row_groups(groups.tolist(), columns=index + columns))
+        if parts:
+            flat = pa.concat_tables(parts).to_pandas()
+        else:
+            dtypes = manifest["dtypes"]
+            flat = pd.DataFrame({c: pd.Series(dtype=dtypes[c]) for c in index + columns})
+        return flat.set_index(index)
+
+    def read(self, name, start=None, end=None, columns=None):
+        """
+        Read a series between two times (inclusive), optionally only some columns.
+
+        Only the row groups overlapping the time range are read. The data is
+        returned with its original index (and orientation, for traces).
+        """
+        manifest = self.manifest(name)
+        wanted = manifest["columns"] if columns is None else [str(c) for c in columns]
+        data = self._read_chunks(name, manifest, self.chunks(name, start, end), wanted)
+
+        times = data.index.get_level_values(manifest["time"])
+        keep = np.ones(len(data), dtype=bool)
+        if start is not None:
+            keep &= times >= pd.Timestamp(start)
+        if end is not None:
+            keep &= times <= pd.Timestamp(end)
+        data = data[keep].rename_axis(manifest["index"])
+
+        if manifest["numeric_columns"]:
+            data.columns = data.columns.astype(float)
+        data.columns.name = manifest["columns_name"]
+        if manifest["transposed"]:
+            data = data.T
+        return data
+
+    def _set_pyramid_stale(self, name, stale):
+        manifest = self.manifest(name)
+        manifest["pyramid_stale"] = stale
+        self._save_manifest(name, manifest)
+
+    def pyramid(self, name):
+        """
+        The `Pyramid` of a series, or None if it has none.
+
+        A pyramid left out of date by a failed update is rebuilt first.
+        """
+        folder = self.folder / name / PYRAMID
+        if not folder.exists():
+            return None
+        pyramid = Pyramid(folder)
+        if self.manifest(name).get("pyramid_stale"):
+            meta = pyramid.meta
+            pyramid = self.build_pyramid(name, columns=meta["columns"], base=meta["base"], depth=meta["depth"])
+        return pyramid
+
+    def build_pyramid(self, name, columns=None, base=4, depth=20):
+        """
+        Summarize a series in a min/max/mean `Pyramid`, stored with it.
+
+        The series is read one chunk at a time. The pyramid is then updated
+        by every `append`, which must then only add later rows.
+
+        Parameters
+        ----------
+        name : str
+            Series with a plain time index (e.g. DVS data or markers).
+        columns : list, optional
+            Columns summarized, by default all numeric columns.
+        base, depth : int
+            Finest level (bins of 2^base rows) and number of levels.
+        """
+        manifest = self.manifest(name)
+        if len(manifest["index"]) > 1 or manifest["transposed"]:
+            raise ValueError("Pyramids summarize series with only a time index, e.g. one column per frequency.")
+        if columns is None:
+            columns = [c for c in manifest["columns"] if pd.api.types.pandas_dtype(manifest["dtypes"][c]).kind in "iuf"]
+        columns = [str(c) for c in columns]
+
+        self._set_pyramid_stale(name, True)
+        folder = self.folder / name / PYRAMID
+        if folder.exists():
+            shutil.rmtree(folder)
+        pyramid = Pyramid.create(folder, columns, index_name=manifest["index"][0], base=base, depth=depth)
+        chunks = self.chunks(name).sort_values("start", kind="stable")
+        for ind in range(len(chunks)):
+            pyramid.append(self._read_chunks(name, manifest, chunks.iloc[ind:ind + 1], columns))
+        self._set_pyramid_stale(name, False)
+        return pyramid
+
+    def overview(self, name, start=None, end=None, pixels=1000, how="minmax", columns=None):
+        """
+        Data of a series in a time window, reduced to about `pixels` points.
+
+        Windows with no more rows than pixels are read from the series
+        itself, larger ones are answered from the level of its pyramid
+        (see `build_pyramid` and `Pyramid.query`). The result can be given
+        to `plot_transient` as is.
+        """
+        pyramid = self.pyramid(name)
+        if pyramid is None:
+            raise ValueError(f"Series '{name}' has no pyramid, see `build_pyramid`.")
+        if pyramid.rows(start, end) <= pixels:
+            return self.read(name, start, end, columns=pyramid.columns if columns is None else columns)
+        return pyramid.query(start, end, pixels=pixels, how=how, columns=columns)
+
+    def __repr__(self):
+        return f"ExperimentStore('{self.folder}', {len(self.series)} series)"
@@ -1 +1,5 @@
-from .plot import plot_pxrd
\ No newline at end of file
+from .plot import plot_pxrd
+from .patterns import read_pattern, read_patterns, PatternStore
+from .background import background, subtract_background
+from .peaks import track_peaks, d_spacing, cubic_lattice_parameter
+from .similarity import normalize_patterns, similarity_matrix, segment_patterns
@@ -0,0 +1,154 @@
+"""
+Module comprising background estimation of powder diffraction patterns.
+
+Backgrounds of a whole (pattern, 2theta) matrix are computed at once,
+with a single factorization shared by every pattern and iteration:
+
+    "als": asymmetric least squares smoothing. The background is the
+        Whittaker smooth (I + lam D'D) z = y of the pattern, then
+        repeatedly of the pattern with the points above the background
+        (beyond the noise) replaced by it. Peaks are stripped while the
+        smoothing operator, and its banded Cholesky factor, never change.
+    "poly": iterative polynomial fit, stripping peaks in the same way,
+        through one QR factorization of the Vandermonde matrix.
+
+@author: Dr. Paul Iacomi
+@date: Oct 2026
+"""
+
+__all__ = [
+    "background",
+    "subtract_background",
+]
+
+import numpy
+import scipy.linalg as linalg
+import scipy.sparse as sparse
+
+
+def _als_factor(npoints, lam):
+    """Banded Cholesky factor of I + lam D'D, D the second difference."""
+    D = sparse.diags([1.0, -2.0, 1.0], [0, 1, 2], shape=(npoints - 2, npoints))
+    M = sparse.identity(npoints) + lam * (D.T @ D)
+    ab = numpy.zeros((3, npoints))
+    ab[2] = M.diagonal(0)
+    ab[1, 1:] = M.diagonal(1)
+    ab[0, 2:] = M.diagonal(2)
+    return linalg.cholesky_banded(ab)
+
+
+def _noise(y):
+    """Robust noise level of each pattern (columns) from its point to point differences."""
+    return 1.4826 * numpy.median(numpy.abs(numpy.diff(y, axis=0)), axis=0) / numpy.sqrt(2)
+
+
+def _strip(y, z, tolerance):
+    """Replace the points further than `tolerance` above the background by it."""
+    return numpy.where(y > z + tolerance, z, y)
+
+
+def _als(block, factor, niter):
+    y = block.T
+    tolerance = 2 * _noise(y)
+    z = linalg.cho_solve_banded((factor, False), y)
+    for _ in range(niter - 1):
+        z = linalg.cho_solve_banded((factor, False), _strip(y, z, tolerance))
+    return z.T
+
+
+def _poly_factor(x, order):
+    """Orthonormal basis of the polynomials of `order` on x (scaled to [-1, 1])."""
+    x = numpy.asarray(x, dtype=float)
+    scaled = (2 * x - x.min() - x.max()) / (x.max() - x.min())
+    q, _ = numpy.linalg.qr(numpy.vander(scaled, order + 1))
+    return q
+
+
+def _poly(block, q, niter):
+    y = block.T
+    tolerance = 2 * _noise(y)
+    fit = q @ (q.T @ y)
+    for _ in range(niter - 1):
+        fit = q @ (q.T @ _strip(y, fit, tolerance))
+    return fit.T
+
+
+def _estimator(npoints, x, method, lam, order, niter):
+    """Background function of a block of patterns, factorized once."""
+    if method == "als":
+        factor = _als_factor(npoints, lam)
+        return lambda block: _als(block, factor, niter)
+    if method == "poly":
+        if x is None:
+            raise ValueError("The 2theta grid x is required for a polynomial background.")
+        q = _poly_factor(x, order)
+        return lambda block: _poly(block, q, niter)
+    raise ValueError(f"Unknown background method '{method}', choose from 'als' or 'poly'.")
+
+
+def _by_blocks(data, func, chunksize, out):
+    """Apply `func` to blocks of patterns of a matrix (or a single pattern)."""
+    single = numpy.ndim(data) == 1
+    matrix = numpy.atleast_2d(data)
+    if out is None:
+        out = numpy.empty(matrix.shape, dtype=numpy.result_type(matrix.dtype, numpy.float32))
+    result = numpy.atleast_2d(out)
+    chunksize = chunksize or len(matrix)
+    for start in range(0, len(matrix), chunksize):
+        block = numpy.asarray(matrix[start:start + chunksize], dtype=float)
+        result[start:start + chunksize] = func(block)
+    return result[0] if single else out
+
+
+def background(
+    data,
+    x=None,
+    method="als",
+    lam=1e5,
+    order=6,
+    niter=20,
+    chunksize=None,
+    out=None,
+):
+    """
+    Estimate the background of every pattern of a matrix.
+
+    Parameters
+    ----------
+    data : array
+        Patterns along the rows (pattern, 2theta), such as the `data` of
+        a `PatternStore`, or a single pattern.
+    x : array, optional
+        2theta grid, required by the "poly" method.
+    method : str
+        "als" or "poly".
+    lam : float
+        Smoothness of the "als" background.
+    order : int
+        Order of the "poly" background.
+    niter : int
+        Number of peak stripping iterations.
+    chunksize : int, optional
+        Number of patterns processed at a time, to bound memory for series
+        larger than RAM (e.g. memory-mapped data with a memory-mapped `out`).
+    out : array, optional
+        Array to write the background into.
+
+    Returns
+    -------
+    array
+        Background, of the same shape as the data.
+    """
+    estimate = _estimator(numpy.shape(data)[-1], x, method, lam, order, niter)
+    return _by_blocks(data, estimate, chunksize, out)
+
+
+def subtract_background(data, x=None, method="als", lam=1e5, order=6, niter=20, chunksize=None, out=None):
+    """
+    Subtract the background (see `background`) from every pattern of a matrix.
+
+    With `chunksize` and `out` (which can be the data itself, if writable)
+    only a block of patterns is held in memory at a time.
+    """
+    estimate = _estimator(numpy.shape(data)[-1], x, method, lam, order, niter)
+    return _by_blocks(data, lambda block: block - estimate(block), chunksize, out)
@@ -1,4 +1,3 @@
-import math
 import numpy
 
 # NaCl Birch-Murnaghan EOS parameters
@@ -22,31 +21,31 @@ p_qtz = {
 
 
 def calc_uc_vol_base(a, b, c, al, be, ga):
-    """Calculate UC vol from individual params."""
+    """Calculate UC vol from individual params (scalars or arrays)."""
 
     # convert to rad
-    al = al / 180 * math.pi
-    be = (180 - be) / 180 * math.pi
-    ga = ga / 180 * math.pi
+    al = al / 180 * numpy.pi
+    be = (180 - be) / 180 * numpy.pi
+    ga = ga / 180 * numpy.pi
 
     return a * b * c * (
-        math.sqrt((1 - math.cos(al)**2 - math.cos(be)**2 - math.cos(ga)**2) +
-                  2 * math.cos(al) * math.cos(be) * math.cos(ga))
+        numpy.sqrt((1 - numpy.cos(al)**2 - numpy.cos(be)**2 - numpy.cos(ga)**2) +
+                   2 * numpy.cos(al) * numpy.cos(be) * numpy.cos(ga))
     )
 
 
 def calc_uc_err_base(a, b, c, al, be, ga, da, db, dc, dal, dbe, dga):
-    """Calculate UC vol error from individual params."""
+    """Calculate UC vol error from individual params (scalars or arrays)."""
 
     # convert to rad
-    al = al / 180 * math.pi
-    be = (180 - be) / 180 * math.pi
-    ga = ga / 180 * math.pi
+    al = al / 180 * numpy.pi
+    be = (180 - be) / 180 * numpy.pi
+    ga = ga / 180 * numpy.pi
 
-    ang = math.sqrt((1 - math.cos(al)**2 - math.cos(be)**2 - math.cos(ga)**2) +
-                    2 * math.cos(al) * math.cos(be) * math.cos(ga))
+    ang = numpy.sqrt((1 - numpy.cos(al)**2 - numpy.cos(be)**2 - numpy.cos(ga)**2) +
+                     2 * numpy.cos(al) * numpy.cos(be) * numpy.cos(ga))
 
-    return math.sqrt((a * b * ang * dc)**2 + (a * c * ang * db)**2 + (b * c * ang * da)**2)
+    return numpy.sqrt((a * b * ang * dc)**2 + (a * c * ang * db)**2 + (b * c * ang * da)**2)
 
 
 def calc_uc_vol(uc_dict):
@@ -113,4 +112,4 @@ def d_v_eos(v, v0, b0, b0p):
 
 def norm(intensity):
     """Normalize"""
-    return (intensity - intensity.mean()) / (intensity.max() - intensity.min())
\ No newline at end of file
+    return (intensity - intensity.mean()) / (intensity.max() - intensity.min())
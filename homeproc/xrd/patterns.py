@@ -0,0 +1,188 @@
+"""
+Module comprising readers for plain text powder diffraction patterns
+(.xy, .xye, .dat) and a memory-mapped store for long series of them.
+
+Patterns are returned as dicts with 'name', 'x' and 'data' (and 'err'
+when available), as used by `plot_pxrd`.
+
+@author: Dr. Paul Iacomi
+@date: Oct 2026
+"""
+
+__all__ = [
+    "read_pattern",
+    "read_patterns",
+    "PatternStore",
+]
+
+import json
+import os
+import pathlib
+
+import numpy
+import pandas
+from numpy.lib.format import open_memmap
+
+from ..common import ScannedFile
+from ..common import progress_map
+from ..common import scan_files
+
+PATTERN_SUFFIXES = (".xy", ".xye", ".dat")
+
+
+def _is_numeric(fields):
+    try:
+        for field in fields:
+            float(field)
+    except ValueError:
+        return False
+    return bool(fields)
+
+
+def _header_lines(path, maxlines=100):
+    """Count the text lines before the numeric data starts."""
+    with open(path, errors="replace") as file:
+        for n, line in enumerate(file):
+            if n >= maxlines:
+                break
+            if _is_numeric(line.split()):
+                return n
+    return 0
+
+
+def read_pattern(path):
+    """Read a two or three column (2theta, intensity, error) pattern file."""
+    path = pathlib.Path(path)
+    table = pandas.read_csv(
+        path,
+        sep=r"\s+",
+        header=None,
+        comment="#",
+        skiprows=_header_lines(path),
+        engine="c",
+        dtype=float,
+    )
+    pattern = {
+        "name": path.stem,
+        "x": table[0].to_numpy(),
+        "data": table[1].to_numpy(),
+    }
+    if table.shape[1] > 2:
+        pattern["err"] = table[2].to_numpy()
+    return pattern
+
+
+def _pattern_files(paths, pattern):
+    if isinstance(paths, (str, os.PathLike)) and os.path.isdir(paths):
+        return [f for f in scan_files(paths, pattern) if f.name.lower().endswith(PATTERN_SUFFIXES)]
+    return [ScannedFile(str(p), os.path.basename(p), os.path.getsize(p), None) for p in paths]
+
+
+def _read_scanned(file):
+    return read_pattern(file.path)
+
+
+def read_patterns(paths, pattern="*.*", jobs=1):
+    """
+    Read many pattern files, in a process pool if `jobs` > 1.
+
+    `paths` is a folder (files matching `pattern` and a pattern suffix,
+    sorted by name) or a list of files.
+    """
+    return progress_map(_read_scanned, _pattern_files(paths, pattern), jobs=jobs, desc="patterns")
+
+
+class PatternStore:
+    """
+    A series of patterns on a common 2theta grid, stored in a folder as a
+    memory-mapped (pattern, 2theta) array with an index of the patterns.
+
+    Opening a store does not read the intensities, slices of patterns or
+    2theta ranges are read from disk only when accessed.
+    """
+
+    DATA = "data.npy"
+    X = "x.npy"
+    INDEX = "index.csv"
+    META = "meta.json"
+
+    def __init__(self, folder):
+        self.folder = pathlib.Path(folder)
+        self.x = numpy.load(self.folder / self.X)
+        self.data = numpy.load(self.folder / self.DATA, mmap_mode="r")
+        self.index = pandas.read_csv(self.folder / self.INDEX, index_col=0)
+        with open(self.folder / self.META) as file:
+            self.meta = json.load(file)
+
+    @classmethod
+    def build(cls, paths, folder, pattern="*.*", x=None, dtype="float32", jobs=1):
+        """
+        Convert pattern files into a store, once.
+
+        Patterns are interpolated on `x` if given, or else on the grid of
+        the first pattern if their grids differ. Only one pattern at a time
+        is held in memory.
+        """
+        files = _pattern_files(paths, pattern)
+        if not files:
+            raise ValueError("No pattern files found.")
+        folder = pathlib.Path(folder)
+        folder.mkdir(parents=True, exist_ok=True)
+
+        if x is None:
+            x = read_pattern(files[0].path)["x"]
+        x = numpy.asarray(x, dtype=float)
+        numpy.save(folder / cls.X, x)
+        data = open_memmap(folder / cls.DATA, mode="w+", dtype=dtype, shape=(len(files), len(x)))
+        interpolated = numpy.zeros(len(files), dtype=bool)
+
+        def store(ind, pxrd):
+            if len(pxrd["x"]) == len(x) and numpy.allclose(pxrd["x"], x):
+                data[ind] = pxrd["data"]
+            else:
+                data[ind] = numpy.interp(x, pxrd["x"], pxrd["data"], left=numpy.nan, right=numpy.nan)
+                interpolated[ind] = True
+
+        progress_map(_read_scanned, files, jobs=jobs, desc="patterns", on_result=store)
+        data.flush()
+
+        index = pandas.DataFrame({
+            "name": [pathlib.Path(f.path).stem for f in files],
+            "path": [f.path for f in files],
+            "size": [f.size for f in files],
+            "interpolated": interpolated,
+        })
+        index.to_csv(folder / cls.INDEX)
+        with open(folder / cls.META, "w") as file:
+            json.dump({"npatterns": len(files), "npoints": len(x), "dtype": str(numpy.dtype(dtype))}, file)
+        return cls(folder)
+
+    def __len__(self):
+        return len(self.data)
+
+    def window(self, lo=None, hi=None):
+        """Slice of the 2theta grid within the limits."""
+        start = 0 if lo is None else numpy.searchsorted(self.x, lo)
+        end = len(self.x) if hi is None else numpy.searchsorted(self.x, hi, side="right")
+        return slice(start, end)
+
+    def pattern(self, ind, lo=None, hi=None):
+        """A pattern as a dict for `plot_pxrd`, optionally within 2theta limits."""
+        cols = self.window(lo, hi)
+        return {
+            "name": self.index["name"].iloc[ind],
+            "x": self.x[cols],
+            "data": numpy.asarray(self.data[ind, cols]),
+        }
+
+    def __getitem__(self, ind):
+        if isinstance(ind, (int, numpy.integer)):
+            return self.pattern(ind)
+        return [self.pattern(i) for i in numpy.arange(len(self))[ind]]
+
+    def find(self, name):
+        """Position of a pattern by name."""
+        return int(numpy.flatnonzero(self.index["name"].to_numpy() == name)[0])
+
+    def __repr__(self):
+        return f"PatternStore('{self.folder}', {len(self)} patterns x {len(self.x)} points)"
@@ -0,0 +1,150 @@
+"""
+Module comprising tracking of reflections across a series of powder
+diffraction patterns.
+
+Tracking runs in two passes. The window of each peak is first moved
+from pattern to pattern, centred on the maximum found in the previous
+pattern, which only needs integer positions. All (pattern, peak) windows
+are then fitted together with a gaussian, as a weighted parabola through
+the log of the intensity (Guo's method), batched as stacked 3x3 systems.
+
+Positions can be converted to d-spacings and lattice parameters for the
+unit cell and equation of state functions in `eos`.
+
+@author: Dr. Paul Iacomi
+@date: Oct 2026
+"""
+
+__all__ = [
+    "track_peaks",
+    "d_spacing",
+    "cubic_lattice_parameter",
+]
+
+import numpy
+import pandas
+
+FWHM_SIGMA = 2 * numpy.sqrt(2 * numpy.log(2))
+
+
+def _follow(data, x, peaks, half):
+    """Window centre (grid index) of every peak in every pattern."""
+    npatterns = len(data)
+    centres = numpy.empty((npatterns, len(peaks)), dtype=numpy.int64)
+    current = numpy.clip(numpy.searchsorted(x, peaks), half, len(x) - half - 1)
+    offsets = numpy.arange(-half, half + 1)
+    rows = numpy.arange(len(peaks))
+    for ind in range(npatterns):
+        windows = current[:, None] + offsets
+        maxima = windows[rows, numpy.argmax(numpy.asarray(data[ind])[windows], axis=1)]
+        current = numpy.clip(maxima, half, len(x) - half - 1)
+        centres[ind] = current
+    return centres
+
+
+def _fit_gaussians(xw, yw):
+    """Batched gaussian fits of windows (last axis), over a linear background through the edges."""
+    edge = max(1, xw.shape[-1] // 10)
+    x0, x1 = xw[..., :edge].mean(-1), xw[..., -edge:].mean(-1)
+    y0, y1 = yw[..., :edge].mean(-1), yw[..., -edge:].mean(-1)
+    slope = (y1 - y0) / (x1 - x0)
+    y = yw - (y0[..., None] + slope[..., None] * (xw - x0[..., None]))
+
+    # weighted least squares of ln y = a + b u + c u^2 (u centred on the window), weights y^2
+    centre = xw[..., xw.shape[-1] // 2]
+    u = xw - centre[..., None]
+    positive = y > 0
+    w = numpy.where(positive, y, 0)**2
+    lny = numpy.log(numpy.where(positive, y, 1))
+    powers = numpy.stack((numpy.ones_like(u), u, u * u), axis=-1)
+    A = numpy.einsum("...n,...ni,...nj->...ij", w, powers, powers)
+    B = numpy.einsum("...n,...ni,...n->...i", w, powers, lny)
+
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        a, b, c = numpy.moveaxis(numpy.linalg.solve(A + 1e-12 * numpy.eye(3), B[..., None])[..., 0], -1, 0)
+        sigma = numpy.sqrt(-1 / (2 * c))
+        position = centre - b / (2 * c)
+        height = numpy.exp(a - b * b / (4 * c))
+
+    # peaks wider than the window are fits of the background
+    span = xw[..., -1] - xw[..., 0]
+    valid = (c < 0) & (numpy.abs(position - centre) < span / 2) & (FWHM_SIGMA * sigma < span)
+    nan = numpy.nan
+    return (
+        numpy.where(valid, position, nan),
+        numpy.where(valid, FWHM_SIGMA * sigma, nan),
+        numpy.where(valid, height, nan),
+        numpy.where(valid, height * sigma * numpy.sqrt(2 * numpy.pi), nan),
+    )
+
+
+def track_peaks(data, x, peaks, window=0.3, labels=None, index=None, chunksize=1024):
+    """
+    Follow reflections across a series of patterns.
+
+    Parameters
+    ----------
+    data : array
+        Patterns along the rows (pattern, 2theta), ideally background
+        subtracted, such as the `data` of a `PatternStore`.
+    x : array
+        2theta grid.
+    peaks : list of float
+        Reference positions of the peaks in the first pattern.
+    window : float
+        Width of the window (in 2theta) each peak is fitted in.
+    labels : list, optional
+        Names of the peaks (e.g. hkl), by default their reference position.
+    index : list, optional
+        Labels of the patterns (e.g. times, pressures).
+    chunksize : int
+        Number of patterns fitted together.
+
+    Returns
+    -------
+    DataFrame
+        Position, FWHM, height and area of each peak in each pattern, with
+        (quantity, peak) columns. Failed fits, and peaks wider than the
+        window, are NaN.
+    """
+    x = numpy.asarray(x, dtype=float)
+    peaks = numpy.atleast_1d(numpy.asarray(peaks, dtype=float))
+    step = (x[-1] - x[0]) / (len(x) - 1)
+    half = max(2, int(round(window / step / 2)))
+    offsets = numpy.arange(-half, half + 1)
+
+    centres = _follow(data, x, peaks, half)
+
+    results = numpy.empty((4, len(data), len(peaks)))
+    for start in range(0, len(data), chunksize):
+        block = numpy.asarray(data[start:start + chunksize], dtype=float)
+        cols = centres[start:start + chunksize, :, None] + offsets
+        rows = numpy.arange(len(block))[:, None, None]
+        results[:, start:start + chunksize] = _fit_gaussians(x[cols], block[rows, cols])
+
+    labels = labels if labels is not None else peaks
+    columns = pandas.MultiIndex.from_product(
+        [["position", "fwhm", "height", "area"], labels],
+        names=["quantity", "peak"],
+    )
+    return pandas.DataFrame(
+        numpy.moveaxis(results, 0, 1).reshape(len(data), -1),
+        index=index,
+        columns=columns,
+    )
+
+
+def d_spacing(two_theta, wavelength=1.5406):
+    """Bragg d-spacing (A) of reflections at `two_theta` (degrees)."""
+    return wavelength / (2 * numpy.sin(numpy.radians(two_theta) / 2))
+
+
+def cubic_lattice_parameter(two_theta, hkl, wavelength=1.5406):
+    """
+    Cubic lattice parameter from the position of an (h, k, l) reflection.
+
+    Cubed, it is the unit cell volume used by the EOS of pressure standards
+    in `eos`, e.g. `bm_eos(a**3, **p_nacl)`.
+    """
+    h, k, ell = hkl
+    return d_spacing(two_theta, wavelength) * numpy.sqrt(h * h + k * k + ell * ell)
@@ -0,0 +1,154 @@
+"""
+Module comprising similarity between the patterns of a PXRD series and
+their segmentation into phases.
+
+Patterns are normalized as in `eos.norm` and scaled to unit length, so
+that the similarity of two patterns is a dot product: cosine similarity,
+or the Pearson correlation once patterns are centred. The matrix is
+built block by block in a thread pool, only two blocks of patterns are
+normalized in memory per thread.
+
+@author: Dr. Paul Iacomi
+@date: Oct 2026
+"""
+
+__all__ = [
+    "normalize_patterns",
+    "similarity_matrix",
+    "segment_patterns",
+]
+
+import heapq
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy
+
+from ..common import parallel_map
+
+
+def normalize_patterns(data, metric="pearson"):
+    """
+    Normalize patterns (rows) to unit length for dot product similarities.
+
+    With "pearson", each pattern is first normalized as in `eos.norm`
+    (centred and divided by its range), "cosine" keeps the raw intensity.
+    """
+    data = numpy.asarray(data, dtype=numpy.float32)
+    if metric == "pearson":
+        span = data.max(axis=1, keepdims=True) - data.min(axis=1, keepdims=True)
+        data = (data - data.mean(axis=1, keepdims=True)) / numpy.where(span > 0, span, 1)
+    elif metric != "cosine":
+        raise ValueError(f"Unknown metric '{metric}', choose from 'pearson' or 'cosine'.")
+    length = numpy.linalg.norm(data, axis=1, keepdims=True)
+    return data / numpy.where(length > 0, length, 1)
+
+
+def similarity_matrix(data, metric="pearson", chunksize=1024, jobs=1, out=None):
+    """
+    Pairwise similarity of all the patterns of a series.
+
+    Parameters
+    ----------
+    data : array
+        Patterns along the rows (pattern, 2theta), can be memory-mapped.
+    metric : str
+        "pearson" or "cosine".
+    chunksize : int
+        Number of patterns per block, bounding the memory used.
+    jobs : int
+        Number of threads (0 for all cores).
+    out : array, optional
+        (pattern, pattern) array to write into, e.g. memory-mapped.
+
+    Returns
+    -------
+    array
+        Symmetric float32 similarity matrix.
+    """
+    npatterns = len(data)
+    if out is None:
+        out = numpy.empty((npatterns, npatterns), dtype=numpy.float32)
+    starts = range(0, npatterns, chunksize)
+
+    def row_block(start):
+        left = normalize_patterns(data[start:start + chunksize], metric)
+        rows = slice(start, start + len(left))
+        for other in starts:
+            if other < start:
+                continue
+            right = left if other == start else normalize_patterns(data[other:other + chunksize], metric)
+            block = left @ right.T
+            cols = slice(other, other + len(right))
+            out[rows, cols] = block
+            out[cols, rows] = block.T
+
+    parallel_map(row_block, starts, jobs=jobs, executor=ThreadPoolExecutor)
+    return out
+
+
+def segment_patterns(data, n_segments=None, threshold=None, metric="pearson", chunksize=1024, out=None):
+    """
+    Split a series into contiguous segments of similar patterns (phases).
+
+    Adjacent segments are merged hierarchically, cheapest first, with the
+    Ward criterion on normalized patterns: the increase in squared
+    distance to the segment means. Merging stops at `n_segments`, or
+    when the cheapest merge costs more than `threshold`.
+
+    The running sums of the segments are held in `out`, a float32 array of
+    the shape of the data (in memory by default), filled `chunksize`
+    normalized patterns at a time. For series larger than memory, pass a memory-mapped array, e.g.
+    `numpy.lib.format.open_memmap(path, "w+", "float32", data.shape)`.
+
+    Returns
+    -------
+    ndarray
+        Indices of the first pattern of each segment after the first,
+        i.e. where the transitions are.
+    """
+    if n_segments is None and threshold is None:
+        raise ValueError("Give either the number of segments or a threshold.")
+    n_segments = n_segments or 1
+    threshold = numpy.inf if threshold is None else threshold
+
+    sums = numpy.empty(numpy.shape(data), dtype=numpy.float32) if out is None else out
+    for start in range(0, len(data), chunksize):
+        sums[start:start + chunksize] = normalize_patterns(data[start:start + chunksize], metric)
+    sizes = numpy.ones(len(sums))
+    start = numpy.arange(len(sums))
+    right = numpy.arange(1, len(sums) + 1)
+    right[-1] = -1
+    left = numpy.arange(-1, len(sums) - 1)
+    alive = numpy.ones(len(sums), dtype=bool)
+    version = numpy.zeros(len(sums), dtype=numpy.int64)
+
+    def cost(a, b):
+        diff = numpy.asarray(sums[a], dtype=float) / sizes[a] - numpy.asarray(sums[b], dtype=float) / sizes[b]
+        return sizes[a] * sizes[b] / (sizes[a] + sizes[b]) * diff @ diff
+
+    # segments are keyed by their first pattern, merges by the left segment
+    heap = [(cost(a, a + 1), a, 0, 0) for a in range(len(sums) - 1)]
+    heapq.heapify(heap)
+    nsegments = len(sums)
+
+    while heap and nsegments > n_segments:
+        merge, a, va, vb = heapq.heappop(heap)
+        b = right[a]
+        if not alive[a] or b < 0 or version[a] != va or version[b] != vb:
+            continue
+        if merge > threshold:
+            break
+        sums[a] += sums[b]
+        sizes[a] += sizes[b]
+        alive[b] = False
+        right[a] = right[b]
+        if right[a] >= 0:
+            left[right[a]] = a
+        version[a] += 1
+        nsegments -= 1
+        if left[a] >= 0:
+            heapq.heappush(heap, (cost(left[a], a), left[a], version[left[a]], version[a]))
+        if right[a] >= 0:
+            heapq.heappush(heap, (cost(a, right[a]), a, version[a], version[right[a]]))
+
+    return start[alive][1:]
@@ -0,0 +1,63 @@
+"""Tests of the background estimation of powder patterns."""
+
+import numpy as np
+import pytest
+
+from homeproc.xrd.background import background
+from homeproc.xrd.background import subtract_background
+
+X = np.linspace(5, 40, 2000)
+
+
+def _patterns(npatterns=8, seed=0):
+    """Patterns of sharp peaks on a known smooth baseline, and that baseline."""
+    rng = np.random.default_rng(seed)
+    base = (100 + 2000 / X)[None, :] * rng.uniform(0.5, 2, (npatterns, 1)) + 5 * X[None, :]
+    peaks = np.zeros_like(base)
+    for centre in (8.0, 12.5, 17.3, 21.0, 26.4, 31.7):
+        heights = rng.uniform(200, 1000, (npatterns, 1))
+        peaks += heights * np.exp(-0.5 * ((X - centre) / 0.05)**2)
+    noise = rng.normal(scale=2, size=base.shape)
+    return base + peaks + noise, base, peaks
+
+
+@pytest.mark.parametrize("method", ["als", "poly"])
+def test_baseline(method):
+    data, base, _ = _patterns()
+    estimate = background(data, X, method=method)
+    assert estimate.shape == data.shape
+    # away from the edges the baseline is recovered within the noise
+    inner = slice(100, -100)
+    assert np.abs(estimate - base)[:, inner].max() < 5
+    assert np.abs(estimate - base)[:, inner].mean() < 1
+
+
+def test_subtract():
+    data, base, peaks = _patterns()
+    corrected = subtract_background(data, X, method="poly")
+    np.testing.assert_allclose(corrected, data - background(data, X, method="poly"), atol=1e-3)
+    # the peak heights are kept
+    tops = peaks.argmax(axis=1)
+    rows = np.arange(len(data))
+    np.testing.assert_allclose(corrected[rows, tops], peaks[rows, tops], atol=5)
+
+
+def test_chunks(tmp_path):
+    data, _, _ = _patterns(npatterns=10)
+    whole = background(data)
+    out = np.lib.format.open_memmap(tmp_path / "bg.npy", "w+", "float32", data.shape)
+    background(data, chunksize=3, out=out)
+    np.testing.assert_allclose(out, whole, rtol=1e-5)
+    np.testing.assert_allclose(background(data[4]), whole[4])
+
+    writable = data.copy()
+    subtract_background(writable, chunksize=4, out=writable)
+    np.testing.assert_allclose(writable, data - whole)
+
+
+def test_errors():
+    data, _, _ = _patterns(npatterns=1)
+    with pytest.raises(ValueError):
+        background(data, method="poly")
+    with pytest.raises(ValueError):
+        background(data, X, method="spline")
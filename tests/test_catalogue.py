@@ -0,0 +1,55 @@
+"""Tests of the catalogue of DVS and Novocontrol files."""
+
+import os
+
+from homeproc.bench.synthetic import make_dvs_file
+from homeproc.bench.synthetic import make_novo_file
+from homeproc.catalogue import Catalogue
+
+
+def _archive(folder):
+    (folder / "dvs").mkdir()
+    (folder / "ide").mkdir()
+    make_dvs_file(folder / "dvs" / "run1.txt", npoints=200, nsteps=2)
+    make_novo_file(folder / "ide" / "run2.txt", nscans=2, nfreqs=5)
+    (folder / "notes.txt").write_text("not a data file\n")
+
+
+def test_rescan(tmp_path):
+    _archive(tmp_path)
+
+    with Catalogue(tmp_path / "runs.sqlite") as cat:
+        assert cat.scan(tmp_path, disable=True) == 3
+        assert len(cat) == 2
+        # nothing changed, no header is read again
+        assert cat.scan(tmp_path, disable=True) == 0
+
+        # a new file and a changed one are read, the others are not
+        make_dvs_file(tmp_path / "dvs" / "run3.txt", npoints=200, nsteps=2)
+        with open(tmp_path / "notes.txt", "a") as file:
+            file.write("more\n")
+        assert cat.scan(tmp_path, disable=True) == 2
+        assert len(cat) == 3
+
+        # removed files are pruned
+        os.remove(tmp_path / "dvs" / "run1.txt")
+        assert cat.scan(tmp_path, disable=True) == 0
+        assert len(cat) == 2
+
+    # the catalogue persists between sessions
+    with Catalogue(tmp_path / "runs.sqlite") as cat:
+        assert cat.scan(tmp_path, disable=True) == 0
+        assert sorted(cat.query()["kind"]) == ["dvs", "ide"]
+
+
+def test_query(tmp_path):
+    _archive(tmp_path)
+
+    with Catalogue() as cat:
+        cat.scan(tmp_path, jobs=2, disable=True)
+        dvs = cat.query(adsorbate="Wat%")
+        assert dvs["kind"].tolist() == ["dvs"]
+        assert dvs["method"].tolist() == ["synthetic"]
+        assert cat.query(kind="ide")["sample"].tolist() == ["sample"]
+        assert len(cat.query(sample="samp%", start="2021-01-01", end="2021-01-06")) == 2
+        assert cat.query(start="2021-02-01").empty
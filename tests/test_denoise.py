@@ -0,0 +1,47 @@
+"""Tests of the streaming savitzky-golay filter."""
+
+import numpy as np
+import pytest
+import scipy.signal as sig
+
+from homeproc.qcm.denoise import StreamingSavgol
+
+
+def _stream(smoother, data, sizes):
+    parts, start = [], 0
+    for size in sizes:
+        parts.append(smoother.push(data[start:start + size]))
+        start += size
+    parts.append(smoother.push(data[start:]))
+    parts.append(smoother.flush())
+    return np.concatenate(parts)
+
+
+@pytest.mark.parametrize("shape", [(500, ), (500, 7), (500, 3, 2)])
+def test_offline(shape):
+    rng = np.random.default_rng(0)
+    data = rng.normal(size=shape).cumsum(axis=0)
+    sizes = rng.integers(0, 40, size=20)
+
+    result = _stream(StreamingSavgol(21, 3), data, sizes)
+    assert result.shape == data.shape
+    np.testing.assert_allclose(result, sig.savgol_filter(data, 21, 3, axis=0, mode="interp"), atol=1e-8)
+
+
+def test_short():
+    data = np.arange(5.0)**2
+    result = _stream(StreamingSavgol(21, 2), data, [2])
+    np.testing.assert_allclose(result, data, atol=1e-8)
+
+
+def test_empty():
+    smoother = StreamingSavgol(11, 2)
+    assert smoother.flush().shape == (0, )
+    assert smoother.push(np.ones((4, 3))).shape == (0, 3)
+    assert smoother.flush().shape == (4, 3)
+    assert smoother.flush().shape == (0, 3)
+
+
+def test_window():
+    with pytest.raises(ValueError):
+        StreamingSavgol(10, 2)
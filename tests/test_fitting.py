@@ -0,0 +1,67 @@
+"""Tests of the batched fitting of impedance scans."""
+
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from homeproc.ide.dielectric import COL_ZIM
+from homeproc.ide.dielectric import COL_ZRE
+from homeproc.ide.dielectric import EPS0
+from homeproc.ide.fitting import fit_scans
+
+FREQS = np.logspace(0, 6, 40)
+C0 = 1e-12
+
+
+def _run(impedance, nscans=6, noise=1e-3, seed=0):
+    """Impedance data indexed by (time, freq), one scan per row of `impedance`."""
+    rng = np.random.default_rng(seed)
+    z = np.atleast_2d(impedance) * (1 + noise * rng.normal(size=(nscans, len(FREQS))))
+    times = pd.date_range("2026-10-01", periods=nscans, freq="1min")
+    index = pd.MultiIndex.from_product((times, FREQS), names=["time", "freq"])
+    return pd.DataFrame({COL_ZRE: z.real.ravel(), COL_ZIM: z.imag.ravel()}, index=index)
+
+
+def _hn(eps_inf, delta, tau, alpha, beta, sigma):
+    omega = 2 * np.pi * FREQS
+    eps = eps_inf + delta / (1 + (1j * omega * tau)**alpha)**beta - 1j * sigma / (EPS0 * omega)
+    return 1 / (1j * omega * C0 * eps)
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_rc(jobs):
+    omega = 2 * np.pi * FREQS
+    R, C = 1e6, 1e-10
+    fits = fit_scans(_run(R / (1 + 1j * omega * R * C)), model="rc", jobs=jobs)
+    assert len(fits) == 6
+    assert fits["success"].all()
+    np.testing.assert_allclose(fits["R [Ohm]"], R, rtol=1e-2)
+    np.testing.assert_allclose(fits["C [F]"], C, rtol=1e-2)
+    assert (fits["rmse"] < 1e-2).all()
+
+
+def test_hn():
+    true = [3, 10, 1e-4, 0.8, 0.6, 1e-9]
+    fits = fit_scans(_run(_hn(*true), noise=1e-4), model="hn", C0=C0)
+    assert fits["success"].all()
+    np.testing.assert_allclose(fits.iloc[:, :6], np.tile(true, (6, 1)), rtol=5e-2)
+
+
+def test_hn_no_relaxation():
+    # without a relaxation, tau used to run off to overflow and be reported as a success
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", RuntimeWarning)
+        fits = fit_scans(_run(_hn(3, 0, 1e-4, 0.9, 0.9, 1e-9)), model="hn", C0=C0)
+    omega = 2 * np.pi * FREQS
+    tau = fits.loc[fits["success"], "tau [s]"]
+    assert np.isfinite(fits.iloc[:, :6].to_numpy()).all()
+    assert ((tau > 1e-3 / omega.max()) & (tau < 1e3 / omega.min())).all()
+    np.testing.assert_allclose(fits["eps_inf"] + fits["delta_eps"], 3, rtol=1e-2)
+    np.testing.assert_allclose(fits["sigma [S/m]"], 1e-9, rtol=1e-2)
+
+
+def test_hn_needs_c0():
+    with pytest.raises(ValueError):
+        fit_scans(_run(_hn(3, 10, 1e-4, 0.8, 0.6, 1e-9)), model="hn")
@@ -0,0 +1,81 @@
+"""Tests of the fitting of DVS uptake kinetics."""
+
+import numpy as np
+import pandas as pd
+
+from homeproc.dvs.kinetics import _initial_guesses
+from homeproc.dvs.kinetics import fit_kinetics
+from homeproc.dvs.kinetics import ldf
+
+# (m0, meq, k, points) of each step, with a single point step
+STEPS = [(0.0, 5.0, 0.5, 2000), (5.0, 12.0, 1.0, 1500), (12.0, 12.0, 1.0, 1), (12.0, 4.0, 0.2, 3000)]
+DT = 0.005
+
+
+def _steps(gap=0):
+    """Time, mass and step table of consecutive LDF steps, `gap` points apart."""
+    t, m, bounds, start = [], [], [], 0
+    for m0, meq, k, npoints in STEPS:
+        time = np.arange(npoints) * DT
+        t.append(start * DT + time)
+        m.append(ldf(time, m0, meq, k))
+        bounds.append((start, start + npoints))
+        if gap:
+            t.append((start + npoints + np.arange(gap)) * DT)
+            m.append(np.full(gap, -100.0))
+        start += npoints + gap
+    table = pd.DataFrame(bounds, columns=["start", "end"])
+    return np.concatenate(t), np.concatenate(m), table
+
+
+def test_guesses():
+    t, m, table = _steps()
+    guesses = _initial_guesses(t, m, table["start"].to_numpy(), table["end"].to_numpy())
+    assert np.isfinite(guesses).all()
+    for (m0, meq, k, npoints), guess in zip(STEPS, guesses):
+        if npoints == 1:
+            # no derivative, the last point and a default rate
+            np.testing.assert_allclose(guess, [m0, m0, 3])
+        else:
+            np.testing.assert_allclose(guess, [m0, meq, k], rtol=1e-2)
+
+
+def test_guesses_gaps():
+    # rows between steps (and the derivative into each step) are not summed
+    t, m, table = _steps(gap=50)
+    starts, ends = table["start"].to_numpy(), table["end"].to_numpy()
+    guesses = _initial_guesses(t, m, starts, ends)
+    t0, m0, table0 = _steps()
+    np.testing.assert_allclose(guesses, _initial_guesses(t0, m0, table0["start"].to_numpy(), table0["end"].to_numpy()))
+
+
+def test_guesses_nan():
+    t, m, table = _steps()
+    # a missing mass only drops the derivatives next to it
+    m[[0, 100]] = np.nan
+    guesses = _initial_guesses(t, m, table["start"].to_numpy(), table["end"].to_numpy())
+    np.testing.assert_allclose(guesses[0, 1:], [5.0, 0.5], rtol=1e-2)
+
+
+def test_fit():
+    t, m, table = _steps()
+    noise = np.random.default_rng(0).normal(scale=1e-3, size=len(m))
+    data = pd.DataFrame({"time": t, "mass": m + noise})
+    fits = fit_kinetics(data, "time", "mass", table, min_points=10)
+
+    assert fits["success"].tolist() == [True, True, False, True]
+    assert fits.loc[2, ["m0", "m_eq", "k"]].isna().all()
+    fitted = fits.drop(index=2)
+    expected = np.array([step[:3] for step in STEPS if step[3] > 1])
+    np.testing.assert_allclose(fitted[["m0", "m_eq", "k"]], expected, rtol=1e-3, atol=1e-3)
+
+    # change points give the same steps as the table
+    ends = fit_kinetics(data, "time", "mass", table["end"].tolist(), min_points=10)
+    pd.testing.assert_frame_equal(ends, fits)
+
+
+def test_no_steps():
+    t, m, _ = _steps()
+    fits = fit_kinetics(pd.DataFrame({"time": t, "mass": m}), "time", "mass", [], jobs=2)
+    assert fits.empty
+    assert "k" in fits.columns
@@ -0,0 +1,54 @@
+"""Tests of the reading of QCM marker files."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from homeproc.qcm.traceproc import FREQ_COL
+from homeproc.qcm.traceproc import read_markerfile
+
+
+def _write(path, times, fmt):
+    freq = 1e7 - np.arange(len(times))
+    if path.suffix == ".txt":
+        lines = [f"{t:{fmt}} {f}" for t, f in zip(times, freq)]
+    else:
+        lines = [f"{t:{fmt}},{f}" for t, f in zip(times, freq)]
+    path.write_text("\n".join(lines) + "\n")
+    return pd.DataFrame({FREQ_COL: freq}, index=pd.DatetimeIndex(times, name="time"))
+
+
+# the first 100 rows (and the first chunks) all have days up to 12
+DAY_FIRST = pd.date_range("2021-02-01", "2021-02-20", freq="10min")
+
+
+@pytest.mark.parametrize("chunksize", [None, 144])
+@pytest.mark.parametrize("suffix", [".csv", ".txt"])
+def test_day_first(tmp_path, chunksize, suffix):
+    expected = _write(tmp_path / f"markers{suffix}", DAY_FIRST, "%d/%m/%Y %H:%M:%S")
+    markers = read_markerfile(tmp_path / f"markers{suffix}", chunksize=chunksize)
+    assert markers.index.is_monotonic_increasing
+    pd.testing.assert_frame_equal(markers, expected, check_freq=False)
+
+
+@pytest.mark.parametrize("chunksize", [None, 144])
+def test_month_first(tmp_path, chunksize):
+    times = pd.date_range("2021-01-02", "2021-01-20", freq="10min")
+    expected = _write(tmp_path / "markers.csv", times, "%m/%d/%Y %H:%M:%S")
+    markers = read_markerfile(tmp_path / "markers.csv", chunksize=chunksize)
+    pd.testing.assert_frame_equal(markers, expected, check_freq=False)
+
+
+def test_ambiguous(tmp_path):
+    times = pd.date_range("2021-02-01", "2021-02-10", freq="10min")
+    _write(tmp_path / "markers.csv", times, "%d/%m/%Y %H:%M:%S")
+    with pytest.raises(ValueError, match="ambiguous"):
+        read_markerfile(tmp_path / "markers.csv")
+    markers = read_markerfile(tmp_path / "markers.csv", datetime_format="%d/%m/%Y %H:%M:%S")
+    assert markers.index[0] == times[0]
+
+
+def test_iso(tmp_path):
+    times = pd.date_range("2021-02-01", periods=500, freq="1s")
+    expected = _write(tmp_path / "markers.csv", times, "%Y-%m-%d %H:%M:%S")
+    pd.testing.assert_frame_equal(read_markerfile(tmp_path / "markers.csv"), expected, check_freq=False)
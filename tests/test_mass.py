@@ -0,0 +1,57 @@
+"""Tests of the frequency to mass conversion."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from homeproc.qcm.mass import MASS_COL
+from homeproc.qcm.mass import MassConverter
+from homeproc.qcm.mass import frequency_to_mass
+from homeproc.qcm.traceproc import FREQ_COL
+
+
+def _markers(npoints=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2026-10-01", periods=npoints, freq="1s", name="time")
+    freq = 1e7 - 0.01 * np.arange(npoints) + rng.normal(scale=0.2, size=npoints)
+    # noisy start, then an adsorption step
+    freq[:300] += rng.normal(scale=5, size=300)
+    freq[1000:] -= 50
+    return pd.DataFrame({FREQ_COL: freq}, index=index)
+
+
+def _stream(converter, data, seed=1):
+    rng = np.random.default_rng(seed)
+    cuts = np.sort(rng.choice(np.arange(1, len(data)), size=30, replace=False))
+    bounds = zip(np.append(0, cuts), np.append(cuts, len(data)))
+    parts = [converter.push(data.iloc[start:end]) for start, end in bounds]
+    return pd.concat([part for part in parts if part is not None])
+
+
+@pytest.mark.parametrize("drift_window", [None, 200])
+def test_batch(drift_window):
+    data = _markers()
+    batch = frequency_to_mass(data, reference_std=1, drift_window=drift_window)
+    live = _stream(MassConverter(reference_std=1, drift_window=drift_window), data)
+
+    assert live.index.equals(batch.index)
+    assert list(live.columns) == list(batch.columns)
+    np.testing.assert_allclose(live.to_numpy(), batch.to_numpy(), atol=1e-6)
+
+
+def test_reference():
+    data = _markers()
+    F0 = data[FREQ_COL].iloc[0]
+    batch = frequency_to_mass(data, F0=F0)
+    live = _stream(MassConverter(F0=F0), data)
+    np.testing.assert_allclose(live[MASS_COL], batch[MASS_COL], atol=1e-9)
+    assert batch[MASS_COL].iloc[0] == 0
+
+
+def test_held_back():
+    data = _markers()
+    converter = MassConverter(reference_window=50, reference_std=1)
+    # the noisy start has no quiet window
+    assert converter.push(data.iloc[:200]) is None
+    assert converter.push(data.iloc[:0]) is None
+    assert len(converter.push(data.iloc[200:500])) == 500
@@ -0,0 +1,63 @@
+"""Tests of the live processing of DVS data."""
+
+import matplotlib
+import numpy as np
+import pandas as pd
+import pytest
+
+from homeproc.dvs.dvsproc import get_change_points
+from homeproc.dvs.online import OnlineChangePoints
+
+matplotlib.use("Agg")
+
+BOUNDS = [800, 1500, 2600, 3000]
+
+
+def _pressure(seed=0):
+    rng = np.random.default_rng(seed)
+    levels = [1, 10, 30, 60, 20]
+    edges = [0, *BOUNDS, 4200]
+    steps = [np.full(end - start, level, dtype=float) for start, end, level in zip(edges[:-1], edges[1:], levels)]
+    return np.concatenate(steps) + rng.normal(scale=0.1, size=edges[-1])
+
+
+def _stream(detector, values, seed=1):
+    rng = np.random.default_rng(seed)
+    cuts = np.sort(rng.choice(np.arange(1, len(values)), size=40, replace=False))
+    confirmed = []
+    for start, end in zip(np.append(0, cuts), np.append(cuts, len(values))):
+        confirmed += detector.push(values[start:end])
+    return confirmed + detector.flush()
+
+
+@pytest.mark.parametrize("log", [False, True])
+def test_batch(log):
+    pressure = _pressure()
+    jump = 0.1 if log else 2
+    online = _stream(OnlineChangePoints(width=100, jump=jump, log=log), pressure)
+    batch = get_change_points(pd.DataFrame({"p": pressure}), "p", method="binary_segment", pen=1, width=100, log=log)
+    assert online == BOUNDS
+    assert online == [int(n) for n in batch[:-1]]
+
+
+def test_blocks():
+    pressure = _pressure()
+    whole = OnlineChangePoints(width=100, jump=2)
+    whole.push(pressure)
+    whole.flush()
+    parts = OnlineChangePoints(width=100, jump=2)
+    _stream(parts, pressure, seed=2)
+    assert parts.change_points == whole.change_points == BOUNDS
+
+
+def test_pending():
+    pressure = _pressure()
+    detector = OnlineChangePoints(width=100, jump=2)
+    # the step at 800 is only confirmed half a window later
+    assert detector.push(pressure[:820]) == []
+    assert detector.earliest <= 800
+    assert detector.push(pressure[820:1000]) == [800]
+    assert detector.earliest > 800
+    # a step at the very end is confirmed by flush
+    assert detector.push(pressure[1000:1560]) == []
+    assert detector.flush() == [1500]
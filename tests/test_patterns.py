@@ -0,0 +1,24 @@
+"""Tests of the PXRD pattern store."""
+
+import numpy as np
+
+from homeproc.bench.synthetic import make_xy_patterns
+from homeproc.xrd.patterns import PatternStore
+from homeproc.xrd.patterns import read_pattern
+
+
+def test_build(tmp_path):
+    make_xy_patterns(tmp_path / "xy", npatterns=12, npoints=300)
+    # a pattern on a coarser grid is interpolated
+    coarse = read_pattern(tmp_path / "xy" / sorted(p.name for p in (tmp_path / "xy").iterdir())[-1])
+    np.savetxt(tmp_path / "xy" / "zz_coarse.xy", np.column_stack((coarse["x"][::2], coarse["data"][::2])))
+
+    store = PatternStore.build(tmp_path / "xy", tmp_path / "store", jobs=2)
+    assert store.data.shape == (13, 300)
+    assert store.index["interpolated"].tolist() == [False] * 12 + [True]
+    for ind, name in enumerate(store.index["name"][:12]):
+        pattern = read_pattern(tmp_path / "xy" / f"{name}.xy")
+        np.testing.assert_allclose(store.pattern(ind)["data"], pattern["data"], rtol=1e-6)
+
+    reopened = PatternStore(tmp_path / "store")
+    np.testing.assert_array_equal(reopened.data, store.data)
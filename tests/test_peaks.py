@@ -0,0 +1,66 @@
+"""Tests of the tracking of reflections across a series of patterns."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from homeproc.xrd.peaks import FWHM_SIGMA
+from homeproc.xrd.peaks import cubic_lattice_parameter
+from homeproc.xrd.peaks import d_spacing
+from homeproc.xrd.peaks import track_peaks
+
+X = np.linspace(5, 40, 7000)
+PEAKS = np.array([10.0, 20.0, 30.0])
+HEIGHTS = np.array([500.0, 1000.0, 300.0])
+FWHM = 0.1
+
+
+def _series(npatterns=50, drift=0.01, noise=0, seed=0):
+    """Gaussian peaks shifting by `drift` degrees per pattern on a sloped background."""
+    rng = np.random.default_rng(seed)
+    positions = PEAKS[None, :] + drift * np.arange(npatterns)[:, None]
+    sigma = FWHM / FWHM_SIGMA
+    data = 50 + 2 * X[None, :] + rng.normal(scale=noise, size=(npatterns, len(X)))
+    for ind in range(len(PEAKS)):
+        data += HEIGHTS[ind] * np.exp(-0.5 * ((X[None, :] - positions[:, ind:ind + 1]) / sigma)**2)
+    return data, positions
+
+
+def test_track():
+    data, positions = _series()
+    index = pd.RangeIndex(len(data), name="pattern")
+    peaks = track_peaks(data, X, PEAKS, window=0.4, labels=["a", "b", "c"], index=index)
+
+    assert peaks.shape == (50, 12)
+    assert peaks.index.equals(index)
+    np.testing.assert_allclose(peaks["position"], positions, atol=1e-3)
+    np.testing.assert_allclose(peaks["fwhm"], FWHM, rtol=2e-2)
+    np.testing.assert_allclose(peaks["height"], np.broadcast_to(HEIGHTS, (50, 3)), rtol=2e-2)
+    area = HEIGHTS * FWHM / FWHM_SIGMA * np.sqrt(2 * np.pi)
+    np.testing.assert_allclose(peaks["area"], np.broadcast_to(area, (50, 3)), rtol=3e-2)
+
+
+def test_follow():
+    # peaks moving several windows over the series are followed
+    data, positions = _series(npatterns=200, drift=0.02, noise=2)
+    peaks = track_peaks(data, X, PEAKS, window=0.4, chunksize=64)
+    assert positions[-1, 0] - positions[0, 0] > 5 * 0.4
+    np.testing.assert_allclose(peaks["position"], positions, atol=5e-3)
+    pd.testing.assert_frame_equal(peaks, track_peaks(data, X, PEAKS, window=0.4))
+
+
+def test_failed():
+    # a window without a peak is not fitted
+    data, _ = _series(npatterns=5)
+    peaks = track_peaks(data, X, [15.0], window=0.4)
+    assert peaks.isna().all().all()
+
+
+@pytest.mark.parametrize("hkl", [(1, 1, 1), (2, 0, 0), (2, 2, 0)])
+def test_lattice(hkl):
+    a, wavelength = 5.6402, 1.5406
+    d = a / np.sqrt(np.sum(np.square(hkl)))
+    two_theta = 2 * np.degrees(np.arcsin(wavelength / (2 * d)))
+    np.testing.assert_allclose(d_spacing(two_theta, wavelength), d)
+    np.testing.assert_allclose(cubic_lattice_parameter(two_theta, hkl, wavelength), a)
+    np.testing.assert_allclose(cubic_lattice_parameter(np.array([two_theta] * 3), hkl), a)
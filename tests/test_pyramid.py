@@ -0,0 +1,82 @@
+"""Tests of the multi-resolution series summaries."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from homeproc.common.pyramid import Pyramid
+
+
+def _series(npoints=1000, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2026-10-01", periods=npoints, freq="1s", name="time")
+    return pd.DataFrame({
+        "a": rng.normal(size=npoints).cumsum(),
+        "b": rng.normal(size=npoints),
+    }, index=index)
+
+
+def _pyramid(folder, data, cuts=()):
+    pyramid = Pyramid.create(folder, data.columns, index_name="time", base=2, depth=6)
+    bounds = [0, *cuts, len(data)]
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        pyramid.append(data.iloc[start:end])
+    return pyramid
+
+
+def _bins(data, size):
+    """Expected min, max and mean of each bin of `size` rows."""
+    groups = data.groupby(np.arange(len(data)) // size)
+    times = data.index.to_series().groupby(np.arange(len(data)) // size)
+    return groups.min(), groups.max(), groups.mean(), times.first(), times.last()
+
+
+@pytest.mark.parametrize("pixels, size", [(1000, 4), (100, 16), (40, 32)])
+def test_query(tmp_path, pixels, size):
+    data = _series()
+    pyramid = _pyramid(tmp_path, data)
+    vmin, vmax, mean, first, last = _bins(data, size)
+
+    minmax = pyramid.query(pixels=pixels)
+    assert len(minmax) == 2 * len(vmin)
+    np.testing.assert_allclose(minmax.to_numpy()[0::2], vmin.to_numpy())
+    np.testing.assert_allclose(minmax.to_numpy()[1::2], vmax.to_numpy())
+    assert (minmax.index[0::2] == first.to_numpy()).all()
+    assert (minmax.index[1::2] == last.to_numpy()).all()
+    assert minmax.index.name == "time"
+
+    means = pyramid.query(pixels=pixels, how="mean", columns=["b"])
+    assert list(means.columns) == ["b"]
+    np.testing.assert_allclose(means["b"], mean["b"])
+
+
+def test_window(tmp_path):
+    data = _series()
+    pyramid = _pyramid(tmp_path, data)
+    start, end = data.index[100], data.index[299]
+    result = pyramid.query(start, end, pixels=1000, how="mean")
+    assert len(result) == 50
+    np.testing.assert_allclose(result, data.iloc[100:300].groupby(np.arange(200) // 4).mean())
+    assert pyramid.rows(start, end) == 200
+
+
+def test_append(tmp_path):
+    data = _series(1003)
+    whole = _pyramid(tmp_path / "whole", data)
+    parts = _pyramid(tmp_path / "parts", data, cuts=[1, 7, 300, 301, 650])
+    assert parts.nrows == whole.nrows == len(data)
+    assert parts.end == whole.end == data.index[-1]
+    for k in whole.levels:
+        a, b = whole.level(k), parts.level(k)
+        assert len(a) == len(b)
+        for field in ("start", "end", "count", "min", "max"):
+            np.testing.assert_array_equal(a[field], b[field])
+        np.testing.assert_allclose(a["sum"], b["sum"])
+
+
+def test_empty(tmp_path):
+    pyramid = Pyramid.create(tmp_path, ["a"])
+    assert pyramid.end is None
+    assert pyramid.query().empty
+    with pytest.raises(ValueError):
+        pyramid.query(how="median")
@@ -0,0 +1,63 @@
+"""Tests of the similarity and segmentation of PXRD series."""
+
+import numpy as np
+import pytest
+
+from homeproc.xrd.similarity import normalize_patterns
+from homeproc.xrd.similarity import segment_patterns
+from homeproc.xrd.similarity import similarity_matrix
+
+
+def _phases(sizes=(40, 25, 35), npoints=500, seed=0):
+    """Noisy patterns of consecutive phases, each with its own peaks."""
+    rng = np.random.default_rng(seed)
+    x = np.linspace(5, 40, npoints)
+    patterns = []
+    for size in sizes:
+        centres = rng.uniform(6, 39, 5)
+        phase = sum(np.exp(-0.5 * ((x - c) / 0.1)**2) for c in centres) * 1000 + 100
+        patterns.append(phase + rng.normal(scale=10, size=(size, npoints)))
+    return np.concatenate(patterns)
+
+
+@pytest.mark.parametrize("metric", ["pearson", "cosine"])
+def test_matrix(metric):
+    data = _phases()
+    sim = similarity_matrix(data, metric=metric, chunksize=16)
+    assert sim.shape == (100, 100)
+    assert sim.dtype == np.float32
+    np.testing.assert_array_equal(sim, sim.T)
+    np.testing.assert_allclose(np.diag(sim), 1, atol=1e-5)
+    assert (sim <= 1 + 1e-5).all()
+
+
+def test_pearson():
+    data = _phases()
+    sim = similarity_matrix(data, chunksize=16)
+    np.testing.assert_allclose(sim, np.corrcoef(data), atol=1e-4)
+    # patterns of one phase are more alike than patterns of two
+    assert sim[:40, :40].min() > sim[:40, 40:65].max()
+
+
+def test_blocks(tmp_path):
+    data = _phases()
+    whole = similarity_matrix(data, chunksize=1024)
+    out = np.lib.format.open_memmap(tmp_path / "sim.npy", "w+", "float32", whole.shape)
+    similarity_matrix(data, chunksize=7, jobs=3, out=out)
+    np.testing.assert_allclose(out, whole, atol=1e-5)
+
+
+def test_normalize():
+    data = _phases()
+    with pytest.raises(ValueError):
+        normalize_patterns(data, "euclidean")
+    flat = normalize_patterns(np.ones((2, 10)))
+    np.testing.assert_array_equal(flat, 0)
+
+
+def test_segments():
+    data = _phases()
+    np.testing.assert_array_equal(segment_patterns(data, n_segments=3), [40, 65])
+    np.testing.assert_array_equal(segment_patterns(data, threshold=1, chunksize=16), [40, 65])
+    with pytest.raises(ValueError):
+        segment_patterns(data)
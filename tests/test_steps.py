@@ -0,0 +1,51 @@
+"""Tests of the DVS step tables built from the setpoint columns."""
+
+import numpy as np
+import pandas as pd
+
+from homeproc.dvs.dvsproc import calc_isotherm_data
+from homeproc.dvs.dvsproc import get_steps
+
+
+def _run():
+    index = pd.date_range("2026-10-01", periods=1000, freq="1min", name="time")
+    p_tgt = np.repeat([0.0, 10.0, 20.0, 40.0, 40.0], 200)
+    # setpoint noise, under the tolerance
+    p_tgt[250:260] += 1e-3
+    heat = np.full(1000, np.nan)
+    heat[100:300] = 120.0
+    mass = 1 + p_tgt / 100 + np.random.default_rng(0).normal(scale=1e-4, size=1000)
+    return pd.DataFrame({"p_tgt": p_tgt, "p": p_tgt + 0.01, "heat": heat, "mass": mass}, index=index)
+
+
+def test_steps():
+    data = _run()
+    steps = get_steps(data, "p_tgt", tol=0.01)
+    assert steps["start"].tolist() == [0, 200, 400, 600]
+    assert steps["end"].tolist() == [200, 400, 600, 1000]
+    assert steps["p_tgt"].tolist() == [0, 10, 20, 40]
+    assert steps["start_time"].tolist() == data.index[[0, 200, 400, 600]].tolist()
+    assert (steps["duration"] == steps["end_time"] - steps["start_time"]).all()
+
+    # without tolerance the setpoint noise starts steps
+    assert len(get_steps(data, "p_tgt")) == 6
+
+
+def test_nan_targets():
+    data = _run()
+    # the heater target appears at 100 and disappears at 300
+    steps = get_steps(data, ["p_tgt", "heat"], tol=0.01)
+    assert steps["start"].tolist() == [0, 100, 200, 300, 400, 600]
+    np.testing.assert_array_equal(steps["heat"], [np.nan, 120, 120, np.nan, np.nan, np.nan])
+
+    heat = get_steps(data, "heat")
+    assert heat["start"].tolist() == [0, 100, 300]
+
+
+def test_isotherm():
+    data = _run()
+    steps = get_steps(data, "p_tgt", tol=0.01)
+    isotherm = calc_isotherm_data(data, "p", "mass", steps)
+    pd.testing.assert_frame_equal(isotherm, calc_isotherm_data(data, "p", "mass", steps["end"].tolist()))
+    np.testing.assert_allclose(isotherm["pressure"], steps["p_tgt"] + 0.01)
+    np.testing.assert_allclose(isotherm["loading"], 1 + steps["p_tgt"] / 100, atol=1e-4)
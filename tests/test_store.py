@@ -0,0 +1,129 @@
+"""Tests of the Parquet experiment store."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from homeproc.store import ExperimentStore  # noqa: E402
+
+
+def _equal(result, expected):
+    # the frequency of a time index is not stored
+    pd.testing.assert_frame_equal(result, expected, check_freq=False)
+
+
+def _series(npoints=500, start="2026-10-01 22:00", seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range(start, periods=npoints, freq="1min", name="time")
+    return pd.DataFrame({
+        "mass": rng.normal(size=npoints).cumsum(),
+        "step": np.arange(npoints) // 100,
+        "time": rng.normal(size=npoints),
+    }, index=index)
+
+
+def _traces(ntraces=20, nfreqs=30):
+    times = pd.date_range("2026-10-01 23:50", periods=ntraces, freq="1min", name="time")
+    freqs = pd.Index(np.linspace(9.9e6, 1e7, nfreqs), name="Frequency [Hz]")
+    values = np.random.default_rng(0).normal(size=(nfreqs, ntraces))
+    return pd.DataFrame(values, index=freqs, columns=times)
+
+
+def test_roundtrip(tmp_path):
+    store = ExperimentStore(tmp_path)
+    data = _series()
+    store.write("dvs", data, meta={"sample": "ZIF-8"}, chunksize=64)
+
+    _equal(store.read("dvs"), data)
+    assert store.series == ["dvs"]
+    assert store.meta("dvs") == {"sample": "ZIF-8"}
+    assert store.time_range("dvs") == (data.index[0], data.index[-1])
+    # the series spans midnight, so two daily files
+    assert store.manifest("dvs")["nfiles"] == 2
+
+
+def test_window(tmp_path):
+    store = ExperimentStore(tmp_path)
+    data = _series()
+    store.write("dvs", data, chunksize=64)
+    start, end = data.index[100], data.index[250]
+
+    result = store.read("dvs", start, end, columns=["mass"])
+    _equal(result, data.loc[start:end, ["mass"]])
+    assert len(store.chunks("dvs", start, end)) < len(store.chunks("dvs"))
+
+
+def test_transposed(tmp_path):
+    store = ExperimentStore(tmp_path)
+    traces = _traces()
+    store.write("traces", traces, chunksize=8)
+    _equal(store.read("traces"), traces)
+
+    start, end = traces.columns[3], traces.columns[12]
+    _equal(store.read("traces", start, end), traces.loc[:, start:end])
+
+
+def test_multiindex(tmp_path):
+    store = ExperimentStore(tmp_path)
+    data = _series(60).set_index("step", append=True)
+    store.write("ide", data)
+    _equal(store.read("ide"), data)
+
+
+def test_append(tmp_path):
+    store = ExperimentStore(tmp_path)
+    data = _series()
+    store.append("dvs", data.iloc[:200])
+    store.append("dvs", data.iloc[200:201])
+    store.append("dvs", data.iloc[201:])
+    _equal(store.read("dvs"), data)
+
+    with pytest.raises(ValueError):
+        store.append("dvs", data[["mass"]])
+
+
+def test_empty(tmp_path):
+    store = ExperimentStore(tmp_path)
+    data = _series()
+    store.write("dvs", data.iloc[:0])
+
+    assert store.time_range("dvs") == (None, None)
+    empty = store.read("dvs")
+    assert empty.empty
+    assert list(empty.columns) == list(data.columns)
+    assert (empty.dtypes == data.dtypes).all()
+
+    store.append("dvs", data.iloc[:0])
+    store.append("dvs", data)
+    _equal(store.read("dvs"), data)
+
+
+def test_pyramid(tmp_path):
+    store = ExperimentStore(tmp_path)
+    data = _series(1000)
+    store.write("dvs", data.iloc[:600], chunksize=64)
+    store.build_pyramid("dvs", base=2, depth=6)
+    store.append("dvs", data.iloc[600:])
+
+    with pytest.raises(ValueError):
+        store.append("dvs", data.iloc[:10])
+    pyramid = store.pyramid("dvs")
+    assert pyramid.nrows == len(data)
+    assert pyramid.columns == ["mass", "step", "time"]
+
+    # small windows come from the data, larger ones from the pyramid
+    start, end = data.index[10], data.index[20]
+    _equal(store.overview("dvs", start, end, pixels=100), data.loc[start:end])
+    overview = store.overview("dvs", pixels=100, how="mean", columns=["mass"])
+    np.testing.assert_allclose(overview["mass"], data["mass"].groupby(np.arange(1000) // 16).mean())
+
+
+def test_pyramid_empty(tmp_path):
+    store = ExperimentStore(tmp_path)
+    store.write("dvs", _series().iloc[:0])
+    pyramid = store.build_pyramid("dvs")
+    assert pyramid.nrows == 0
+    store.append("dvs", _series())
+    assert store.pyramid("dvs").nrows == 500
@@ -0,0 +1,78 @@
+"""Tests of the incremental reading of growing files."""
+
+import pandas as pd
+import pytest
+
+from homeproc.common.tail import TailReader
+
+
+class _Reader(TailReader):
+    """Reader of a file with a single header line of column names."""
+
+    def parse_header(self, lines):
+        if not lines:
+            return None
+        self.columns = lines[0].split(self.sep)
+        return 1
+
+
+def _write(path, text, mode="a"):
+    with open(path, mode, newline="") as file:
+        file.write(text)
+
+
+def test_abstract():
+    with pytest.raises(TypeError):
+        TailReader("file.txt")
+
+
+def test_partial_lines(tmp_path):
+    path = tmp_path / "data.txt"
+    reader = _Reader(path)
+
+    _write(path, "a\tb", "w")
+    assert reader.poll().empty
+    _write(path, "\n1\t2\n3\t")
+    rows = reader.poll()
+    assert list(rows.columns) == ["a", "b"]
+    assert rows.values.tolist() == [[1, 2]]
+    _write(path, "4\n5\t6\n")
+    assert reader.poll().values.tolist() == [[3, 4], [5, 6]]
+    assert reader.poll().empty
+    assert reader.data.values.tolist() == [[1, 2], [3, 4], [5, 6]]
+
+
+def test_truncated(tmp_path):
+    path = tmp_path / "data.txt"
+    reader = _Reader(path)
+    _write(path, "a\tb\n1\t2\n3\t", "w")
+    reader.poll()
+
+    # the partial line of the old file is dropped
+    _write(path, "a\tb\n7\t8\n", "w")
+    assert reader.poll().values.tolist() == [[7, 8]]
+    assert reader.data.values.tolist() == [[7, 8]]
+
+
+def test_rewritten(tmp_path):
+    path = tmp_path / "data.txt"
+    reader = _Reader(path)
+    _write(path, "a\tb\n1\t2\n", "w")
+    reader.poll()
+
+    # a new file at least as long as the old one, with different content
+    _write(path, "c\td\n9\t9\n8\t8\n", "w")
+    rows = reader.poll()
+    assert list(rows.columns) == ["c", "d"]
+    assert rows.values.tolist() == [[9, 9], [8, 8]]
+
+
+def test_out(tmp_path):
+    path, out = tmp_path / "data.txt", tmp_path / "out.csv"
+    reader = _Reader(path, out=out, keep=False)
+    _write(path, "a\tb\n1\t2\n", "w")
+    reader.poll()
+    _write(path, "3\t4\n")
+    reader.poll()
+    assert reader.data.empty
+    assert pd.read_csv(out, index_col=0).values.tolist() == [[1, 2], [3, 4]]
@@ -0,0 +1,49 @@
+"""Tests of the resonance peak search of QCM traces."""
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.signal import find_peaks
+from scipy.signal import peak_widths
+
+from homeproc.bench.synthetic import make_qcm_traces
+from homeproc.qcm.traceproc import FREQ_COL
+from homeproc.qcm.traceproc import STATUS_COL
+from homeproc.qcm.traceproc import WIDTH_COL
+from homeproc.qcm.traceproc import calc_tracedata
+from homeproc.qcm.traceproc import read_tracefiles
+
+
+@pytest.fixture(scope="module")
+def traces(tmp_path_factory):
+    folder = tmp_path_factory.mktemp("traces")
+    make_qcm_traces(folder, ntraces=40)
+    return read_tracefiles(folder)
+
+
+def test_full(traces):
+    results = calc_tracedata(traces)
+    # widths at half prominence over the whole trace
+    for exp in traces.columns[:5]:
+        y = traces[exp].to_numpy()
+        peak = find_peaks(y, width=10, height=0.1)[0][0]
+        assert results.loc[exp, FREQ_COL] == traces.index[peak]
+        np.testing.assert_allclose(results.loc[exp, WIDTH_COL], peak_widths(y, [peak], rel_height=0.5)[0][0])
+
+
+def test_tracked(traces):
+    full = calc_tracedata(traces)
+    tracked = calc_tracedata(traces, track=True)
+    assert tracked[STATUS_COL].iloc[0] == "full"
+    assert (tracked[STATUS_COL].iloc[1:] == "tracked").all()
+    pd.testing.assert_series_equal(tracked[FREQ_COL], full[FREQ_COL])
+    # the peak bases are only searched near the peak, in the noise floor
+    np.testing.assert_allclose(tracked[WIDTH_COL], full[WIDTH_COL], rtol=2e-2)
+
+
+def test_lost(traces):
+    # a window too narrow to hold a peak is widened
+    tracked = calc_tracedata(traces, track=True, track_window=10)
+    assert "widened" in set(tracked[STATUS_COL])
+    assert "failed" not in set(tracked[STATUS_COL])
+    pd.testing.assert_series_equal(tracked[FREQ_COL], calc_tracedata(traces)[FREQ_COL])